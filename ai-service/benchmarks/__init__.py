@@ -0,0 +1,6 @@
+"""
+Microbenchmarks for the ai-service hot paths.
+
+Run with `just bench` (or `uv run python -m benchmarks.run`) from the
+ai-service directory.
+"""
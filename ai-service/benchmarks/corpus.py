@@ -0,0 +1,136 @@
+"""
+Synthetic PDF corpus for the benchmarks.
+
+Documents are generated deterministically with PyMuPDF, so every run and
+every machine measures the same input. They mimic hospital reports: a
+letterhead and footer repeated on every page, lines with irregular spacing
+and blank runs, and optionally image-only (scanned) pages.
+"""
+
+import random
+from dataclasses import dataclass
+
+import pymupdf
+
+SEED = 20240601
+
+WORDS = (
+    "paziente referto esame emocromo glicemia colesterolo pressione arteriosa "
+    "terapia farmaco posologia diagnosi anamnesi ecografia addome torace "
+    "radiografia cardiologia controllo follow-up valori normali alterati "
+    "emoglobina leucociti piastrine creatinina ipertensione diabete mg/dl "
+    "compresse giorno sera mattina visita specialistica esito negativo positivo"
+).split()
+
+HEADER = "AZIENDA OSPEDALIERA UNIVERSITARIA - U.O. MEDICINA INTERNA"
+FOOTER = "Documento firmato digitalmente ai sensi del D.Lgs 82/2005"
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """
+    Shape of a synthetic document.
+
+    Attributes:
+        name: Identifier used in benchmark case names.
+        pages: Number of pages.
+        lines_per_page: Text lines per text page; the text density.
+        image_page_ratio: Fraction of pages that are image-only scans.
+    """
+
+    name: str
+    pages: int
+    lines_per_page: int
+    image_page_ratio: float = 0.0
+
+
+@dataclass(frozen=True)
+class CorpusDocument:
+    """
+    A generated document.
+
+    Attributes:
+        spec: The spec the document was generated from.
+        pdf: The PDF file content.
+        raw_text: Uncleaned text of all pages, as returned by PyMuPDF.
+    """
+
+    spec: CorpusSpec
+    pdf: bytes
+    raw_text: str
+
+
+CORPUS_SPECS = (
+    CorpusSpec("1p_dense", pages=1, lines_per_page=60),
+    CorpusSpec("10p_sparse", pages=10, lines_per_page=8),
+    CorpusSpec("10p_dense", pages=10, lines_per_page=60),
+    CorpusSpec("20p_half_scanned", pages=20, lines_per_page=40, image_page_ratio=0.5),
+    CorpusSpec("5p_scanned", pages=5, lines_per_page=0, image_page_ratio=1.0),
+    CorpusSpec("200p_dense", pages=200, lines_per_page=60),
+    CorpusSpec("200p_mixed", pages=200, lines_per_page=30, image_page_ratio=0.3),
+)
+
+
+def _text_line(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(4, 12))
+    if rng.random() < 0.3:
+        words.append(f"{rng.randint(50, 250)}")
+    # Irregular spacing, as produced by column layouts
+    separator = "   " if rng.random() < 0.2 else " "
+    return separator.join(words)
+
+
+def _scan_pixmap() -> pymupdf.Pixmap:
+    pixmap = pymupdf.Pixmap(pymupdf.csRGB, pymupdf.IRect(0, 0, 300, 400), False)
+    pixmap.clear_with(230)
+    return pixmap
+
+
+def generate_document(spec: CorpusSpec, rng: random.Random) -> CorpusDocument:
+    """
+    Generate one synthetic PDF.
+
+    Args:
+        spec: Shape of the document.
+        rng: Random source, seeded by the caller for reproducibility.
+
+    Returns:
+        The generated document.
+    """
+    doc = pymupdf.open()
+    scan = _scan_pixmap()
+    image_pages = set(rng.sample(range(spec.pages), round(spec.pages * spec.image_page_ratio)))
+
+    for page_num in range(spec.pages):
+        page = doc.new_page()
+        if page_num in image_pages:
+            page.insert_image(page.rect, pixmap=scan)
+            continue
+
+        lines = [HEADER, ""]
+        for _ in range(spec.lines_per_page):
+            lines.append(_text_line(rng))
+            if rng.random() < 0.1:
+                lines.extend(["", ""])
+        lines.extend(["", FOOTER, f"Pagina {page_num + 1} di {spec.pages}"])
+        page.insert_text((36, 36), "\n".join(lines), fontsize=7)
+
+    pdf = doc.tobytes()
+    raw_text = "\n".join(page.get_text("text") for page in doc)
+    doc.close()
+
+    return CorpusDocument(spec=spec, pdf=pdf, raw_text=raw_text)
+
+
+def generate_corpus(specs: tuple[CorpusSpec, ...] = CORPUS_SPECS) -> list[CorpusDocument]:
+    """
+    Generate the benchmark corpus.
+
+    Args:
+        specs: Shapes of the documents to generate.
+
+    Returns:
+        One document per spec, identical across runs.
+    """
+    rng = random.Random(SEED)
+    return [generate_document(spec, rng) for spec in specs]
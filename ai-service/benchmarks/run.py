@@ -0,0 +1,221 @@
+"""
+Run the ai-service microbenchmarks.
+
+Covers PdfExtractor.extract_text, PdfExtractor._clean_text and
+AiAnalyzer._parse_response over the synthetic corpus and the recorded LLM
+responses. Results are written as JSON to benchmarks/results/ and can be
+compared with a previous run to catch regressions before a release:
+
+    uv run python -m benchmarks.run --save-baseline
+    uv run python -m benchmarks.run --baseline benchmarks/results/baseline.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+from benchmarks.corpus import generate_corpus
+from src.config import Settings
+from src.services.ai_analyzer import AiAnalyzer, AiResponseParsingError
+from src.services.pdf_extractor import EmptyPdfError, PdfExtractor
+
+BENCHMARKS_DIR = Path(__file__).parent
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+BASELINE_PATH = RESULTS_DIR / "baseline.json"
+LLM_RESPONSES_PATH = BENCHMARKS_DIR / "data" / "llm_responses.json"
+
+
+def _ignoring(fn: Callable[[], object], *errors: type[Exception]) -> Callable[[], None]:
+    """Wrap a call whose expected failure is part of what is measured."""
+
+    def call() -> None:
+        try:
+            fn()
+        except errors:
+            pass
+
+    return call
+
+
+def build_cases() -> dict[str, Callable[[], None]]:
+    """
+    Build the benchmark cases.
+
+    Returns:
+        Callables keyed by case name, in a stable order.
+    """
+    settings = Settings(groq_api_key="benchmark")
+    # Without a character budget or sampling, extraction reads every page
+    unbounded_settings = Settings(
+        groq_api_key="benchmark",
+        ai_max_input_chars=sys.maxsize,
+        pdf_sampling_min_pages=sys.maxsize,
+    )
+    extractor = PdfExtractor(settings)
+    unbounded_extractor = PdfExtractor(unbounded_settings)
+    analyzer = AiAnalyzer(settings)
+
+    cases: dict[str, Callable[[], None]] = {}
+
+    corpus = generate_corpus()
+    for document in corpus:
+        name = document.spec.name
+        pdf = document.pdf
+        cases[f"extract_text[budget]/{name}"] = _ignoring(
+            lambda pdf=pdf: extractor.extract_text(pdf), EmptyPdfError
+        )
+        cases[f"extract_text[full]/{name}"] = _ignoring(
+            lambda pdf=pdf: unbounded_extractor.extract_text(pdf), EmptyPdfError
+        )
+
+    for document in corpus:
+        if document.raw_text.strip():
+            raw_text = document.raw_text
+            cases[f"clean_text/{document.spec.name}"] = lambda raw_text=raw_text: (
+                extractor._clean_text(raw_text)
+            )
+
+    responses = json.loads(LLM_RESPONSES_PATH.read_text(encoding="utf-8"))
+    for response in responses:
+        content = response["content"]
+        cases[f"parse_response/{response['name']}"] = _ignoring(
+            lambda content=content: analyzer._parse_response(content), AiResponseParsingError
+        )
+
+    return cases
+
+
+def measure(fn: Callable[[], None], repeat: int) -> dict[str, float | int]:
+    """
+    Time a case.
+
+    The loop count is calibrated so each round takes at least 0.2 seconds;
+    the median of the rounds is the reported figure.
+
+    Args:
+        fn: The case to time.
+        repeat: Number of timed rounds.
+
+    Returns:
+        Per-call timings in seconds and the loop count per round.
+    """
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    rounds = [total / loops for total in timer.repeat(repeat=repeat, number=loops)]
+    return {
+        "median_s": statistics.median(rounds),
+        "min_s": min(rounds),
+        "stdev_s": statistics.stdev(rounds) if len(rounds) > 1 else 0.0,
+        "loops": loops,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=BENCHMARKS_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _format_time(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+def compare(
+    results: dict[str, dict], baseline: dict[str, dict], max_regression: float
+) -> list[str]:
+    """
+    Compare median timings with a baseline.
+
+    Args:
+        results: Timings of this run, keyed by case name.
+        baseline: Timings of the baseline run, keyed by case name.
+        max_regression: Allowed slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        Names of the cases slower than the allowed slowdown.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["median_s"] / baseline[name]["median_s"]
+        if ratio > 1 + max_regression:
+            regressions.append(name)
+        result["baseline_ratio"] = round(ratio, 3)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the ai-service microbenchmarks")
+    parser.add_argument("--filter", default="", help="Only run cases containing this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed rounds per case")
+    parser.add_argument("--output", type=Path, help="Results file (default: timestamped)")
+    parser.add_argument("--baseline", type=Path, help="Results file to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Allowed median slowdown against the baseline (default: 0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help=f"Also write the results to {BASELINE_PATH}"
+    )
+    args = parser.parse_args()
+
+    # Log calls inside the measured code should not time the log handlers
+    logging.disable(logging.CRITICAL)
+
+    cases = {name: fn for name, fn in build_cases().items() if args.filter in name}
+    results: dict[str, dict] = {}
+    for name, fn in cases.items():
+        results[name] = measure(fn, args.repeat)
+        print(
+            f"{name:<45} {_format_time(results[name]['median_s']):>10}  "
+            f"(min {_format_time(results[name]['min_s'])}, {results[name]['loops']} loops)"
+        )
+
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.max_regression)
+        for name in regressions:
+            print(f"REGRESSION {name}: {results[name]['baseline_ratio']:.2f}x the baseline median")
+
+    report = {
+        "created_at": datetime.now(UTC).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{datetime.now(UTC):%Y%m%dT%H%M%SZ}.json"
+    outputs = [output, BASELINE_PATH] if args.save_baseline else [output]
+    for path in outputs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {path}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
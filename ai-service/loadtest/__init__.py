@@ -0,0 +1,7 @@
+"""
+Load-test harness for ai-service.
+
+Run with `just loadtest` (or `uv run python -m loadtest.run`) from the
+ai-service directory. Everything runs in-process against local stand-ins
+for MinIO and Groq, so no network access is needed.
+"""
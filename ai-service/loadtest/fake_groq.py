@@ -0,0 +1,215 @@
+"""
+In-process stand-in for the Groq (OpenAI-compatible) chat completions API.
+
+Replies with recorded completions after a configurable latency, streamed
+as server-sent events when the request asks for it, and can reject a share of the calls with 429 responses carrying retry-after and
+rate-limit headers, as the real API does.
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHAT_COMPLETIONS_PATH = "/openai/v1/chat/completions"
+MODELS_PATH = "/openai/v1/models"
+
+# Rough average used to report prompt usage
+CHARS_PER_TOKEN = 4
+
+# Characters of the completion sent per streamed chunk
+STREAM_CHUNK_CHARS = 16
+
+
+class FakeGroqServer:
+    """
+    Serves chat completions from a list of recorded response contents.
+
+    Attributes:
+        latency_seconds: Mean delay before answering a call.
+        latency_jitter_seconds: Maximum random deviation from the mean delay.
+        rate_limit_ratio: Share of calls answered with 429.
+        retry_after_seconds: retry-after sent with 429 responses.
+        calls: Number of calls received.
+        rate_limited: Number of calls answered with 429.
+    """
+
+    def __init__(
+        self,
+        responses: list[str],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_seconds: float = 0.0,
+        latency_jitter_seconds: float = 0.0,
+        rate_limit_ratio: float = 0.0,
+        retry_after_seconds: float = 1.0,
+        seed: int | None = None,
+    ):
+        self.responses = responses
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after_seconds = retry_after_seconds
+        self.calls = 0
+        self.rate_limited = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to configure as GROQ_BASE_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _next_call(self) -> tuple[float, bool, str]:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency_seconds + self._random.uniform(
+                -self.latency_jitter_seconds, self.latency_jitter_seconds
+            )
+            rate_limited = self._random.random() < self.rate_limit_ratio
+            if rate_limited:
+                self.rate_limited += 1
+            content = self._random.choice(self.responses)
+        return max(0.0, delay), rate_limited, content
+
+    def _completion(self, request: dict, content: str) -> dict:
+        prompt_chars = sum(len(message.get("content", "")) for message in request["messages"])
+        prompt_tokens = prompt_chars // CHARS_PER_TOKEN
+        completion_tokens = len(content) // CHARS_PER_TOKEN
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _completion_chunks(self, request: dict, content: str) -> list[dict]:
+        completion = self._completion(request, content)
+        base = {
+            "id": completion["id"],
+            "object": "chat.completion.chunk",
+            "created": completion["created"],
+            "model": completion["model"],
+        }
+        pieces = [
+            content[i : i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)
+        ]
+        chunks = [
+            {**base, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            for piece in pieces
+        ]
+        # Groq sends the usage with the last chunk, under x_groq
+        chunks.append(
+            {
+                **base,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "x_groq": {"id": f"req_{uuid.uuid4().hex}", "usage": completion["usage"]},
+            }
+        )
+        return chunks
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                # Model listing, used by the service's health check
+                if self.path != MODELS_PATH:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+                    return
+                self._send_json(200, {"object": "list", "data": []})
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+
+                if self.path != CHAT_COMPLETIONS_PATH:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+                    return
+
+                delay, rate_limited, content = fake._next_call()
+                if rate_limited:
+                    self._send_json(
+                        429,
+                        {
+                            "error": {
+                                "message": "Rate limit reached",
+                                "type": "tokens",
+                                "code": "rate_limit_exceeded",
+                            }
+                        },
+                        {
+                            "retry-after": str(fake.retry_after_seconds),
+                            "x-ratelimit-remaining-requests": "0",
+                            "x-ratelimit-reset-requests": f"{fake.retry_after_seconds}s",
+                        },
+                    )
+                    return
+
+                request = json.loads(body)
+                if request.get("stream"):
+                    self._send_stream(delay, fake._completion_chunks(request, content))
+                    return
+
+                time.sleep(delay)
+                self._send_json(200, fake._completion(request, content))
+
+            def _send_stream(self, delay: float, chunks: list[dict]) -> None:
+                # The latency is spread over the chunks, as tokens are generated
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                for chunk in chunks:
+                    time.sleep(delay / len(chunks))
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+
+            def _send_json(
+                self, status: int, payload: dict, headers: dict[str, str] | None = None
+            ) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
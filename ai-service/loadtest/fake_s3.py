@@ -0,0 +1,135 @@
+"""
+In-process S3-compatible object store stand-in.
+
+Implements the subset of the S3 API used by the MinIO SDK in ai-service:
+bucket location and existence, ListObjectsV2, and GET/HEAD of objects.
+Requests are not authenticated.
+"""
+
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.sax.saxutils import escape
+
+S3_NAMESPACE = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+class FakeS3Server:
+    """
+    Serves objects held in memory over the S3 REST API.
+
+    Attributes:
+        latency_seconds: Delay added to every request.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self._objects: dict[tuple[str, str], tuple[bytes, str]] = {}
+        self._buckets: set[str] = set()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def endpoint(self) -> str:
+        """host:port the server listens on, as expected by the MinIO SDK."""
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def put_object(self, bucket: str, key: str, data: bytes) -> None:
+        self._buckets.add(bucket)
+        self._objects[(bucket, key)] = (data, hashlib.md5(data).hexdigest())
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                self._handle(send_body=True)
+
+            def do_HEAD(self) -> None:
+                self._handle(send_body=False)
+
+            def _handle(self, send_body: bool) -> None:
+                if store.latency_seconds:
+                    time.sleep(store.latency_seconds)
+
+                url = urlsplit(self.path)
+                query = parse_qs(url.query, keep_blank_values=True)
+                bucket, _, key = unquote(url.path).lstrip("/").partition("/")
+
+                if bucket not in store._buckets:
+                    self._error(404, "NoSuchBucket", send_body)
+                elif not key and "location" in query:
+                    self._xml(f'<LocationConstraint xmlns="{S3_NAMESPACE}"></LocationConstraint>')
+                elif not key and query.get("list-type") == ["2"]:
+                    prefix = query.get("prefix", [""])[0]
+                    self._xml(store._list_objects(bucket, prefix), send_body)
+                elif not key:
+                    self._send(200, b"", {}, send_body)
+                elif (bucket, key) in store._objects:
+                    data, etag = store._objects[(bucket, key)]
+                    headers = {
+                        "Content-Type": "application/pdf",
+                        "ETag": f'"{etag}"',
+                        "Last-Modified": formatdate(usegmt=True),
+                    }
+                    self._send(200, data, headers, send_body)
+                else:
+                    self._error(404, "NoSuchKey", send_body)
+
+            def _xml(self, body: str, send_body: bool = True) -> None:
+                self._send(200, body.encode(), {"Content-Type": "application/xml"}, send_body)
+
+            def _error(self, status: int, code: str, send_body: bool) -> None:
+                body = (
+                    f"<Error><Code>{code}</Code><Message>{code}</Message>"
+                    f"<Resource>{escape(self.path)}</Resource><RequestId>fake</RequestId></Error>"
+                )
+                self._send(status, body.encode(), {"Content-Type": "application/xml"}, send_body)
+
+            def _send(
+                self, status: int, body: bytes, headers: dict[str, str], send_body: bool
+            ) -> None:
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+        return Handler
+
+    def _list_objects(self, bucket: str, prefix: str) -> str:
+        contents = "".join(
+            f"<Contents><Key>{escape(key)}</Key>"
+            f"<LastModified>2024-01-01T00:00:00.000Z</LastModified>"
+            f'<ETag>"{etag}"</ETag><Size>{len(data)}</Size>'
+            f"<StorageClass>STANDARD</StorageClass></Contents>"
+            for (object_bucket, key), (data, etag) in sorted(self._objects.items())
+            if object_bucket == bucket and key.startswith(prefix)
+        )
+        return (
+            f'<ListBucketResult xmlns="{S3_NAMESPACE}"><Name>{escape(bucket)}</Name>'
+            f"<Prefix>{escape(prefix)}</Prefix><IsTruncated>false</IsTruncated>"
+            f"{contents}</ListBucketResult>"
+        )
@@ -0,0 +1,345 @@
+"""
+End-to-end load test of /analyze against local stand-ins.
+
+Starts an S3 stub holding the synthetic benchmark corpus, a fake Groq
+endpoint and the service itself, all in this process and bound to
+localhost, then drives /analyze either with a fixed number of concurrent
+clients (closed loop) or at a fixed Poisson arrival rate (open loop).
+
+Reports throughput, latency percentiles and the error-code distribution,
+writes them to loadtest/results/, and exits non-zero when a gate fails:
+
+    uv run python -m loadtest.run --concurrency 32 --duration 30
+    uv run python -m loadtest.run --rate 50 --duration 60 --groq-429-ratio 0.05
+    uv run python -m loadtest.run --baseline loadtest/results/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+from benchmarks.corpus import CORPUS_SPECS, generate_corpus
+from loadtest.fake_groq import FakeGroqServer
+from loadtest.fake_s3 import FakeS3Server
+
+LOADTEST_DIR = Path(__file__).parent
+RESULTS_DIR = LOADTEST_DIR / "results"
+LLM_RESPONSES_PATH = LOADTEST_DIR.parent / "benchmarks" / "data" / "llm_responses.json"
+BUCKET = "documents"
+# Time the service may take to report ready, as an orchestrator would wait for
+READY_TIMEOUT_SECONDS = 60.0
+
+# Well-formed recorded answers; malformed ones are covered by the benchmarks
+VALID_RESPONSES = {"referto_laboratorio", "ricetta", "non_medico", "tag_duplicati"}
+
+
+@dataclass
+class Sample:
+    """Outcome of one request: latency in seconds and OK or an error code."""
+
+    latency: float
+    outcome: str
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _recorded_responses() -> list[str]:
+    responses = json.loads(LLM_RESPONSES_PATH.read_text(encoding="utf-8"))
+    return [response["content"] for response in responses if response["name"] in VALID_RESPONSES]
+
+
+def _seed_documents(s3: FakeS3Server, count: int, include_scanned: bool) -> list[dict]:
+    specs = tuple(spec for spec in CORPUS_SPECS if include_scanned or spec.image_page_ratio < 1)
+    corpus = generate_corpus(specs)
+    documents = []
+    for i in range(count):
+        document = corpus[i % len(corpus)]
+        patient_id, document_id = f"patient-{i % 50}", f"doc-{i}"
+        key = f"patients/{patient_id}/documents/{document_id}/{document.spec.name}.pdf"
+        s3.put_object(BUCKET, key, document.pdf)
+        documents.append({"patient_id": patient_id, "document_id": document_id})
+    return documents
+
+
+def _configure_service(args: argparse.Namespace, s3: FakeS3Server, groq: FakeGroqServer) -> None:
+    # Must run before the service modules read their settings
+    work_dir = tempfile.mkdtemp(prefix="ai-service-loadtest-")
+    os.environ.update(
+        {
+            "MINIO_ENDPOINT": s3.endpoint,
+            "MINIO_SECURE": "false",
+            "MINIO_BUCKET_NAME": BUCKET,
+            "GROQ_API_KEY": "loadtest",
+            "GROQ_BASE_URL": groq.base_url,
+            "ANALYSIS_CACHE_ENABLED": str(args.cache).lower(),
+            "ANALYSIS_CACHE_DB_PATH": os.path.join(work_dir, "analysis_cache.sqlite3"),
+            "JOB_STORE_PATH": os.path.join(work_dir, "jobs.sqlite3"),
+            "LOG_LEVEL": args.log_level,
+        }
+    )
+
+
+def _start_service(port: int) -> tuple[uvicorn.Server, threading.Thread]:
+    config = uvicorn.Config("src.main:app", host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Service failed to start")
+        time.sleep(0.05)
+
+    # Traffic starts once /ready passes, as it would behind a readiness probe
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    while httpx.get(f"http://127.0.0.1:{port}/ready").status_code != 200:
+        if time.monotonic() > deadline:
+            server.should_exit = True
+            raise RuntimeError("Service did not become ready")
+        time.sleep(0.1)
+    return server, thread
+
+
+async def _send(client: httpx.AsyncClient, document: dict, started: float) -> Sample:
+    try:
+        response = await client.post("/analyze", json=document)
+        if response.status_code != 200:
+            outcome = f"HTTP_{response.status_code}"
+        else:
+            outcome = response.json().get("error_code") or "OK"
+    except httpx.HTTPError as e:
+        outcome = type(e).__name__
+    return Sample(latency=time.perf_counter() - started, outcome=outcome)
+
+
+async def run_closed_loop(
+    client: httpx.AsyncClient, documents: list[dict], concurrency: int, deadline: float, limit: int
+) -> list[Sample]:
+    """Run `concurrency` clients, each sending its next request when the previous returns."""
+    samples: list[Sample] = []
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline and len(samples) < limit:
+            document = documents[len(samples) % len(documents)]
+            samples.append(await _send(client, document, time.perf_counter()))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def run_open_loop(
+    client: httpx.AsyncClient, documents: list[dict], rate: float, deadline: float, limit: int
+) -> list[Sample]:
+    """
+    Send requests at Poisson arrivals, independently of the responses.
+
+    Latency is measured from the scheduled send time, so a stalled service
+    is not hidden by the generator waiting for it.
+    """
+    rng = random.Random(0)
+    tasks = []
+    next_send = time.perf_counter()
+    while next_send < deadline and len(tasks) < limit:
+        await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+        document = documents[len(tasks) % len(documents)]
+        tasks.append(asyncio.create_task(_send(client, document, next_send)))
+        next_send += rng.expovariate(rate)
+    return list(await asyncio.gather(*tasks))
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict:
+    """
+    Aggregate the samples of a run.
+
+    Args:
+        samples: One sample per request.
+        elapsed: Wall-clock duration of the run in seconds.
+
+    Returns:
+        Throughput, latency percentiles in milliseconds and outcome counts.
+    """
+    latencies = sorted(sample.latency * 1000 for sample in samples)
+    outcomes = Counter(sample.outcome for sample in samples)
+    errors = len(samples) - outcomes["OK"]
+    return {
+        "requests": len(samples),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2),
+        }
+        if latencies
+        else {},
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "outcomes": dict(outcomes.most_common()),
+    }
+
+
+def check_gates(summary: dict, args: argparse.Namespace) -> list[str]:
+    """
+    Evaluate the configured gates.
+
+    Args:
+        summary: Result of summarize().
+        args: Command line arguments holding the thresholds.
+
+    Returns:
+        A description of every failed gate.
+    """
+    failures = []
+    latency = summary["latency_ms"]
+    if not latency:
+        return ["no requests completed"]
+
+    for percentile, limit in (("p95", args.max_p95_ms), ("p99", args.max_p99_ms)):
+        if limit is not None and latency[percentile] > limit:
+            failures.append(f"{percentile} {latency[percentile]}ms > {limit}ms")
+
+    if args.max_error_rate is not None and summary["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {summary['error_rate']} > {args.max_error_rate}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["summary"]["latency_ms"]
+        for percentile in ("p50", "p95", "p99"):
+            allowed = baseline[percentile] * (1 + args.max_regression)
+            if latency[percentile] > allowed:
+                failures.append(
+                    f"{percentile} {latency[percentile]}ms > {allowed:.2f}ms "
+                    f"(baseline {baseline[percentile]}ms + {args.max_regression:.0%})"
+                )
+    return failures
+
+
+async def drive(args: argparse.Namespace, base_url: str, documents: list[dict]) -> dict:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        if args.warmup:
+            await run_closed_loop(
+                client, documents, args.concurrency, time.perf_counter() + 3600, args.warmup
+            )
+
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        if args.rate:
+            samples = await run_open_loop(client, documents, args.rate, deadline, args.requests)
+        else:
+            samples = await run_closed_loop(
+                client, documents, args.concurrency, deadline, args.requests
+            )
+        return summarize(samples, time.perf_counter() - started)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test /analyze against local stand-ins")
+    load = parser.add_argument_group("load")
+    load.add_argument("--concurrency", type=int, default=16, help="Closed-loop clients")
+    load.add_argument("--rate", type=float, help="Open-loop arrival rate (req/s)")
+    load.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    load.add_argument("--requests", type=int, default=sys.maxsize, help="Stop after N requests")
+    load.add_argument("--warmup", type=int, default=20, help="Requests sent before measuring")
+    load.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout")
+
+    stand_ins = parser.add_argument_group("stand-ins")
+    stand_ins.add_argument("--documents", type=int, default=200, help="Distinct documents")
+    stand_ins.add_argument(
+        "--include-scanned", action="store_true", help="Include image-only PDFs (extraction errors)"
+    )
+    stand_ins.add_argument("--s3-latency-ms", type=float, default=2.0)
+    stand_ins.add_argument("--groq-latency-ms", type=float, default=800.0)
+    stand_ins.add_argument("--groq-jitter-ms", type=float, default=300.0)
+    stand_ins.add_argument("--groq-429-ratio", type=float, default=0.0)
+    stand_ins.add_argument("--groq-retry-after", type=float, default=1.0)
+
+    service = parser.add_argument_group("service")
+    service.add_argument("--cache", action="store_true", help="Enable the analysis cache")
+    service.add_argument("--log-level", default="WARNING")
+
+    gates = parser.add_argument_group("gates")
+    gates.add_argument("--max-p95-ms", type=float)
+    gates.add_argument("--max-p99-ms", type=float)
+    gates.add_argument("--max-error-rate", type=float)
+    gates.add_argument("--baseline", type=Path, help="Results file to compare latencies against")
+    gates.add_argument("--max-regression", type=float, default=0.2)
+
+    parser.add_argument("--output", type=Path, help="Results file (default: timestamped)")
+    parser.add_argument("--save-baseline", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    s3 = FakeS3Server(latency_seconds=args.s3_latency_ms / 1000)
+    groq = FakeGroqServer(
+        _recorded_responses(),
+        latency_seconds=args.groq_latency_ms / 1000,
+        latency_jitter_seconds=args.groq_jitter_ms / 1000,
+        rate_limit_ratio=args.groq_429_ratio,
+        retry_after_seconds=args.groq_retry_after,
+        seed=0,
+    )
+    documents = _seed_documents(s3, args.documents, args.include_scanned)
+    s3.start()
+    groq.start()
+    _configure_service(args, s3, groq)
+
+    port = _free_port()
+    server, thread = _start_service(port)
+    try:
+        summary = asyncio.run(drive(args, f"http://127.0.0.1:{port}", documents))
+    finally:
+        server.should_exit = True
+        thread.join()
+        groq.stop()
+        s3.stop()
+
+    summary["groq_calls"] = groq.calls
+    summary["groq_rate_limited"] = groq.rate_limited
+    failures = check_gates(summary, args)
+
+    print(json.dumps(summary, indent=2))
+    for failure in failures:
+        print(f"GATE FAILED: {failure}")
+
+    report = {
+        "created_at": datetime.now(UTC).isoformat(),
+        "arguments": {key: str(value) for key, value in vars(args).items()},
+        "summary": summary,
+    }
+    output = args.output or RESULTS_DIR / f"{datetime.now(UTC):%Y%m%dT%H%M%SZ}.json"
+    outputs = [output, RESULTS_DIR / "baseline.json"] if args.save_baseline else [output]
+    for path in outputs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {path}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,10 +5,26 @@ All configuration is loaded from environment variables.
 
 from functools import lru_cache
 
-from pydantic import Field
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class ModelRoute(BaseModel):
+    """A row of the model routing table."""
+
+    name: str = Field(description="Route name, used in logs and metrics")
+    max_input_chars: int | None = Field(
+        default=None, description="Largest prompt, in characters, sent to this route (None: any)"
+    )
+    model: str = Field(description="Groq model tried first")
+    max_tokens: int | None = Field(
+        default=None, description="Completion token limit (None: groq_max_tokens)"
+    )
+    fallback_models: list[str] = Field(
+        default=[], description="Models tried in order on rate limits, timeouts and outages"
+    )
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
@@ -21,6 +37,46 @@ class Settings(BaseSettings):
 
     # HTTP Server Configuration
     http_port: int = Field(default=8000, description="Port for HTTP server")
+    io_worker_threads: int = Field(
+        default=32, description="Threads available for blocking I/O and CPU-bound work"
+    )
+
+    # Admission Control Configuration
+    admission_max_in_flight: int = Field(
+        default=32,
+        description="Documents analyzed at once by /analyze, /analyze/stream and batches",
+    )
+    admission_max_queue: int = Field(
+        default=64, description="Analysis requests waiting for admission before arrivals are shed"
+    )
+    admission_queue_target_seconds: float = Field(
+        default=0.5, description="Acceptable standing queue delay (CoDel target)"
+    )
+    admission_queue_interval_seconds: float = Field(
+        default=5.0, description="Window over which the queue delay must stay above target"
+    )
+    admission_queue_timeout_seconds: float = Field(
+        default=10.0, description="Longest wait for admission while the queue is draining"
+    )
+    admission_retry_after_seconds: int = Field(
+        default=2, description="Retry-After sent with shed requests"
+    )
+
+    # Readiness Configuration
+    readiness_probe_interval_seconds: float = Field(
+        default=15.0, description="Interval between background health checks of dependencies"
+    )
+    readiness_probe_timeout_seconds: float = Field(
+        default=5.0, description="Time after which a dependency health check counts as failed"
+    )
+
+    # HTTP Connection Pool Configuration
+    http_keepalive_seconds: float = Field(
+        default=120.0, description="Idle time after which pooled connections are closed"
+    )
+    http_connect_timeout_seconds: float = Field(
+        default=5.0, description="Timeout for opening a connection to Groq or MinIO"
+    )
 
     # MinIO Configuration
     minio_endpoint: str = Field(default="minio:9000", description="MinIO server endpoint")
@@ -28,23 +84,209 @@ class Settings(BaseSettings):
     minio_secret_key: str = Field(default="minioadmin", description="MinIO secret key")
     minio_bucket_name: str = Field(default="documents", description="MinIO bucket name")
     minio_secure: bool = Field(default=False, description="Use HTTPS for MinIO connection")
+    minio_key_cache_ttl_seconds: float = Field(
+        default=300.0, description="Lifetime of cached document object names (0 disables)"
+    )
+    minio_key_cache_max_entries: int = Field(
+        default=10_000, description="Maximum cached document object names"
+    )
+
+    # Document Size Configuration
+    document_max_size_bytes: int = Field(
+        default=256 * 1024 * 1024, description="Largest document accepted for analysis"
+    )
+    document_spool_threshold_bytes: int = Field(
+        default=8 * 1024 * 1024, description="Size from which a document is spooled to disk"
+    )
+    document_memory_budget_bytes: int = Field(
+        default=128 * 1024 * 1024,
+        description="Document bytes held in memory across requests before spooling to disk",
+    )
+    document_spool_dir: str = Field(
+        default="", description="Directory of spooled documents (empty: system temp directory)"
+    )
+
+    # Pipeline Concurrency Configuration
+    fetch_concurrency: int = Field(default=16, description="Concurrent MinIO document fetches")
+    extract_concurrency: int = Field(default=4, description="Concurrent PDF extractions")
+    llm_concurrency: int = Field(default=8, description="Concurrent AI analysis calls")
+
+    # PDF Extraction Configuration
+    pdf_extraction_workers: int = Field(
+        default=2, description="Worker processes for PDF extraction (0 extracts in threads)"
+    )
+    pdf_extraction_timeout_seconds: float = Field(
+        default=30.0, description="Maximum time to extract a single PDF"
+    )
+    pdf_extraction_max_tasks_per_child: int = Field(
+        default=200, description="PDFs a worker extracts before it is replaced"
+    )
+    pdf_sampling_min_pages: int = Field(
+        default=50, description="Page count from which only head and tail pages are extracted"
+    )
+    pdf_sample_head_pages: int = Field(
+        default=20, description="Leading pages extracted from sampled documents"
+    )
+    pdf_sample_tail_pages: int = Field(
+        default=5, description="Trailing pages extracted from sampled documents"
+    )
+
+    # Text Normalization Configuration
+    text_normalization_enabled: bool = Field(
+        default=True, description="Strip repeated headers/footers and boilerplate before the AI"
+    )
+    text_repeated_line_min_ratio: float = Field(
+        default=0.5, description="Fraction of pages a line must appear on to count as repeated"
+    )
+
+    # Document Classifier Configuration
+    classifier_enabled: bool = Field(
+        default=False, description="Skip the AI for documents classified locally as non-medical"
+    )
+    classifier_min_non_medical_terms: int = Field(
+        default=5, description="Administrative terms needed to classify a document as non-medical"
+    )
+    classifier_max_medical_ratio: float = Field(
+        default=0.1,
+        description="Maximum share of medical terms among matched terms for a non-medical document",
+    )
 
     # Groq AI Configuration
     groq_api_key: str = Field(..., description="Groq API key")
+    groq_base_url: str | None = Field(
+        default=None, description="Groq API base URL override, e.g. a local stand-in"
+    )
     groq_model: str = Field(default="openai/gpt-oss-120b", description="Groq model to use")
     groq_max_tokens: int = Field(default=1024, description="Maximum tokens for AI response")
+    groq_timeout_seconds: float = Field(default=60.0, description="Timeout for a Groq call")
+    groq_http2: bool = Field(default=True, description="Multiplex Groq calls over HTTP/2")
     groq_temperature: float = Field(default=0.1, description="Temperature for AI response")
+    groq_model_routes: list[ModelRoute] = Field(
+        default=[],
+        description="Routing table, first matching route wins (empty: groq_model for everything)",
+    )
+    groq_route_max_wait_seconds: float = Field(
+        default=2.0,
+        description="Rate-limit wait after which a route prefers its fallback models",
+    )
+    groq_requests_per_minute: int = Field(
+        default=1000, description="Groq request quota per minute and model, enforced client-side"
+    )
+    groq_tokens_per_minute: int = Field(
+        default=250_000, description="Groq token quota per minute and model, enforced client-side"
+    )
+    ai_max_input_chars: int = Field(
+        default=15_000, description="Maximum document characters sent to the AI in one call"
+    )
+    ai_chunking_enabled: bool = Field(
+        default=False, description="Analyze longer documents in chunks instead of truncating"
+    )
+    ai_chunk_max_chars: int = Field(default=12_000, description="Maximum characters per chunk")
+    ai_max_chunks: int = Field(default=8, description="Maximum chunks analyzed per document")
+    ai_chunk_concurrency: int = Field(
+        default=4, description="Concurrent chunk analyses per document"
+    )
+    ai_packing_enabled: bool = Field(
+        default=False, description="Analyze short documents together in shared AI calls"
+    )
+    ai_packing_max_document_chars: int = Field(
+        default=2_000, description="Maximum characters of a document to be packed"
+    )
+    ai_packing_max_documents: int = Field(
+        default=8, description="Maximum documents per packed AI call"
+    )
+    ai_packing_window_seconds: float = Field(
+        default=0.05, description="Time to wait for more documents before a packed call"
+    )
+    ai_packing_max_tokens_per_document: int = Field(
+        default=400, description="Completion tokens allowed per document of a packed call"
+    )
+
+    # Analysis Cache Configuration
+    analysis_cache_enabled: bool = Field(default=True, description="Cache AI analysis results")
+    analysis_cache_memory_entries: int = Field(
+        default=1024, description="Maximum analysis results kept in memory"
+    )
+    analysis_cache_memory_ttl_seconds: float = Field(
+        default=3600.0, description="Lifetime of in-memory analysis results"
+    )
+    analysis_cache_db_path: str = Field(
+        default=".cache/analysis_cache.sqlite3",
+        description="SQLite file for persistent analysis results (empty disables it)",
+    )
+    analysis_cache_disk_ttl_seconds: float = Field(
+        default=30 * 24 * 3600.0, description="Lifetime of persisted analysis results"
+    )
+
+    # Job Queue Configuration
+    job_workers: int = Field(default=4, description="Workers draining the analysis job queue")
+    job_queue_max_size: int = Field(default=1000, description="Maximum queued analysis jobs")
+    job_store_backend: str = Field(
+        default="sqlite", description="Job persistence backend: 'memory' or 'sqlite'"
+    )
+    job_store_path: str = Field(
+        default=".cache/jobs.sqlite3",
+        description="SQLite file of the sqlite job store; on a persistent volume, one per replica",
+    )
+    job_retention_seconds: float = Field(
+        default=24 * 3600.0, description="How long finished jobs can be polled"
+    )
+    job_callback_timeout_seconds: float = Field(
+        default=10.0, description="Timeout for job completion callbacks"
+    )
+    job_callback_allowed_hosts: list[str] = Field(
+        default=[],
+        description="Hosts job completion callbacks may be sent to (empty: callbacks disabled)",
+    )
+
+    # Document Events Configuration
+    kafka_bootstrap_servers: str = Field(
+        default="", description="Kafka bootstrap servers (empty disables the events consumer)"
+    )
+    kafka_client_id: str = Field(default="ai-service", description="Kafka client id")
+    kafka_consumer_group_id: str = Field(default="ai-service", description="Kafka consumer group")
+    kafka_topic_document_created: str = Field(
+        default="documents.document-created", description="Topic of uploaded documents"
+    )
+    kafka_topic_document_updated: str = Field(
+        default="documents.document-updated", description="Topic of updated documents"
+    )
+    kafka_topic_document_analyzed: str = Field(
+        default="documents.document-analyzed", description="Topic analysis results are published to"
+    )
+    document_event_workers: int = Field(
+        default=4, description="Document events analyzed concurrently"
+    )
+    document_event_max_poll_records: int = Field(
+        default=50, description="Maximum document events read in one poll"
+    )
+    document_event_max_attempts: int = Field(
+        default=3, description="Attempts before a transient analysis failure is published"
+    )
 
     # Retry Configuration
     max_retries: int = Field(default=3, description="Maximum retry attempts for external services")
     retry_delay_seconds: float = Field(default=1.0, description="Initial delay between retries")
+    retry_max_delay_seconds: float = Field(
+        default=10.0, description="Maximum delay between two retries"
+    )
+    retry_budget_seconds: float = Field(
+        default=20.0, description="Total time a call may spend retrying before giving up"
+    )
+    circuit_failure_threshold: int = Field(
+        default=5, description="Consecutive failures that open a dependency's circuit"
+    )
+    circuit_reset_timeout_seconds: float = Field(
+        default=30.0, description="Seconds an open circuit waits before a trial call"
+    )
 
     # Logging Configuration
     log_level: str = Field(default="INFO", description="Logging level")
     log_format: str = Field(
         default="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        description="Log format string",
+        description="Log format string, used when JSON logging is disabled",
     )
+    log_json: bool = Field(default=True, description="Write logs as JSON lines")
 
 
 @lru_cache
@@ -1,36 +1,76 @@
+import asyncio
+import json
+import time
+import weakref
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from pydantic import BaseModel, Field, HttpUrl, field_validator
 
 from src.config import get_settings
 from src.services import (
+    AdmissionController,
+    AdmissionRejectedError,
     AiAnalysisError,
     AiAnalyzer,
     AiConnectionError,
     AiResponseParsingError,
+    AnalysisCache,
+    AnalysisPipeline,
     CorruptedPdfError,
+    DocumentEvent,
+    DocumentEventsConsumer,
     DocumentNotFoundError,
+    DocumentTooLargeError,
     EmptyPdfError,
+    Job,
+    JobQueue,
+    JobQueueFullError,
+    KafkaEventBroker,
     MinioClient,
     MinioClientError,
     MinioConnectionError,
     PdfExtractionError,
-    PdfExtractor,
+    PdfExtractionPool,
+    PdfExtractionTimeoutError,
+    ReadinessProber,
+    create_job_store,
+    is_callback_allowed,
 )
-from src.utils.logger import get_logger, setup_logging
+from src.utils.logger import get_logger, log_context, setup_logging
+from src.utils.metrics import ANALYSES, ANALYSES_IN_FLIGHT, ANALYSIS_DURATION
 
 setup_logging()
 logger = get_logger(__name__)
 
+admission_controller: AdmissionController | None = None
 minio_client: MinioClient | None = None
-pdf_extractor: PdfExtractor | None = None
+pdf_extraction_pool: PdfExtractionPool | None = None
 ai_analyzer: AiAnalyzer | None = None
+analysis_cache: AnalysisCache | None = None
+analysis_pipeline: AnalysisPipeline | None = None
+job_queue: JobQueue | None = None
+document_events_consumer: DocumentEventsConsumer | None = None
+readiness_prober: ReadinessProber | None = None
+
+# Upper bound on the number of documents accepted by /analyze/batch
+MAX_BATCH_SIZE = 100
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global minio_client, pdf_extractor, ai_analyzer
+    global \
+        admission_controller, \
+        minio_client, \
+        pdf_extraction_pool, \
+        ai_analyzer, \
+        analysis_cache, \
+        analysis_pipeline
+    global job_queue, document_events_consumer, readiness_prober
 
     logger.info("=" * 60)
     logger.info("Starting AI Service for Medical Document Analysis")
@@ -39,25 +79,71 @@ async def lifespan(app: FastAPI):
     try:
         settings = get_settings()
         logger.info("Configuration loaded:")
-        logger.info(f"  - HTTP Port: {settings.http_port}")
-        logger.info(f"  - MinIO Endpoint: {settings.minio_endpoint}")
-        logger.info(f"  - MinIO Bucket: {settings.minio_bucket_name}")
-        logger.info(f"  - AI Model: {settings.groq_model}")
-        logger.info(f"  - Log Level: {settings.log_level}")
+        logger.info("  - HTTP Port: %s", settings.http_port)
+        logger.info("  - I/O Worker Threads: %s", settings.io_worker_threads)
+        logger.info("  - PDF Extraction Workers: %s", settings.pdf_extraction_workers)
+        logger.info("  - MinIO Endpoint: %s", settings.minio_endpoint)
+        logger.info("  - MinIO Bucket: %s", settings.minio_bucket_name)
+        logger.info("  - AI Model: %s", settings.groq_model)
+        logger.info("  - AI Model Routes: %s", len(settings.groq_model_routes) or "default")
+        logger.info(
+            "  - Kafka Bootstrap Servers: %s", settings.kafka_bootstrap_servers or "disabled"
+        )
+        logger.info("  - Log Level: %s", settings.log_level)
     except Exception as e:
-        logger.error(f"Failed to load configuration: {e}")
+        logger.error("Failed to load configuration: %s", e)
         raise
 
+    # Blocking storage calls are offloaded to this executor
+    executor = ThreadPoolExecutor(
+        max_workers=settings.io_worker_threads, thread_name_prefix="ai-service-io"
+    )
+    asyncio.get_running_loop().set_default_executor(executor)
+
     logger.info("Initializing services...")
+    admission_controller = AdmissionController()
     minio_client = MinioClient()
-    pdf_extractor = PdfExtractor()
+    pdf_extraction_pool = PdfExtractionPool()
     ai_analyzer = AiAnalyzer()
+    analysis_cache = AnalysisCache()
+    analysis_pipeline = AnalysisPipeline(
+        minio_client, pdf_extraction_pool, ai_analyzer, analysis_cache
+    )
+    job_queue = JobQueue(create_job_store(settings), _run_job)
+    await job_queue.start()
+
+    # Connects to Kafka in the background, retrying while it is unreachable
+    if settings.kafka_bootstrap_servers:
+        document_events_consumer = DocumentEventsConsumer(
+            KafkaEventBroker(settings), _run_document_event
+        )
+        await document_events_consumer.start()
+    else:
+        logger.info("Document events consumer is disabled: missing Kafka configuration")
+
+    # Warm-up and dependency checks run in the background; /ready reports when they pass.
+    # Groq is only reported: its outages are handled by the circuit breakers, and cache hits,
+    # skipped documents and job polling keep working without it.
+    readiness_prober = ReadinessProber(
+        checks={"minio": minio_client.health_check, "groq": ai_analyzer.health_check},
+        warm_ups=[pdf_extraction_pool.warm_up],
+        optional={"groq"},
+    )
+    readiness_prober.start()
 
-    logger.info("AI Service ready!")
+    logger.info("AI Service started, waiting for readiness")
 
     yield
 
     logger.info("Shutting down AI Service...")
+    await readiness_prober.stop()
+    if document_events_consumer is not None:
+        await document_events_consumer.stop()
+    await job_queue.stop()
+    await ai_analyzer.close()
+    pdf_extraction_pool.shutdown()
+    analysis_cache.close()
+    executor.shutdown(wait=False, cancel_futures=True)
 
 
 app = FastAPI(
@@ -73,6 +159,8 @@ class AnalyzeRequest(BaseModel):
 
     document_id: str
     patient_id: str
+    # Object file name under the document prefix; skips the object lookup when set
+    filename: str | None = Field(default=None, pattern=r"^[^/\\]+$")
 
 
 class AnalyzeResponse(BaseModel):
@@ -85,6 +173,52 @@ class AnalyzeResponse(BaseModel):
     error_message: str | None = None
 
 
+class BatchAnalyzeRequest(BaseModel):
+    """Request model for batch document analysis."""
+
+    items: list[AnalyzeRequest] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BatchAnalyzeItemResponse(AnalyzeResponse):
+    """Per-document result of a batch analysis."""
+
+    document_id: str
+    patient_id: str
+
+
+class BatchAnalyzeResponse(BaseModel):
+    """Response model for batch document analysis, in request order."""
+
+    results: list[BatchAnalyzeItemResponse]
+
+
+class JobRequest(AnalyzeRequest):
+    """Request model for submitting an analysis job."""
+
+    # Receives the finished job, results included; restricted to job_callback_allowed_hosts
+    callback_url: HttpUrl | None = None
+
+    @field_validator("callback_url")
+    @classmethod
+    def _check_callback_host(cls, url: HttpUrl | None) -> HttpUrl | None:
+        if url is not None and not is_callback_allowed(str(url), get_settings()):
+            raise ValueError(f"callback host not allowed: {url.host}")
+        return url
+
+
+class JobResponse(BaseModel):
+    """Response model describing an analysis job."""
+
+    job_id: str
+    status: str
+    document_id: str
+    patient_id: str
+    result: AnalyzeResponse | None = None
+    error_message: str | None = None
+    created_at: float
+    updated_at: float
+
+
 class HealthResponse(BaseModel):
     """Response model for health check."""
 
@@ -92,12 +226,87 @@ class HealthResponse(BaseModel):
     service: str
 
 
+class DependencyStatusResponse(BaseModel):
+    """Cached health of a dependency."""
+
+    healthy: bool
+    checked_at: float | None
+    required: bool
+
+
+class ReadinessResponse(BaseModel):
+    """Response model for readiness check."""
+
+    status: str
+    service: str
+    warmed_up: bool
+    dependencies: dict[str, DependencyStatusResponse]
+
+
+class CacheStatsResponse(BaseModel):
+    """Response model for analysis cache statistics."""
+
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    hit_ratio: float
+    memory_entries: int
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint."""
+    """Liveness endpoint: the process is up and serving requests."""
     return HealthResponse(status="healthy", service="ai-service")
 
 
+@app.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ReadinessResponse}},
+)
+async def readiness_check(response: Response):
+    """
+    Readiness endpoint, answered from the background prober's cached results.
+
+    Returns 503 until warm-up has finished and while MinIO fails its latest
+    health check. Groq is reported as well, but does not affect readiness.
+    """
+    ready = readiness_prober.ready
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return ReadinessResponse(
+        status="ready" if ready else "not_ready",
+        service="ai-service",
+        warmed_up=readiness_prober.warmed_up,
+        dependencies={
+            name: DependencyStatusResponse(
+                healthy=dep.healthy, checked_at=dep.checked_at, required=dep.required
+            )
+            for name, dep in readiness_prober.statuses().items()
+        },
+    )
+
+
+@app.get("/cache/stats", response_model=CacheStatsResponse)
+async def cache_stats():
+    """Hit and miss counters of the analysis result cache."""
+    stats = analysis_cache.stats()
+    return CacheStatsResponse(
+        memory_hits=stats.memory_hits,
+        disk_hits=stats.disk_hits,
+        misses=stats.misses,
+        hit_ratio=stats.hit_ratio,
+        memory_entries=stats.memory_entries,
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: stage latencies, document sizes, token usage and errors."""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_document(request: AnalyzeRequest):
     """
@@ -106,43 +315,266 @@ async def analyze_document(request: AnalyzeRequest):
     - Fetches the PDF from MinIO using document_id and patient_id
     - Extracts text from the PDF
     - Uses Groq AI to generate summary and tags
+
+    Returns 503 with Retry-After when the request is shed under overload.
     """
-    document_id = request.document_id
-    patient_id = request.patient_id
+    await _admit(request.document_id)
+    try:
+        return await _analyze(request)
+    finally:
+        admission_controller.release()
 
-    logger.info(f"Analyzing document: {document_id} for patient: {patient_id}")
+
+@app.post("/analyze/stream")
+async def analyze_document_stream(request: AnalyzeRequest):
+    """
+    Analyze a document, reporting progress as Server-Sent Events.
+
+    - `fetched` and `extracted` when the PDF is downloaded and its text extracted
+    - `summary` with each new piece of the summary while the AI writes it
+    - `done` with the same body /analyze returns, or `error` if it failed
+
+    Returns 503 with Retry-After, before any event, when the request is shed.
+    """
+    await _admit(request.document_id)
+    return StreamingResponse(
+        _releasing_admission(_analysis_events(request)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/analyze/batch", response_model=BatchAnalyzeResponse)
+async def analyze_documents_batch(request: BatchAnalyzeRequest):
+    """
+    Analyze many documents concurrently.
+
+    Items run through the same pipeline as /analyze, bounded by its per-stage
+    concurrency limits. Each item reports its own success or error code, so
+    a failing document does not fail the batch. The batch takes an admission
+    slot per document and is shed as a whole under overload.
+    """
+    weight = len(request.items)
+    await _admit(f"batch of {weight}", weight)
+    logger.info("Analyzing batch of %s document(s)", weight)
 
     try:
-        logger.debug(f"Fetching document {document_id} from MinIO")
-        pdf_content = minio_client.fetch_document(patient_id, document_id)
+        responses = await asyncio.gather(*(_analyze(item) for item in request.items))
+    finally:
+        admission_controller.release(weight)
+
+    results = [
+        BatchAnalyzeItemResponse(
+            document_id=item.document_id,
+            patient_id=item.patient_id,
+            **response.model_dump(),
+        )
+        for item, response in zip(request.items, responses, strict=True)
+    ]
+    failed = sum(1 for result in results if not result.success)
+    logger.info("Batch complete: %s succeeded, %s failed", len(results) - failed, failed)
 
-        logger.debug(f"Extracting text from document {document_id}")
-        document_text = pdf_extractor.extract_text(pdf_content)
+    return BatchAnalyzeResponse(results=results)
 
-        logger.debug(f"Analyzing document {document_id} with AI")
-        metadata = ai_analyzer.analyze(document_text)
 
-        logger.info(
-            f"Successfully analyzed document {document_id}: "
-            f"summary_length={len(metadata.summary)}, tags_count={len(metadata.tags)}"
+@app.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(request: JobRequest):
+    """
+    Queue a document for analysis and return immediately.
+
+    Poll GET /jobs/{job_id} for the result, or pass callback_url to receive
+    the finished job as a POST. Callback URLs must point to one of the hosts
+    in job_callback_allowed_hosts; others are rejected with 422.
+    """
+    try:
+        job = await job_queue.submit(
+            request.patient_id,
+            request.document_id,
+            request.filename,
+            str(request.callback_url) if request.callback_url else None,
         )
+    except JobQueueFullError as e:
+        logger.warning("Rejecting job for document %s: %s", request.document_id, e)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
 
-        return AnalyzeResponse(
-            success=True,
-            summary=metadata.summary,
-            tags=metadata.tags,
+    return _job_response(job)
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Return the status of an analysis job, with its result once finished."""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    return _job_response(job)
+
+
+async def _admit(document_id: str, weight: int = 1) -> None:
+    """Take admission slots, or answer 503 with Retry-After if the request is shed."""
+    try:
+        await admission_controller.acquire(weight)
+    except AdmissionRejectedError as e:
+        logger.warning("Rejecting analysis of %s: %s", document_id, e)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after_seconds)},
+        ) from e
+
+
+def _releasing_admission(events: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Release the admission slot once the stream ends or, if never started, is dropped."""
+    released = False
+
+    def release() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            admission_controller.release()
+
+    async def stream() -> AsyncIterator[str]:
+        try:
+            async for event in events:
+                yield event
+        finally:
+            release()
+
+    releasing = stream()
+    weakref.finalize(releasing, release)
+    return releasing
+
+
+def _job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        document_id=job.document_id,
+        patient_id=job.patient_id,
+        result=AnalyzeResponse(**job.result) if job.result else None,
+        error_message=job.error_message,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+async def _run_job(job: Job) -> dict:
+    response = await _analyze(
+        AnalyzeRequest(
+            document_id=job.document_id, patient_id=job.patient_id, filename=job.filename
         )
+    )
+    return response.model_dump()
+
+
+async def _run_document_event(event: DocumentEvent) -> dict:
+    response = await _analyze(
+        AnalyzeRequest(
+            document_id=event.document_id, patient_id=event.patient_id, filename=event.filename
+        )
+    )
+    return response.model_dump()
+
+
+async def _analyze(request: AnalyzeRequest) -> AnalyzeResponse:
+    """Analyze one document, recording its duration and outcome."""
+    start = time.perf_counter()
+    with log_context(document_id=request.document_id), ANALYSES_IN_FLIGHT.track_inprogress():
+        response = await _analyze_document(request)
+        _record_analysis(request.document_id, start, response)
+
+    return response
 
+
+async def _analysis_events(request: AnalyzeRequest) -> AsyncIterator[str]:
+    """Stream the analysis of one document as Server-Sent Events."""
+    document_id = request.document_id
+    start = time.perf_counter()
+    with log_context(document_id=document_id), ANALYSES_IN_FLIGHT.track_inprogress():
+        logger.info(
+            "Streaming analysis of document: %s for patient: %s", document_id, request.patient_id
+        )
+
+        try:
+            async for event, data in analysis_pipeline.analyze_stream(
+                request.patient_id, document_id, request.filename
+            ):
+                if event == "result":
+                    response = AnalyzeResponse(success=True, **data)
+                else:
+                    yield _sse_event(event, data)
+        except Exception as e:
+            response = _error_response(document_id, e)
+
+        yield _sse_event("done" if response.success else "error", response.model_dump())
+        _record_analysis(document_id, start, response)
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _record_analysis(document_id: str, start: float, response: AnalyzeResponse) -> None:
+    duration = time.perf_counter() - start
+    outcome = response.error_code or "OK"
+    ANALYSIS_DURATION.observe(duration)
+    ANALYSES.labels(outcome).inc()
+    logger.info(
+        "Analysis of document %s finished in %.1fms: %s",
+        document_id,
+        duration * 1000,
+        outcome,
+        extra={"duration_ms": round(duration * 1000, 1), "outcome": outcome},
+    )
+
+
+async def _analyze_document(request: AnalyzeRequest) -> AnalyzeResponse:
+    """Run the analysis pipeline for one document, mapping failures to error codes."""
+    document_id = request.document_id
+    patient_id = request.patient_id
+
+    logger.info("Analyzing document: %s for patient: %s", document_id, patient_id)
+
+    try:
+        metadata = await analysis_pipeline.analyze(patient_id, document_id, request.filename)
+    except Exception as e:
+        return _error_response(document_id, e)
+
+    logger.info(
+        "Successfully analyzed document %s: summary_length=%s, tags_count=%s",
+        document_id,
+        len(metadata.summary),
+        len(metadata.tags),
+    )
+
+    return AnalyzeResponse(
+        success=True,
+        summary=metadata.summary,
+        tags=metadata.tags,
+    )
+
+
+def _error_response(document_id: str, error: Exception) -> AnalyzeResponse:
+    """Map a pipeline failure to the error code and message returned to clients."""
+    try:
+        raise error
     except DocumentNotFoundError:
-        logger.warning(f"Document not found: {document_id}")
+        logger.warning("Document not found: %s", document_id)
         return AnalyzeResponse(
             success=False,
             error_code="DOCUMENT_NOT_FOUND",
             error_message=f"Document not found: {document_id}",
         )
 
+    except DocumentTooLargeError as e:
+        return AnalyzeResponse(
+            success=False,
+            error_code="DOCUMENT_TOO_LARGE",
+            error_message=str(e),
+        )
+
     except MinioConnectionError as e:
-        logger.error(f"MinIO connection error: {e}")
+        logger.error("MinIO connection error: %s", e)
         return AnalyzeResponse(
             success=False,
             error_code="MINIO_CONNECTION_FAILED",
@@ -150,7 +582,7 @@ async def analyze_document(request: AnalyzeRequest):
         )
 
     except MinioClientError as e:
-        logger.error(f"MinIO client error: {e}")
+        logger.error("MinIO client error: %s", e)
         return AnalyzeResponse(
             success=False,
             error_code="MINIO_CONNECTION_FAILED",
@@ -158,15 +590,23 @@ async def analyze_document(request: AnalyzeRequest):
         )
 
     except (EmptyPdfError, CorruptedPdfError) as e:
-        logger.warning(f"PDF extraction failed for {document_id}: {e}")
+        logger.warning("PDF extraction failed for %s: %s", document_id, e)
         return AnalyzeResponse(
             success=False,
             error_code="PDF_EXTRACTION_FAILED",
             error_message=f"Failed to extract text from PDF: {e}",
         )
 
+    except PdfExtractionTimeoutError as e:
+        logger.error("PDF extraction timed out for %s: %s", document_id, e)
+        return AnalyzeResponse(
+            success=False,
+            error_code="PDF_EXTRACTION_FAILED",
+            error_message=f"PDF processing timed out: {e}",
+        )
+
     except PdfExtractionError as e:
-        logger.error(f"PDF extraction error for {document_id}: {e}")
+        logger.error("PDF extraction error for %s: %s", document_id, e)
         return AnalyzeResponse(
             success=False,
             error_code="PDF_EXTRACTION_FAILED",
@@ -174,7 +614,7 @@ async def analyze_document(request: AnalyzeRequest):
         )
 
     except (AiConnectionError, AiResponseParsingError) as e:
-        logger.error(f"AI analysis failed for {document_id}: {e}")
+        logger.error("AI analysis failed for %s: %s", document_id, e)
         return AnalyzeResponse(
             success=False,
             error_code="AI_GENERATION_FAILED",
@@ -182,7 +622,7 @@ async def analyze_document(request: AnalyzeRequest):
         )
 
     except AiAnalysisError as e:
-        logger.error(f"AI analysis error for {document_id}: {e}")
+        logger.error("AI analysis error for %s: %s", document_id, e)
         return AnalyzeResponse(
             success=False,
             error_code="AI_GENERATION_FAILED",
@@ -190,7 +630,7 @@ async def analyze_document(request: AnalyzeRequest):
         )
 
     except Exception as e:
-        logger.exception(f"Unexpected error analyzing document {document_id}")
+        logger.exception("Unexpected error analyzing document %s", document_id)
         return AnalyzeResponse(
             success=False,
             error_code="INTERNAL_ERROR",
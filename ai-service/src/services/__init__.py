@@ -1,40 +1,137 @@
 """Services package."""
 
+from src.services.admission import AdmissionController, AdmissionRejectedError
 from src.services.ai_analyzer import (
     AiAnalysisError,
     AiAnalyzer,
     AiConnectionError,
     AiResponseParsingError,
     DocumentMetadata,
+    split_into_chunks,
+)
+from src.services.analysis_cache import AnalysisCache, CacheStats
+from src.services.analysis_pipeline import AnalysisPipeline
+from src.services.document_buffer import DocumentBuffer, DocumentMemoryBudget
+from src.services.document_classifier import Classification, DocumentClassifier
+from src.services.document_events import (
+    DocumentEvent,
+    DocumentEventsConsumer,
+    EventBroker,
+    EventRecord,
+    InMemoryEventBroker,
+    KafkaEventBroker,
+)
+from src.services.document_packer import DocumentPacker
+from src.services.job_queue import (
+    InMemoryJobStore,
+    Job,
+    JobQueue,
+    JobQueueError,
+    JobQueueFullError,
+    JobStatus,
+    JobStore,
+    SqliteJobStore,
+    create_job_store,
+    is_callback_allowed,
 )
 from src.services.minio_client import (
     DocumentNotFoundError,
+    DocumentTooLargeError,
     MinioClient,
     MinioClientError,
     MinioConnectionError,
 )
+from src.services.model_router import ModelRouter, ModelTarget
+from src.services.pdf_extraction_pool import PdfExtractionPool, PdfExtractionTimeoutError
 from src.services.pdf_extractor import (
     CorruptedPdfError,
     EmptyPdfError,
+    ExtractedText,
     PdfExtractionError,
     PdfExtractor,
 )
+from src.services.rate_limiter import GroqRateLimiter, TokenBucket
+from src.services.readiness import DependencyStatus, ReadinessProber
+from src.services.resilience import CircuitBreaker, CircuitOpenError, CircuitState, retry_async
+from src.services.single_flight import SingleFlight
+from src.services.streaming_json import JsonStringFieldStream
+from src.services.text_normalizer import NormalizedText, TextNormalizer
 
 __all__ = [
+    # Admission Control
+    "AdmissionController",
+    "AdmissionRejectedError",
     # AI Analyzer
     "AiAnalyzer",
     "AiAnalysisError",
     "AiConnectionError",
     "AiResponseParsingError",
     "DocumentMetadata",
+    "split_into_chunks",
+    # Analysis Cache
+    "AnalysisCache",
+    "CacheStats",
+    # Analysis Pipeline
+    "AnalysisPipeline",
+    # Document Buffer
+    "DocumentBuffer",
+    "DocumentMemoryBudget",
+    # Document Classifier
+    "DocumentClassifier",
+    "Classification",
+    # Document Events
+    "DocumentEvent",
+    "DocumentEventsConsumer",
+    "EventBroker",
+    "EventRecord",
+    "InMemoryEventBroker",
+    "KafkaEventBroker",
+    # Document Packer
+    "DocumentPacker",
+    # Job Queue
+    "Job",
+    "JobQueue",
+    "JobQueueError",
+    "JobQueueFullError",
+    "JobStatus",
+    "JobStore",
+    "InMemoryJobStore",
+    "SqliteJobStore",
+    "create_job_store",
+    "is_callback_allowed",
     # MinIO Client
     "MinioClient",
     "MinioClientError",
     "MinioConnectionError",
     "DocumentNotFoundError",
+    "DocumentTooLargeError",
+    # Model Router
+    "ModelRouter",
+    "ModelTarget",
     # PDF Extractor
     "PdfExtractor",
+    "ExtractedText",
+    "PdfExtractionPool",
+    "PdfExtractionTimeoutError",
     "PdfExtractionError",
     "EmptyPdfError",
     "CorruptedPdfError",
+    # Rate Limiter
+    "GroqRateLimiter",
+    "TokenBucket",
+    # Readiness
+    "ReadinessProber",
+    "DependencyStatus",
+    # Resilience
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "CircuitState",
+    "retry_async",
+    # Single Flight
+    "SingleFlight",
+    # Streaming JSON
+    "JsonStringFieldStream",
+    # Text Normalizer
+    "TextNormalizer",
+    "NormalizedText",
 ]
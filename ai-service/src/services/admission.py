@@ -0,0 +1,254 @@
+"""
+Admission control for analysis requests.
+
+Bounds the requests analyzed at once and the requests waiting for a slot,
+and sheds waiting requests once the queue stops draining, so that overload
+turns into fast rejections the caller can retry elsewhere instead of
+requests timing out after their work was done.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from src.config import Settings, get_settings
+from src.utils.logger import get_logger
+from src.utils.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DELAY,
+    ADMISSION_QUEUED,
+    ADMISSION_SHED,
+)
+
+logger = get_logger(__name__)
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request is shed instead of being admitted."""
+
+    def __init__(self, reason: str, retry_after_seconds: int):
+        """
+        Initialize the error.
+
+        Args:
+            reason: Why the request was shed ("queue_full" or "queue_timeout").
+            retry_after_seconds: Suggested delay before retrying.
+        """
+        super().__init__(f"Request shed: {reason}")
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionController:
+    """
+    Admits up to admission_max_in_flight documents, queueing the rest.
+
+    A request takes one slot per document it analyzes, at most
+    admission_max_in_flight, so a batch is admitted whole once enough slots
+    are free. Waiting requests are admitted in arrival order.
+
+    Queue delay is managed as in CoDel: if even the shortest queue delay
+    seen during an interval is above the target, the queue is standing
+    rather than absorbing a burst, and waiters are shed once they exceed the
+    target; the first request admitted within the target ends that state.
+    Otherwise waiters may wait up to admission_queue_timeout_seconds. Each
+    waiter is judged by its own time in the queue against the current
+    state, so a change of state applies to the requests already waiting.
+    The queue itself holds at most admission_max_queue requests; arrivals
+    beyond it are shed at once.
+    """
+
+    def __init__(self, settings: Settings | None = None):
+        """
+        Initialize the controller.
+
+        Args:
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+        self._in_flight = 0
+        self._waiters: deque[tuple[asyncio.Future[None], int]] = deque()
+
+        self._overloaded = False
+        self._state_changed: asyncio.Future[None] | None = None
+        self._interval_min_delay = math.inf
+        self._interval_end = time.monotonic() + self._settings.admission_queue_interval_seconds
+
+    @property
+    def in_flight(self) -> int:
+        """Slots currently held by admitted requests."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for admission."""
+        return len(self._waiters)
+
+    @property
+    def overloaded(self) -> bool:
+        """Whether queue delay stayed above the target for a whole interval."""
+        return self._overloaded
+
+    @asynccontextmanager
+    async def admit(self, weight: int = 1) -> AsyncIterator[None]:
+        """
+        Hold admission slots for the duration of the block.
+
+        Args:
+            weight: Documents the request analyzes.
+
+        Raises:
+            AdmissionRejectedError: If the request is shed.
+        """
+        await self.acquire(weight)
+        try:
+            yield
+        finally:
+            self.release(weight)
+
+    async def acquire(self, weight: int = 1) -> None:
+        """
+        Wait for admission slots; release() must be called with the same weight once done.
+
+        Args:
+            weight: Documents the request analyzes.
+
+        Raises:
+            AdmissionRejectedError: If the request is shed.
+        """
+        weight = self._slots(weight)
+        if not self._waiters and self._fits(weight):
+            self._observe_delay(0.0)
+            self._grant(weight)
+            return
+
+        if len(self._waiters) >= self._settings.admission_max_queue:
+            self._shed("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((waiter, weight))
+        ADMISSION_QUEUED.inc()
+        start = time.monotonic()
+
+        try:
+            while not waiter.done():
+                remaining = start + self._max_wait() - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Woken early when the overload state, and with it the allowed wait, changes
+                await asyncio.wait(
+                    [waiter, self._next_state_change()],
+                    timeout=remaining,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+        except asyncio.CancelledError:
+            if waiter.done():
+                # Granted just as the caller gave up: pass the slots on
+                self.release(weight)
+            else:
+                self._abandon(waiter)
+            raise
+        finally:
+            ADMISSION_QUEUED.dec()
+
+        delay = time.monotonic() - start
+        self._observe_delay(delay)
+        if not waiter.done():
+            self._abandon(waiter)
+            self._shed("queue_timeout")
+        ADMISSION_QUEUE_DELAY.observe(delay)
+
+    def release(self, weight: int = 1) -> None:
+        """
+        Return admission slots, admitting waiting requests that now fit.
+
+        Args:
+            weight: The weight the slots were acquired with.
+        """
+        weight = self._slots(weight)
+        self._in_flight -= weight
+        ADMISSION_IN_FLIGHT.dec(weight)
+        self._wake()
+
+    def _wake(self) -> None:
+        # Strictly in arrival order: a heavy request at the head is not overtaken
+        while self._waiters:
+            waiter, weight = self._waiters[0]
+            if waiter.done():
+                self._waiters.popleft()
+                continue
+            if not self._fits(weight):
+                return
+            self._waiters.popleft()
+            self._grant(weight)
+            waiter.set_result(None)
+
+    def _abandon(self, waiter: asyncio.Future[None]) -> None:
+        waiter.cancel()
+        self._waiters = deque(entry for entry in self._waiters if entry[0] is not waiter)
+        # Requests queued behind the abandoned one may fit now
+        self._wake()
+
+    def _max_wait(self) -> float:
+        if self._overloaded:
+            return self._settings.admission_queue_target_seconds
+        return self._settings.admission_queue_timeout_seconds
+
+    def _next_state_change(self) -> asyncio.Future[None]:
+        if self._state_changed is None:
+            self._state_changed = asyncio.get_running_loop().create_future()
+        return self._state_changed
+
+    def _slots(self, weight: int) -> int:
+        return max(1, min(weight, self._settings.admission_max_in_flight))
+
+    def _fits(self, weight: int) -> bool:
+        return self._in_flight + weight <= self._settings.admission_max_in_flight
+
+    def _grant(self, weight: int) -> None:
+        self._in_flight += weight
+        ADMISSION_IN_FLIGHT.inc(weight)
+
+    def _shed(self, reason: str) -> None:
+        ADMISSION_SHED.labels(reason).inc()
+        logger.debug(
+            "Shedding request (%s): %s in flight, %s queued",
+            reason,
+            self._in_flight,
+            len(self._waiters),
+        )
+        raise AdmissionRejectedError(reason, self._settings.admission_retry_after_seconds)
+
+    def _observe_delay(self, delay: float) -> None:
+        target = self._settings.admission_queue_target_seconds
+        now = time.monotonic()
+
+        if self._overloaded and delay <= target:
+            # As in CoDel, the queue drains again as soon as a request waits less than the target
+            self._set_overloaded(False, delay)
+        elif now >= self._interval_end:
+            min_delay = min(self._interval_min_delay, delay)
+            self._set_overloaded(min_delay > target, min_delay)
+        else:
+            self._interval_min_delay = min(self._interval_min_delay, delay)
+            return
+
+        self._interval_min_delay = math.inf
+        self._interval_end = now + self._settings.admission_queue_interval_seconds
+
+    def _set_overloaded(self, overloaded: bool, delay: float) -> None:
+        if overloaded == self._overloaded:
+            return
+
+        logger.warning(
+            "Admission queue %s (queue delay %.2fs)",
+            "is standing, shedding late requests" if overloaded else "drains again",
+            delay,
+        )
+        self._overloaded = overloaded
+        if self._state_changed is not None:
+            self._state_changed.set_result(None)
+            self._state_changed = None
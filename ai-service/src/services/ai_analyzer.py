@@ -3,17 +3,48 @@ AI document analyzer using Groq API.
 Generates summary and tags from medical document text.
 """
 
+import asyncio
+import hashlib
 import json
 import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import AsyncExitStack
 from dataclasses import dataclass
-
-from groq import APIConnectionError, APIStatusError, Groq, RateLimitError
-
-from src.config import Settings, get_settings
+from typing import TypeVar
+
+import httpx
+from groq import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    AsyncGroq,
+    AsyncStream,
+    InternalServerError,
+    RateLimitError,
+)
+from groq.types import CompletionUsage
+from groq.types.chat import ChatCompletionChunk
+
+from src.config import ModelRoute, Settings, get_settings
+from src.services.document_packer import DocumentPacker
+from src.services.http_pools import create_groq_http_client
+from src.services.model_router import ModelRouter, ModelTarget
+from src.services.pdf_extractor import PAGE_MARKER_PATTERN
+from src.services.resilience import CircuitOpenError, retry_async
+from src.services.streaming_json import JsonStringFieldStream
 from src.utils.logger import get_logger
+from src.utils.metrics import (
+    LLM_FAILOVERS,
+    LLM_ROUTE_CALLS,
+    LLM_ROUTE_DURATION,
+    LLM_TOKENS,
+    track_stage,
+)
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
 
 class AiAnalysisError(Exception):
     """Base exception for AI analysis errors."""
@@ -102,10 +133,89 @@ DOCUMENT CONTENT:
 Remember: Respond with ONLY a valid JSON object, no other text."""
 
 
+CHUNK_PROMPT_TEMPLATE = """Analyze the following excerpt of a longer medical document and provide a summary and tags for this excerpt only.
+
+EXCERPT {chunk_number} OF {chunk_count}:
+{document_text}
+
+Remember: Respond with ONLY a valid JSON object, no other text."""
+
+
+REDUCE_PROMPT_TEMPLATE = """The following are the summaries and tags of consecutive excerpts of ONE medical document, in order.
+Merge them into a single summary of the whole document (2-3 sentences, in Italian) and a single set of 3-10 tags, following the same rules as for a full document.
+
+EXCERPT ANALYSES:
+{partial_analyses}
+
+Remember: Respond with ONLY a valid JSON object, no other text."""
+
+PACKED_PROMPT_TEMPLATE = """Analyze each of the following {document_count} documents independently, applying the rules above to each one, and provide a summary and tags for each.
+
+{documents}
+
+Respond with ONLY a valid JSON object of this form, with exactly one entry per document and its id:
+{{"documents": [{{"id": "1", "summary": "...", "tags": ["..."]}}]}}
+Non-medical documents get an empty summary and an empty tags list."""
+
+
+PACKED_DOCUMENT_TEMPLATE = """=== DOCUMENT id={document_id} ===
+{document_text}
+=== END OF DOCUMENT id={document_id} ==="""
+
+# Changes whenever the prompts change, so cached results from older prompts are not reused
+PROMPT_VERSION = hashlib.sha256(
+    (
+        SYSTEM_PROMPT
+        + USER_PROMPT_TEMPLATE
+        + CHUNK_PROMPT_TEMPLATE
+        + REDUCE_PROMPT_TEMPLATE
+        + PACKED_PROMPT_TEMPLATE
+        + PACKED_DOCUMENT_TEMPLATE
+    ).encode()
+).hexdigest()[:12]
+
+
+def split_into_chunks(document_text: str, max_chars: int) -> list[str]:
+    """
+    Split document text into chunks on page boundaries.
+
+    Consecutive pages are packed into chunks of at most max_chars characters;
+    a single page longer than that is split on its own.
+
+    Args:
+        document_text: Text with the page markers emitted by PdfExtractor.
+        max_chars: Maximum characters per chunk.
+
+    Returns:
+        The chunks, in document order.
+    """
+    chunks: list[str] = []
+    current = ""
+
+    for page in PAGE_MARKER_PATTERN.split(document_text):
+        page = page.strip()
+        if not page:
+            continue
+        if current and len(current) + len(page) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        while len(page) > max_chars:
+            chunks.append(page[:max_chars])
+            page = page[max_chars:]
+        current = f"{current}\n\n{page}" if current else page
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
 class AiAnalyzer:
     """
     Analyzes medical documents using Groq AI to generate metadata.
-    Uses the Groq API with configurable model and parameters.
+    Uses the async Groq client so that LLM calls never block the event loop.
+    Each call is routed to a model by ModelRouter and falls back to the
+    route's other models on rate limits, timeouts and outages. With packing
+    enabled, short documents analyzed at about the same time share a call.
     """
 
     def __init__(self, settings: Settings | None = None):
@@ -116,10 +226,25 @@ class AiAnalyzer:
             settings: Application settings. If None, loads from environment.
         """
         self._settings = settings or get_settings()
-        self._client = Groq(api_key=self._settings.groq_api_key)
-        logger.info(f"AI Analyzer initialized with model: {self._settings.groq_model}")
+        self._router = ModelRouter(self._settings)
+        # Retries are handled here, so that the rate limiters see every 429
+        self._client = AsyncGroq(
+            api_key=self._settings.groq_api_key,
+            base_url=self._settings.groq_base_url,
+            max_retries=0,
+            # Each model's rate limiter admits up to llm_concurrency calls
+            http_client=create_groq_http_client(
+                self._settings, self._settings.llm_concurrency * len(self._router.models)
+            ),
+        )
+        self._packer: DocumentPacker[DocumentMetadata] | None = None
+        if self._settings.ai_packing_enabled:
+            self._packer = DocumentPacker(
+                self._analyze_packed, self._analyze_single, self._settings
+            )
+        logger.info("AI Analyzer initialized with %s model route(s)", len(self._router.routes))
 
-    def analyze(self, document_text: str) -> DocumentMetadata:
+    async def analyze(self, document_text: str) -> DocumentMetadata:
         """
         Analyze a medical document and generate metadata.
 
@@ -137,82 +262,425 @@ class AiAnalyzer:
         if not document_text or not document_text.strip():
             raise AiAnalysisError("Empty document text provided")
 
-        logger.debug(f"Analyzing document with {len(document_text)} characters")
+        logger.debug("Analyzing document with %s characters", len(document_text))
+
+        if self._needs_chunking(document_text):
+            return await self._analyze_chunked(document_text)
 
+        if (
+            self._packer is not None
+            and len(document_text) <= self._settings.ai_packing_max_document_chars
+        ):
+            return await self._packer.analyze(document_text)
+
+        return await self._analyze_single(document_text)
+
+    async def analyze_stream(self, document_text: str) -> AsyncIterator[str | DocumentMetadata]:
+        """
+        Analyze a document with a streamed completion.
+
+        The summary is decoded from the JSON while the completion streams in.
+        Documents needing the chunked analysis are not streamed: only their
+        final metadata is yielded.
+
+        Args:
+            document_text: The extracted text content of the document.
+
+        Yields:
+            New pieces of the summary as they arrive, then the parsed
+            DocumentMetadata as the last item.
+
+        Raises:
+            AiConnectionError: If unable to connect to the AI service.
+            AiAnalysisError: If the analysis fails.
+            AiResponseParsingError: If the response cannot be parsed.
+        """
+        if not document_text or not document_text.strip():
+            raise AiAnalysisError("Empty document text provided")
+
+        if self._needs_chunking(document_text):
+            yield await self._analyze_chunked(document_text)
+            return
+
+        user_prompt = self._user_prompt(document_text)
+        route = self._router.route(len(user_prompt))
+        estimated_tokens = self._router.estimate_tokens(
+            route, len(SYSTEM_PROMPT) + len(user_prompt)
+        )
+
+        start = time.perf_counter()
+        exit_stack, stream, target = await self._with_failover(
+            route,
+            estimated_tokens,
+            lambda target: self._open_stream(user_prompt, route, target, estimated_tokens),
+        )
+
+        summary = JsonStringFieldStream("summary")
+        parts = []
+        async with exit_stack:
+            try:
+                async for chunk in stream:
+                    # Groq reports the usage with the last chunk, under x_groq
+                    usage = chunk.usage or (chunk.x_groq.usage if chunk.x_groq else None)
+                    if usage is not None:
+                        self._record_usage(target, estimated_tokens, usage)
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    parts.append(chunk.choices[0].delta.content)
+                    delta = summary.feed(parts[-1])
+                    if delta:
+                        yield delta
+            except Exception as e:
+                # Transport errors surface here as raw httpx exceptions
+                self._record_route(route, target, start, e)
+                raise self._api_error(e) from e
+        target.rate_limiter.on_success()
+        self._record_route(route, target, start)
+
+        content = "".join(parts)
+        logger.debug("Received streamed AI response: %.200s...", content)
+        with track_stage("parse"):
+            yield self._parse_response(content)
+
+    def _needs_chunking(self, document_text: str) -> bool:
+        return (
+            self._settings.ai_chunking_enabled
+            and len(document_text) > self._settings.ai_max_input_chars
+        )
+
+    def _user_prompt(self, document_text: str) -> str:
         # Truncate very long documents to avoid token limits
-        max_chars = 15_000
+        max_chars = self._settings.ai_max_input_chars
         if len(document_text) > max_chars:
             logger.warning(
-                f"Document text truncated from {len(document_text)} to {max_chars} characters"
+                "Document text truncated from %s to %s characters", len(document_text), max_chars
             )
             document_text = document_text[:max_chars] + "\n\n[Document truncated due to length...]"
 
-        for attempt in range(self._settings.max_retries):
-            try:
-                return self._call_ai(document_text)
-            except AiConnectionError as e:
-                if attempt < self._settings.max_retries - 1:
-                    delay = self._settings.retry_delay_seconds * (2**attempt)
-                    logger.warning(
-                        f"AI connection failed, retrying in {delay}s "
-                        f"(attempt {attempt + 1}/{self._settings.max_retries})"
+        return USER_PROMPT_TEMPLATE.format(document_text=document_text)
+
+    async def _analyze_single(self, document_text: str) -> DocumentMetadata:
+        return await self._call_with_retries(self._user_prompt(document_text))
+
+    async def _analyze_packed(self, document_texts: list[str]) -> list[DocumentMetadata | None]:
+        """
+        Analyze several short documents in one call.
+
+        Args:
+            document_texts: Texts of the documents, each sent under its
+                position (starting at 1) as id.
+
+        Returns:
+            The metadata of each document in order, None for documents whose
+            entry is missing or malformed, or for all of them if the
+            response cannot be parsed at all.
+        """
+        documents = "\n\n".join(
+            PACKED_DOCUMENT_TEMPLATE.format(document_id=number, document_text=text)
+            for number, text in enumerate(document_texts, start=1)
+        )
+        user_prompt = PACKED_PROMPT_TEMPLATE.format(
+            document_count=len(document_texts), documents=documents
+        )
+        max_tokens = self._settings.ai_packing_max_tokens_per_document * len(document_texts)
+
+        try:
+            return await self._call_with_retries(
+                user_prompt,
+                lambda content: self._parse_packed_response(content, len(document_texts)),
+                max_tokens,
+            )
+        except AiResponseParsingError as e:
+            logger.warning("Packed AI response unusable: %s", e)
+            return [None] * len(document_texts)
+
+    async def _analyze_chunked(self, document_text: str) -> DocumentMetadata:
+        """
+        Analyze a long document with a map-reduce over page chunks.
+
+        Chunks are analyzed concurrently, bounded by the chunk concurrency
+        setting, then a final call merges the partial summaries and tags.
+
+        Args:
+            document_text: The document text to analyze.
+
+        Returns:
+            DocumentMetadata covering the whole document.
+        """
+        chunks = split_into_chunks(document_text, self._settings.ai_chunk_max_chars)
+        if len(chunks) > self._settings.ai_max_chunks:
+            logger.warning(
+                "Document split into %s chunks, analyzing the first %s",
+                len(chunks),
+                self._settings.ai_max_chunks,
+            )
+            chunks = chunks[: self._settings.ai_max_chunks]
+
+        logger.info("Analyzing document in %s chunk(s)", len(chunks))
+
+        semaphore = asyncio.Semaphore(self._settings.ai_chunk_concurrency)
+
+        async def analyze_chunk(chunk_number: int, chunk: str) -> DocumentMetadata:
+            async with semaphore:
+                return await self._call_with_retries(
+                    CHUNK_PROMPT_TEMPLATE.format(
+                        chunk_number=chunk_number,
+                        chunk_count=len(chunks),
+                        document_text=chunk,
                     )
-                    time.sleep(delay)
-                else:
-                    raise e
-            except RateLimitError as e:
-                if attempt < self._settings.max_retries - 1:
-                    delay = self._settings.retry_delay_seconds * (2**attempt) * 2
+                )
+
+        partials = await asyncio.gather(
+            *(analyze_chunk(number, chunk) for number, chunk in enumerate(chunks, start=1))
+        )
+
+        # Non-medical excerpts come back empty and carry nothing to merge
+        partials = [partial for partial in partials if partial.summary or partial.tags]
+        if not partials:
+            return DocumentMetadata(summary="", tags=[])
+        if len(partials) == 1:
+            return partials[0]
+
+        partial_analyses = "\n\n".join(
+            f"Excerpt {number}:\n"
+            + json.dumps({"summary": partial.summary, "tags": partial.tags}, ensure_ascii=False)
+            for number, partial in enumerate(partials, start=1)
+        )
+        return await self._call_with_retries(
+            REDUCE_PROMPT_TEMPLATE.format(partial_analyses=partial_analyses)
+        )
+
+    async def _call_with_retries(
+        self,
+        user_prompt: str,
+        parse: Callable[[str], T] | None = None,
+        max_tokens: int | None = None,
+    ) -> T | DocumentMetadata:
+        """
+        Call the AI on the prompt's route, with retries and model fallback.
+
+        Args:
+            user_prompt: The user message sent along with the system prompt.
+            parse: Parses the response content (default: _parse_response).
+            max_tokens: Completion token limit (default: the route's).
+
+        Returns:
+            The parsed response, DocumentMetadata by default.
+        """
+        route = self._router.route(len(user_prompt))
+        max_tokens = max_tokens or self._router.max_tokens(route)
+        estimated_tokens = self._router.estimate_tokens(
+            route, len(SYSTEM_PROMPT) + len(user_prompt), max_tokens
+        )
+        return await self._with_failover(
+            route,
+            estimated_tokens,
+            lambda target: self._call_ai(
+                user_prompt,
+                route,
+                target,
+                estimated_tokens,
+                parse or self._parse_response,
+                max_tokens,
+            ),
+        )
+
+    async def _with_failover(
+        self,
+        route: ModelRoute,
+        estimated_tokens: int,
+        call: Callable[[ModelTarget], Awaitable[T]],
+    ) -> T:
+        """
+        Run a call on the route's models until one succeeds.
+
+        Connection errors, server errors, timeouts and rate limits move the
+        call to the next model right away; the last model is retried as
+        usual. Rate limits do not count towards opening a model's circuit,
+        since its rate limiter already backs off on them.
+
+        Args:
+            route: The route of the call.
+            estimated_tokens: Tokens the call is expected to use.
+            call: Makes the call on a given model.
+
+        Returns:
+            The result of the first successful call.
+        """
+        candidates = self._router.candidates(route, estimated_tokens)
+
+        for index, target in enumerate(candidates):
+            is_last = index == len(candidates) - 1
+            try:
+                return await retry_async(
+                    lambda: call(target),
+                    retry_on=(AiConnectionError, RateLimitError),
+                    trip_on=(AiConnectionError,),
+                    breaker=target.breaker,
+                    max_attempts=None if is_last else 1,
+                    settings=self._settings,
+                )
+            except (AiConnectionError, RateLimitError, CircuitOpenError) as e:
+                if not is_last:
+                    LLM_FAILOVERS.labels(route.name, target.model).inc()
                     logger.warning(
-                        f"Rate limit hit, retrying in {delay}s "
-                        f"(attempt {attempt + 1}/{self._settings.max_retries})"
+                        "Model %s failed on route %s (%s), falling back to %s",
+                        target.model,
+                        route.name,
+                        e,
+                        candidates[index + 1].model,
                     )
-                    time.sleep(delay)
-                else:
+                    continue
+                if isinstance(e, RateLimitError):
                     raise AiConnectionError(f"Rate limit exceeded: {e}") from e
-
-        raise AiAnalysisError("Maximum retries exceeded")
-
-    def _call_ai(self, document_text: str) -> DocumentMetadata:
+                if isinstance(e, CircuitOpenError):
+                    raise AiConnectionError(f"AI service unavailable: {e}") from e
+                raise
+
+        raise AiAnalysisError(f"No model configured for route {route.name}")
+
+    async def _call_ai(
+        self,
+        user_prompt: str,
+        route: ModelRoute,
+        target: ModelTarget,
+        estimated_tokens: int,
+        parse: Callable[[str], T],
+        max_tokens: int,
+    ) -> T:
         """
         Make the actual API call to Groq.
 
         Args:
-            document_text: The document text to analyze.
+            user_prompt: The user message sent along with the system prompt.
+            route: The route of the call.
+            target: The model to call.
+            estimated_tokens: Tokens the call is expected to use.
+            parse: Parses the response content.
+            max_tokens: Completion token limit.
 
         Returns:
-            Parsed DocumentMetadata.
+            The parsed response.
         """
-        user_prompt = USER_PROMPT_TEMPLATE.format(document_text=document_text)
+        rate_limiter = target.rate_limiter
+        start = time.perf_counter()
 
         try:
-            logger.debug("Sending request to Groq API")
-
-            response = self._client.chat.completions.create(
-                model=self._settings.groq_model,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=self._settings.groq_temperature,
-                max_tokens=self._settings.groq_max_tokens,
-                response_format={"type": "json_object"},
-            )
+            async with rate_limiter.acquire(estimated_tokens):
+                logger.debug("Sending request to Groq API with model %s", target.model)
+                raw_response = await self._client.chat.completions.with_raw_response.create(
+                    **self._completion_params(user_prompt, target, max_tokens)
+                )
+
+            rate_limiter.update_from_headers(raw_response.headers)
+            rate_limiter.on_success()
+
+            response = await raw_response.parse()
+            if response.usage is not None:
+                self._record_usage(target, estimated_tokens, response.usage)
+            self._record_route(route, target, start)
 
             content = response.choices[0].message.content
-            logger.debug(f"Received AI response: {content[:200]}...")
+            logger.debug("Received AI response: %.200s...", content)
 
-            return self._parse_response(content)
+            with track_stage("parse"):
+                return parse(content)
 
-        except APIConnectionError as e:
-            logger.error(f"Failed to connect to Groq API: {e}")
-            raise AiConnectionError(f"Failed to connect to AI service: {e}") from e
-        except APIStatusError as e:
-            logger.error(f"Groq API error: {e}")
-            raise AiAnalysisError(f"AI service error: {e}") from e
+        except AiResponseParsingError:
+            raise
+        except RateLimitError as e:
+            self._record_route(route, target, start, e)
+            rate_limiter.on_rate_limited(e.response.headers)
+            raise
         except Exception as e:
-            logger.error(f"Unexpected error during AI analysis: {e}")
-            raise AiAnalysisError(f"AI analysis failed: {e}") from e
+            self._record_route(route, target, start, e)
+            raise self._api_error(e) from e
+
+    async def _open_stream(
+        self, user_prompt: str, route: ModelRoute, target: ModelTarget, estimated_tokens: int
+    ) -> tuple[AsyncExitStack, AsyncStream[ChatCompletionChunk], ModelTarget]:
+        """
+        Start a streamed API call to Groq.
+
+        Returns:
+            An exit stack holding the model's rate-limiter slot, to be closed
+            once the stream is consumed, the opened stream and the model.
+        """
+        rate_limiter = target.rate_limiter
+        start = time.perf_counter()
+        exit_stack = AsyncExitStack()
+        try:
+            await exit_stack.enter_async_context(rate_limiter.acquire(estimated_tokens))
+            logger.debug("Sending streaming request to Groq API with model %s", target.model)
+            raw_response = await self._client.chat.completions.with_raw_response.create(
+                **self._completion_params(user_prompt, target, self._router.max_tokens(route)),
+                stream=True,
+            )
+            stream = await raw_response.parse()
+            exit_stack.push_async_callback(stream.close)
+        except BaseException as e:
+            await exit_stack.aclose()
+            if isinstance(e, RateLimitError):
+                self._record_route(route, target, start, e)
+                rate_limiter.on_rate_limited(e.response.headers)
+                raise
+            if isinstance(e, Exception):
+                self._record_route(route, target, start, e)
+                raise self._api_error(e) from e
+            raise
+
+        # on_success is left to the caller, once the whole stream has been read
+        rate_limiter.update_from_headers(raw_response.headers)
+        return exit_stack, stream, target
+
+    def _completion_params(self, user_prompt: str, target: ModelTarget, max_tokens: int) -> dict:
+        return {
+            "model": target.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+            "temperature": self._settings.groq_temperature,
+            "max_tokens": max_tokens,
+            "response_format": {"type": "json_object"},
+        }
+
+    @staticmethod
+    def _record_usage(target: ModelTarget, estimated_tokens: int, usage: CompletionUsage) -> None:
+        target.rate_limiter.record_usage(estimated_tokens, usage.total_tokens)
+        LLM_TOKENS.labels("prompt").inc(usage.prompt_tokens)
+        LLM_TOKENS.labels("completion").inc(usage.completion_tokens)
+
+    @staticmethod
+    def _record_route(
+        route: ModelRoute, target: ModelTarget, start: float, error: Exception | None = None
+    ) -> None:
+        """Record the duration and outcome of a call on a route's model."""
+        if error is None:
+            outcome = "ok"
+        elif isinstance(error, RateLimitError):
+            outcome = "rate_limited"
+        elif isinstance(error, APITimeoutError):
+            outcome = "timeout"
+        else:
+            outcome = "error"
+        LLM_ROUTE_DURATION.labels(route.name, target.model).observe(time.perf_counter() - start)
+        LLM_ROUTE_CALLS.labels(route.name, target.model, outcome).inc()
+
+    @staticmethod
+    def _api_error(error: Exception) -> AiAnalysisError:
+        """Map an error raised by a Groq call to the analyzer's exceptions."""
+        if isinstance(error, (APIConnectionError, httpx.TransportError)):
+            logger.error("Failed to connect to Groq API: %s", error)
+            return AiConnectionError(f"Failed to connect to AI service: {error}")
+        if isinstance(error, InternalServerError):
+            logger.error("Groq API server error: %s", error)
+            return AiConnectionError(f"AI service unavailable: {error}")
+        if isinstance(error, APIStatusError):
+            logger.error("Groq API error: %s", error)
+            return AiAnalysisError(f"AI service error: {error}")
+        logger.error("Unexpected error during AI analysis: %s", error)
+        return AiAnalysisError(f"AI analysis failed: {error}")
 
     def _parse_response(self, content: str) -> DocumentMetadata:
         """
@@ -227,69 +695,112 @@ class AiAnalyzer:
         Raises:
             AiResponseParsingError: If parsing fails.
         """
+        return self._metadata_from(self._load_json(content))
+
+    def _parse_packed_response(self, content: str, count: int) -> list[DocumentMetadata | None]:
+        """
+        Parse a packed AI response into the metadata of each document.
+
+        Args:
+            content: The raw AI response content.
+            count: Number of documents in the packed prompt.
+
+        Returns:
+            The metadata of each document in order, None for documents
+            without a well-formed entry.
+
+        Raises:
+            AiResponseParsingError: If the response is not a packed response.
+        """
+        data = self._load_json(content)
+        entries = data.get("documents") if isinstance(data, dict) else None
+        if not isinstance(entries, list):
+            raise AiResponseParsingError("Missing 'documents' list in packed AI response")
+
+        results: list[DocumentMetadata | None] = [None] * count
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                index = int(str(entry.get("id")).strip()) - 1
+            except ValueError:
+                continue
+            # Entries for unknown or repeated ids cannot be attributed reliably
+            if not 0 <= index < count or results[index] is not None:
+                continue
+            try:
+                results[index] = self._metadata_from(entry)
+            except AiResponseParsingError as e:
+                logger.warning("Packed AI response entry %s unusable: %s", index + 1, e)
+        return results
+
+    def _load_json(self, content: str) -> object:
+        """Decode the JSON of an AI response, tolerating markdown code fences."""
         if not content:
             raise AiResponseParsingError("Empty response from AI")
 
-        try:
-            # Clean potential markdown formatting
-            content = content.strip()
-            if content.startswith("```"):
-                # Remove markdown code blocks
-                lines = content.split("\n")
-                content = "\n".join(line for line in lines if not line.startswith("```"))
-
-            data = json.loads(content)
-
-            # Validate required fields exist (even if empty)
-            if "summary" not in data:
-                raise AiResponseParsingError("Missing 'summary' field in AI response")
-            if "tags" not in data:
-                raise AiResponseParsingError("Missing 'tags' field in AI response")
-
-            summary = str(data["summary"]).strip()
-            tags = data["tags"]
-
-            # Handle empty summary/tags (non-medical document)
-            if not summary and not tags:
-                logger.info("Document identified as non-medical (empty metadata)")
-                return DocumentMetadata(summary="", tags=[])
-
-            # Ensure tags is a list
-            if isinstance(tags, str):
-                tags = [tags] if tags else []
-            elif not isinstance(tags, list):
-                tags = list(tags) if tags else []
-
-            # Clean and validate tags
-            cleaned_tags = []
-            for tag in tags:
-                tag = str(tag).strip().lower().replace(" ", "_")
-                if tag and len(tag) > 1:
-                    cleaned_tags.append(tag)
-
-            # Deduplicate while preserving order
-            seen = set()
-            unique_tags = []
-            for tag in cleaned_tags:
-                if tag not in seen:
-                    seen.add(tag)
-                    unique_tags.append(tag)
-
-            logger.info(
-                f"AI analysis complete: summary length={len(summary)}, "
-                f"tags count={len(unique_tags)}"
-            )
-
-            return DocumentMetadata(summary=summary, tags=unique_tags)
+        # Clean potential markdown formatting
+        content = content.strip()
+        if content.startswith("```"):
+            # Remove markdown code blocks
+            lines = content.split("\n")
+            content = "\n".join(line for line in lines if not line.startswith("```"))
 
+        try:
+            return json.loads(content)
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse AI response as JSON: {content[:500]}")
+            logger.error("Failed to parse AI response as JSON: %.500s", content)
             raise AiResponseParsingError(f"Invalid JSON in AI response: {e}") from e
-        except KeyError as e:
-            logger.error(f"Missing required field in AI response: {e}")
-            raise AiResponseParsingError(f"Missing field in AI response: {e}") from e
 
-    def health_check(self) -> bool:
+    def _metadata_from(self, data: object) -> DocumentMetadata:
+        """Build DocumentMetadata from the decoded JSON of a single document."""
+        if not isinstance(data, dict):
+            raise AiResponseParsingError("AI response is not a JSON object")
+
+        # Validate required fields exist (even if empty)
+        if "summary" not in data:
+            raise AiResponseParsingError("Missing 'summary' field in AI response")
+        if "tags" not in data:
+            raise AiResponseParsingError("Missing 'tags' field in AI response")
+
+        summary = str(data["summary"]).strip()
+        tags = data["tags"]
+
+        # Handle empty summary/tags (non-medical document)
+        if not summary and not tags:
+            logger.info("Document identified as non-medical (empty metadata)")
+            return DocumentMetadata(summary="", tags=[])
+
+        # Ensure tags is a list
+        if isinstance(tags, str):
+            tags = [tags] if tags else []
+        elif not isinstance(tags, list):
+            tags = list(tags) if tags else []
+
+        # Clean and validate tags
+        cleaned_tags = []
+        for tag in tags:
+            tag = str(tag).strip().lower().replace(" ", "_")
+            if tag and len(tag) > 1:
+                cleaned_tags.append(tag)
+
+        # Deduplicate while preserving order
+        seen = set()
+        unique_tags = []
+        for tag in cleaned_tags:
+            if tag not in seen:
+                seen.add(tag)
+                unique_tags.append(tag)
+
+        logger.info(
+            "AI analysis complete: summary length=%s, tags count=%s",
+            len(summary),
+            len(unique_tags),
+        )
+
+        return DocumentMetadata(summary=summary, tags=unique_tags)
+
+    async def health_check(self) -> bool:
         """
         Check if the AI service is accessible.
 
@@ -298,8 +809,12 @@ class AiAnalyzer:
         """
         try:
             # Make a minimal API call to test connectivity
-            self._client.models.list()
+            await self._client.models.list()
             return True
         except Exception as e:
-            logger.warning(f"AI health check failed: {e}")
+            logger.warning("AI health check failed: %s", e)
             return False
+
+    async def close(self) -> None:
+        """Close the underlying HTTP client."""
+        await self._client.close()
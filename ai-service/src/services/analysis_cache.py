@@ -0,0 +1,212 @@
+"""
+Content-addressed cache for AI analysis results.
+
+Results are keyed by a hash of the extracted document text together with the
+model and prompt version, so re-analyzing an unchanged PDF skips the LLM call.
+The cache has two tiers: an in-process LRU with TTL and a SQLite store on
+disk that survives restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from src.config import Settings, get_settings
+from src.services.ai_analyzer import PROMPT_VERSION, DocumentMetadata
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CacheStats:
+    """
+    Hit and miss counters of the analysis cache.
+
+    Attributes:
+        memory_hits: Lookups served by the in-process LRU.
+        disk_hits: Lookups served by the SQLite store.
+        misses: Lookups found in neither tier.
+        memory_entries: Entries currently held in memory.
+    """
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    memory_entries: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class AnalysisCache:
+    """
+    Two-tier cache of DocumentMetadata.
+
+    Memory lookups run on the event loop; SQLite reads and writes run in the
+    default executor behind a lock, since the connection is shared.
+    """
+
+    def __init__(self, settings: Settings | None = None):
+        """
+        Initialize the analysis cache.
+
+        Args:
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+        self._memory: OrderedDict[str, tuple[float, DocumentMetadata]] = OrderedDict()
+        self._stats = CacheStats()
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+
+        if self._settings.analysis_cache_enabled and self._settings.analysis_cache_db_path:
+            self._db = self._open_db(Path(self._settings.analysis_cache_db_path))
+
+        logger.info(
+            "Analysis cache initialized: enabled=%s, memory_entries=%s, db_path=%s",
+            self._settings.analysis_cache_enabled,
+            self._settings.analysis_cache_memory_entries,
+            self._settings.analysis_cache_db_path or "disabled",
+        )
+
+    def _open_db(self, path: Path) -> sqlite3.Connection:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+            "key TEXT PRIMARY KEY, metadata TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        # Expired rows are filtered on read and purged on startup
+        db.execute(
+            "DELETE FROM analysis_cache WHERE created_at < ?",
+            (time.time() - self._settings.analysis_cache_disk_ttl_seconds,),
+        )
+        db.commit()
+        return db
+
+    def make_key(self, document_text: str) -> str:
+        """
+        Build the cache key for a document.
+
+        Args:
+            document_text: The extracted text content of the document.
+
+        Returns:
+            Hex digest identifying the text, models and prompt version.
+        """
+        digest = hashlib.sha256()
+        digest.update(self._settings.groq_model.encode())
+        digest.update(b"\0")
+        for route in self._settings.groq_model_routes:
+            digest.update(route.model_dump_json().encode())
+            digest.update(b"\0")
+        digest.update(PROMPT_VERSION.encode())
+        digest.update(b"\0")
+        digest.update(document_text.encode())
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> DocumentMetadata | None:
+        """
+        Look up a cached analysis result.
+
+        Args:
+            key: Key returned by make_key.
+
+        Returns:
+            The cached DocumentMetadata, or None on a miss.
+        """
+        if not self._settings.analysis_cache_enabled:
+            return None
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, metadata = entry
+            if expires_at > time.monotonic():
+                self._memory.move_to_end(key)
+                self._stats.memory_hits += 1
+                return metadata
+            del self._memory[key]
+
+        if self._db is not None:
+            metadata = await asyncio.to_thread(self._read_db, key)
+            if metadata is not None:
+                self._remember(key, metadata)
+                self._stats.disk_hits += 1
+                return metadata
+
+        self._stats.misses += 1
+        return None
+
+    async def put(self, key: str, metadata: DocumentMetadata) -> None:
+        """
+        Store an analysis result in both tiers.
+
+        Args:
+            key: Key returned by make_key.
+            metadata: The analysis result to cache.
+        """
+        if not self._settings.analysis_cache_enabled:
+            return
+
+        self._remember(key, metadata)
+        if self._db is not None:
+            await asyncio.to_thread(self._write_db, key, metadata)
+
+    def _remember(self, key: str, metadata: DocumentMetadata) -> None:
+        expires_at = time.monotonic() + self._settings.analysis_cache_memory_ttl_seconds
+        self._memory[key] = (expires_at, metadata)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._settings.analysis_cache_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_db(self, key: str) -> DocumentMetadata | None:
+        min_created_at = time.time() - self._settings.analysis_cache_disk_ttl_seconds
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT metadata FROM analysis_cache WHERE key = ? AND created_at >= ?",
+                    (key, min_created_at),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Analysis cache read failed: %s", e)
+            return None
+
+        return DocumentMetadata(**json.loads(row[0])) if row else None
+
+    def _write_db(self, key: str, metadata: DocumentMetadata) -> None:
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, metadata, created_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, json.dumps(asdict(metadata)), time.time()),
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning("Analysis cache write failed: %s", e)
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache counters."""
+        return CacheStats(
+            memory_hits=self._stats.memory_hits,
+            disk_hits=self._stats.disk_hits,
+            misses=self._stats.misses,
+            memory_entries=len(self._memory),
+        )
+
+    def close(self) -> None:
+        """Close the SQLite store."""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
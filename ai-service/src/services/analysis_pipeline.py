@@ -0,0 +1,225 @@
+"""
+Document analysis pipeline: fetch, extract and analyze.
+
+Each stage runs under its own concurrency limit, shared by every caller, so
+batch fan-out cannot overload MinIO, the extraction pool or Groq. Concurrent
+requests for the same document share a single run.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+from src.config import Settings, get_settings
+from src.services.ai_analyzer import AiAnalyzer, DocumentMetadata
+from src.services.analysis_cache import AnalysisCache
+from src.services.document_buffer import DocumentBuffer
+from src.services.document_classifier import Classification, DocumentClassifier
+from src.services.minio_client import MinioClient
+from src.services.pdf_extraction_pool import PdfExtractionPool
+from src.services.pdf_extractor import ExtractedText
+from src.services.single_flight import SingleFlight
+from src.services.text_normalizer import TextNormalizer
+from src.utils.logger import get_logger
+from src.utils.metrics import EXTRACTED_CHARS, PDF_PAGES, PDF_SIZE_BYTES, track_stage
+
+logger = get_logger(__name__)
+
+
+class AnalysisPipeline:
+    """
+    Runs the analysis stages for a single document.
+
+    Errors from the individual services propagate unchanged so that callers
+    can map them to error codes.
+    """
+
+    def __init__(
+        self,
+        minio_client: MinioClient,
+        extraction_pool: PdfExtractionPool,
+        ai_analyzer: AiAnalyzer,
+        analysis_cache: AnalysisCache,
+        settings: Settings | None = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            minio_client: Client used to fetch documents.
+            extraction_pool: Pool used to extract PDF text.
+            ai_analyzer: Analyzer used to generate metadata.
+            analysis_cache: Cache of previous analysis results.
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+        self._minio_client = minio_client
+        self._extraction_pool = extraction_pool
+        self._ai_analyzer = ai_analyzer
+        self._analysis_cache = analysis_cache
+        self._text_normalizer = TextNormalizer(self._settings)
+        self._document_classifier = DocumentClassifier(self._settings)
+        self._single_flight: SingleFlight[DocumentMetadata] = SingleFlight()
+
+        self._fetch_limit = asyncio.Semaphore(self._settings.fetch_concurrency)
+        self._extract_limit = asyncio.Semaphore(self._settings.extract_concurrency)
+        self._llm_limit = asyncio.Semaphore(self._settings.llm_concurrency)
+
+    async def analyze(
+        self, patient_id: str, document_id: str, filename: str | None = None
+    ) -> DocumentMetadata:
+        """
+        Fetch, extract and analyze a document.
+
+        Args:
+            patient_id: The patient ID owning the document.
+            document_id: The unique document identifier.
+            filename: The object's file name, if known by the caller.
+
+        Returns:
+            DocumentMetadata containing summary and tags.
+        """
+        # The file name only spares the object lookup, so callers with and without it share a run
+        return await self._single_flight.do(
+            (patient_id, document_id),
+            lambda: self._run(patient_id, document_id, filename),
+        )
+
+    @property
+    def coalesced_requests(self) -> int:
+        """Requests that joined an in-flight analysis of the same document."""
+        return self._single_flight.coalesced_calls
+
+    @property
+    def avoided_llm_calls(self) -> int:
+        """AI calls skipped because the document was classified as non-medical."""
+        return self._document_classifier.avoided_calls
+
+    async def analyze_stream(
+        self, patient_id: str, document_id: str, filename: str | None = None
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Fetch, extract and analyze a document, reporting progress as it goes.
+
+        The summary is streamed as the AI generates it. Streaming runs are not
+        shared with concurrent requests for the same document.
+
+        Args:
+            patient_id: The patient ID owning the document.
+            document_id: The unique document identifier.
+            filename: The object's file name, if known by the caller.
+
+        Yields:
+            (event, data) pairs: "fetched" and "extracted" with stage details,
+            "summary" with each new piece of the summary, then "result" with
+            the final summary and tags.
+        """
+        with await self._fetch(patient_id, document_id, filename) as document:
+            yield "fetched", {"bytes": document.size}
+            extracted, document_text, classification = await self._extract(document_id, document)
+        yield "extracted", {"pages": extracted.page_count, "characters": len(document_text)}
+
+        metadata, cache_key = await self._local_result(document_id, document_text, classification)
+        streamed = False
+        if metadata is None:
+            async with self._llm_limit:
+                logger.debug("Analyzing document %s with AI (streaming)", document_id)
+                with track_stage("llm"):
+                    async for item in self._ai_analyzer.analyze_stream(document_text):
+                        if isinstance(item, DocumentMetadata):
+                            metadata = item
+                        else:
+                            streamed = True
+                            yield "summary", {"delta": item}
+            await self._analysis_cache.put(cache_key, metadata)
+
+        if not streamed and metadata.summary:
+            yield "summary", {"delta": metadata.summary}
+        yield "result", {"summary": metadata.summary, "tags": metadata.tags}
+
+    async def _run(
+        self, patient_id: str, document_id: str, filename: str | None
+    ) -> DocumentMetadata:
+        # The document is released as soon as its text is extracted
+        with await self._fetch(patient_id, document_id, filename) as document:
+            _, document_text, classification = await self._extract(document_id, document)
+
+        metadata, cache_key = await self._local_result(document_id, document_text, classification)
+        if metadata is not None:
+            return metadata
+
+        async with self._llm_limit:
+            logger.debug("Analyzing document %s with AI", document_id)
+            with track_stage("llm"):
+                metadata = await self._ai_analyzer.analyze(document_text)
+
+        await self._analysis_cache.put(cache_key, metadata)
+        return metadata
+
+    async def _fetch(
+        self, patient_id: str, document_id: str, filename: str | None
+    ) -> DocumentBuffer:
+        async with self._fetch_limit:
+            logger.debug("Fetching document %s from MinIO", document_id)
+            with track_stage("fetch"):
+                document = await self._minio_client.fetch_document(
+                    patient_id, document_id, filename
+                )
+        PDF_SIZE_BYTES.observe(document.size)
+        return document
+
+    async def _extract(
+        self, document_id: str, document: DocumentBuffer
+    ) -> tuple[ExtractedText, str, Classification]:
+        """Extract, normalize and classify the document text."""
+        async with self._extract_limit:
+            logger.debug("Extracting text from document %s", document_id)
+            with track_stage("extract"):
+                extracted = await self._extraction_pool.extract(document.source())
+            PDF_PAGES.observe(extracted.page_count)
+            EXTRACTED_CHARS.observe(len(extracted.text))
+
+            with track_stage("normalize"):
+                normalized = await asyncio.to_thread(
+                    self._text_normalizer.normalize, extracted.text
+                )
+
+            with track_stage("classify"):
+                classification = await asyncio.to_thread(
+                    self._document_classifier.classify, normalized.text
+                )
+
+        if normalized.chars_saved:
+            logger.info(
+                "Normalization saved %s characters (~%s tokens) for document %s",
+                normalized.chars_saved,
+                normalized.estimated_tokens_saved,
+                document_id,
+            )
+
+        return extracted, normalized.text, classification
+
+    async def _local_result(
+        self, document_id: str, document_text: str, classification: Classification
+    ) -> tuple[DocumentMetadata | None, str]:
+        """
+        Resolve the analysis without the AI, if possible.
+
+        Returns:
+            The metadata of a non-medical or cached document (None if the AI
+            is needed) and the cache key of the document text.
+        """
+        cache_key = self._analysis_cache.make_key(document_text)
+
+        if classification.non_medical:
+            self._document_classifier.record_avoided_call()
+            logger.info(
+                "Document %s classified as non-medical (%s administrative term(s)), skipping AI",
+                document_id,
+                classification.non_medical_hits,
+            )
+            return DocumentMetadata(summary="", tags=[]), cache_key
+
+        metadata = await self._analysis_cache.get(cache_key)
+        if metadata is not None:
+            logger.info("Using cached analysis for document %s", document_id)
+        return metadata, cache_key
@@ -0,0 +1,166 @@
+"""
+Bounded-memory buffers for fetched documents.
+
+A document is kept in memory while it is small and spilled to a temporary
+file once it grows past document_spool_threshold_bytes, or once the
+documents held in memory by all requests together would exceed
+document_memory_budget_bytes. Spilled documents are handed to the PDF
+extractor by path, so MuPDF reads pages from disk as it needs them and
+peak memory does not depend on document size.
+"""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import IO
+
+from src.config import Settings, get_settings
+from src.utils.logger import get_logger
+from src.utils.metrics import DOCUMENT_MEMORY_BYTES, DOCUMENTS_SPOOLED
+
+logger = get_logger(__name__)
+
+
+class DocumentMemoryBudget:
+    """Bytes of document content held in memory, shared by all requests."""
+
+    def __init__(self, limit_bytes: int):
+        """
+        Initialize the budget.
+
+        Args:
+            limit_bytes: Maximum bytes held in memory at once.
+        """
+        self._limit_bytes = limit_bytes
+        self._used_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def used_bytes(self) -> int:
+        """Bytes currently reserved."""
+        return self._used_bytes
+
+    def try_reserve(self, size: int) -> bool:
+        """
+        Reserve memory for document content.
+
+        Args:
+            size: Bytes to reserve.
+
+        Returns:
+            True if the bytes fit in the budget and were reserved.
+        """
+        with self._lock:
+            if self._used_bytes + size > self._limit_bytes:
+                return False
+            self._used_bytes += size
+        DOCUMENT_MEMORY_BYTES.inc(size)
+        return True
+
+    def release(self, size: int) -> None:
+        """Return reserved bytes to the budget."""
+        with self._lock:
+            self._used_bytes -= size
+        DOCUMENT_MEMORY_BYTES.dec(size)
+
+
+class DocumentBuffer:
+    """
+    Content of a single document, written in chunks as it is downloaded.
+
+    Use as a context manager, or call close(), to release its memory
+    reservation and delete its temporary file.
+
+    Attributes:
+        size: Bytes written so far.
+    """
+
+    def __init__(self, budget: DocumentMemoryBudget, settings: Settings | None = None):
+        """
+        Initialize an empty buffer.
+
+        Args:
+            budget: Memory budget shared with the other buffers.
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+        self._budget = budget
+        self._chunks: list[bytes] = []
+        self._reserved = 0
+        self._file: IO[bytes] | None = None
+        self._path: Path | None = None
+        self.size = 0
+
+    @property
+    def spooled(self) -> bool:
+        """Whether the content was spilled to a temporary file."""
+        return self._path is not None
+
+    def write(self, chunk: bytes) -> None:
+        """Append a chunk of content."""
+        self.size += len(chunk)
+        if self._path is None:
+            if (
+                self.size <= self._settings.document_spool_threshold_bytes
+                and self._budget.try_reserve(len(chunk))
+            ):
+                self._chunks.append(chunk)
+                self._reserved += len(chunk)
+                return
+            self._spill()
+        self._file.write(chunk)
+
+    def _spill(self) -> None:
+        self._file = tempfile.NamedTemporaryFile(
+            prefix="document-",
+            suffix=".pdf",
+            dir=self._settings.document_spool_dir or None,
+            delete=False,
+        )
+        self._path = Path(self._file.name)
+        for chunk in self._chunks:
+            self._file.write(chunk)
+        self._chunks = []
+        self._budget.release(self._reserved)
+        self._reserved = 0
+        DOCUMENTS_SPOOLED.inc()
+        logger.debug("Spooling document to %s after %s bytes", self._path, self.size)
+
+    def source(self) -> bytes | Path:
+        """
+        Return the content for the PDF extractor.
+
+        Returns:
+            The content itself if held in memory, else the path of the
+            temporary file holding it.
+        """
+        if self._path is None:
+            if len(self._chunks) > 1:
+                self._chunks = [b"".join(self._chunks)]
+            return self._chunks[0] if self._chunks else b""
+
+        if not self._file.closed:
+            self._file.close()
+        return self._path
+
+    def close(self) -> None:
+        """Release the memory reservation and delete the temporary file."""
+        self._chunks = []
+        if self._reserved:
+            self._budget.release(self._reserved)
+            self._reserved = 0
+
+        if self._path is not None:
+            self._file.close()
+            try:
+                os.unlink(self._path)
+            except FileNotFoundError:
+                pass
+            self._path = None
+
+    def __enter__(self) -> "DocumentBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
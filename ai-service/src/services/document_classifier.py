@@ -0,0 +1,116 @@
+"""
+Local pre-classification of documents before the AI analysis.
+
+Invoices, receipts, contracts and bills are returned with empty metadata by
+the AI anyway. A keyword index of Italian (and common English) medical and
+administrative terms recognizes the obvious ones locally, so their LLM
+round trip can be skipped. The classifier is deliberately conservative: any
+real medical vocabulary sends the document to the AI. It is off unless
+classifier_enabled is set.
+"""
+
+import re
+from dataclasses import dataclass
+
+from src.config import Settings, get_settings
+from src.utils.logger import get_logger
+from src.utils.metrics import LLM_CALLS_AVOIDED
+
+logger = get_logger(__name__)
+
+# Word stems matched at the start of a word, case-insensitively
+MEDICAL_TERMS_PATTERN = re.compile(
+    r"\b(?:diagnos|terapi|therap|refert|pazient|patient|anamnes|patolog|sintom|symptom"
+    r"|farmac|posologi|prescri|ricett|esami\b|esame\b|emocromo|glicemi|colesterol"
+    r"|emoglobin|leucocit|piastrin|creatinin|ipertens|hypertens|diabet|ecografi|radiograf"
+    r"|risonanza\s+magnetica|elettrocardiogramm|ecg\b|tac\b|cardiolog|ortoped|neurolog"
+    r"|dermatolog|oncolog|pediatr|ginecolog|chirurg|surg|ricover|dimission|pronto\s+soccorso"
+    r"|ambulator|ospedal|hospital|clinic|medic|infermier|vaccin|allergi|compress|dosaggi"
+    r"|mg/dl|mmhg|visita\s+specialistic|sanitari|asl\b|ssn\b)",
+    re.IGNORECASE,
+)
+
+# Terms that also appear in medical reports (totals of lab panels, amounts,
+# rates, consumption, balances) are left out on purpose. The euro sign is not a
+# word character, so it is matched outside the word boundaries.
+NON_MEDICAL_TERMS_PATTERN = re.compile(
+    r"\b(?:fattur|invoice|imponibil|iva\b|vat\b|aliquot|scontrin|receipt|pagament|payment"
+    r"|bonific|iban\b|contratt|contract|locazion|locator|conduttor|canone|clausol|preventiv"
+    r"|quotation|spedizion|shipping|fornitor|supplier|prezzo|price|sconto|discount|bollett"
+    r"|utenza|kwh\b|polizz|mutuo|estratto\s+conto|busta\s+paga|retribuzion|stipendi|salary)"
+    r"|€",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class Classification:
+    """
+    Result of document pre-classification.
+
+    Attributes:
+        medical_hits: Occurrences of medical terms.
+        non_medical_hits: Occurrences of administrative and commercial terms.
+        non_medical: True if the document is confidently not medical.
+    """
+
+    medical_hits: int
+    non_medical_hits: int
+    non_medical: bool
+
+
+class DocumentClassifier:
+    """
+    Recognizes obviously non-medical documents from their vocabulary.
+
+    A document is non-medical when it contains at least the configured number
+    of administrative terms and medical terms make up at most the configured
+    share of all matched terms.
+    """
+
+    def __init__(self, settings: Settings | None = None):
+        """
+        Initialize the document classifier.
+
+        Args:
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+        self.avoided_calls = 0
+
+    def classify(self, text: str) -> Classification:
+        """
+        Classify extracted document text.
+
+        Args:
+            text: The normalized document text.
+
+        Returns:
+            Classification with the term counts and the decision.
+        """
+        if not self._settings.classifier_enabled:
+            return Classification(medical_hits=0, non_medical_hits=0, non_medical=False)
+
+        medical_hits = len(MEDICAL_TERMS_PATTERN.findall(text))
+        non_medical_hits = len(NON_MEDICAL_TERMS_PATTERN.findall(text))
+
+        non_medical = (
+            non_medical_hits >= self._settings.classifier_min_non_medical_terms
+            and medical_hits
+            <= self._settings.classifier_max_medical_ratio * (medical_hits + non_medical_hits)
+        )
+
+        logger.debug(
+            "Document classified with %s medical and %s non-medical term(s), non_medical=%s",
+            medical_hits,
+            non_medical_hits,
+            non_medical,
+        )
+        return Classification(
+            medical_hits=medical_hits, non_medical_hits=non_medical_hits, non_medical=non_medical
+        )
+
+    def record_avoided_call(self) -> None:
+        """Count an LLM call skipped thanks to the classification."""
+        self.avoided_calls += 1
+        LLM_CALLS_AVOIDED.inc()
@@ -0,0 +1,451 @@
+"""
+Event-driven document ingestion.
+
+Consumes document-created and document-updated events, analyzes each
+document through a bounded pool of concurrent handlers and publishes the
+outcome as a document-analyzed event. Offsets are committed only once the
+result has been published, so a crash or a transient failure leads to the
+event being delivered again rather than lost.
+"""
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from src.config import Settings, get_settings
+from src.utils.logger import get_logger, log_context
+from src.utils.metrics import DOCUMENT_EVENTS
+
+if TYPE_CHECKING:
+    from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
+
+logger = get_logger(__name__)
+
+# Error codes of failures that may succeed when the event is delivered again
+RETRYABLE_ERROR_CODES = frozenset(
+    {"MINIO_CONNECTION_FAILED", "AI_GENERATION_FAILED", "INTERNAL_ERROR"}
+)
+
+
+@dataclass(frozen=True)
+class EventRecord:
+    """
+    A record read from the broker.
+
+    Attributes:
+        topic: Topic the record was read from.
+        partition: Partition within the topic.
+        offset: Position of the record within the partition.
+        value: Raw record payload.
+    """
+
+    topic: str
+    partition: int
+    offset: int
+    value: bytes
+
+
+@dataclass(frozen=True)
+class DocumentEvent:
+    """
+    A document upload or update to analyze.
+
+    Attributes:
+        event_type: "created" or "updated", after the topic it arrived on.
+        document_id: The document to analyze.
+        patient_id: The patient owning the document.
+        filename: The document's object file name, if the publisher knows it.
+    """
+
+    event_type: str
+    document_id: str
+    patient_id: str
+    filename: str | None = None
+
+
+class EventBroker(ABC):
+    """Subscription to the document topics and publication of results."""
+
+    @abstractmethod
+    async def start(self, topics: list[str]) -> None:
+        """Connect and subscribe to the given topics."""
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Disconnect, leaving uncommitted records to be delivered again."""
+
+    @abstractmethod
+    async def poll(self, max_records: int, timeout: float) -> list[EventRecord]:
+        """Return up to max_records new records, waiting at most timeout seconds."""
+
+    @abstractmethod
+    async def commit(self, offsets: dict[tuple[str, int], int]) -> None:
+        """Commit, per (topic, partition), the offset of the next record to read."""
+
+    @abstractmethod
+    async def seek(self, topic: str, partition: int, offset: int) -> None:
+        """Read a partition again from the given offset on the next poll."""
+
+    @abstractmethod
+    async def publish(self, topic: str, key: str, value: bytes) -> None:
+        """Publish a record and wait until the broker has acknowledged it."""
+
+
+class KafkaEventBroker(EventBroker):
+    """Kafka consumer group member and producer, as used by the Kotlin services."""
+
+    def __init__(self, settings: Settings | None = None):
+        """
+        Initialize the broker.
+
+        Args:
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+        self._consumer: AIOKafkaConsumer | None = None
+        self._producer: AIOKafkaProducer | None = None
+
+    async def start(self, topics: list[str]) -> None:
+        # Imported here, as most deployments run without Kafka
+        from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
+
+        self._consumer = AIOKafkaConsumer(
+            *topics,
+            bootstrap_servers=self._settings.kafka_bootstrap_servers,
+            client_id=self._settings.kafka_client_id,
+            group_id=self._settings.kafka_consumer_group_id,
+            enable_auto_commit=False,
+            auto_offset_reset="earliest",
+        )
+        self._producer = AIOKafkaProducer(
+            bootstrap_servers=self._settings.kafka_bootstrap_servers,
+            client_id=f"{self._settings.kafka_client_id}-analysis-results",
+            acks="all",
+        )
+        try:
+            await self._consumer.start()
+            await self._producer.start()
+        except Exception:
+            # Leave nothing half-connected behind, so that start() can be called again
+            await self.stop()
+            raise
+
+    async def stop(self) -> None:
+        if self._consumer is not None:
+            await self._consumer.stop()
+            self._consumer = None
+        if self._producer is not None:
+            await self._producer.stop()
+            self._producer = None
+
+    async def poll(self, max_records: int, timeout: float) -> list[EventRecord]:
+        batches = await self._consumer.getmany(
+            timeout_ms=int(timeout * 1000), max_records=max_records
+        )
+        return [
+            EventRecord(record.topic, record.partition, record.offset, record.value)
+            for records in batches.values()
+            for record in records
+        ]
+
+    async def commit(self, offsets: dict[tuple[str, int], int]) -> None:
+        from aiokafka import TopicPartition
+
+        await self._consumer.commit(
+            {
+                TopicPartition(topic, partition): offset
+                for (topic, partition), offset in offsets.items()
+            }
+        )
+
+    async def seek(self, topic: str, partition: int, offset: int) -> None:
+        from aiokafka import TopicPartition
+
+        self._consumer.seek(TopicPartition(topic, partition), offset)
+
+    async def publish(self, topic: str, key: str, value: bytes) -> None:
+        await self._producer.send_and_wait(topic, value=value, key=key.encode())
+
+
+class InMemoryEventBroker(EventBroker):
+    """
+    Single-partition topics in process memory.
+
+    Stands in for Kafka in local runs and tests: records are added with
+    produce(), published records can be read back with records(), and
+    committed offsets survive a stop() and start() like a consumer group's.
+    """
+
+    def __init__(self):
+        self._topics: dict[str, list[bytes]] = defaultdict(list)
+        self._committed: dict[str, int] = {}
+        self._positions: dict[str, int] = {}
+        self._appended = asyncio.Event()
+
+    def produce(self, topic: str, value: bytes) -> None:
+        """Append a record to a topic."""
+        self._topics[topic].append(value)
+        self._appended.set()
+
+    def records(self, topic: str) -> list[bytes]:
+        """Return every record of a topic."""
+        return list(self._topics[topic])
+
+    def committed(self, topic: str) -> int:
+        """Return the committed offset of a topic."""
+        return self._committed.get(topic, 0)
+
+    async def start(self, topics: list[str]) -> None:
+        self._positions = {topic: self._committed.get(topic, 0) for topic in topics}
+
+    async def stop(self) -> None:
+        self._positions = {}
+
+    async def poll(self, max_records: int, timeout: float) -> list[EventRecord]:
+        records = self._take(max_records)
+        if not records:
+            self._appended.clear()
+            try:
+                await asyncio.wait_for(self._appended.wait(), timeout)
+            except TimeoutError:
+                return []
+            records = self._take(max_records)
+        return records
+
+    async def commit(self, offsets: dict[tuple[str, int], int]) -> None:
+        for (topic, _), offset in offsets.items():
+            self._committed[topic] = offset
+
+    async def seek(self, topic: str, partition: int, offset: int) -> None:
+        self._positions[topic] = offset
+
+    async def publish(self, topic: str, key: str, value: bytes) -> None:
+        self.produce(topic, value)
+
+    def _take(self, max_records: int) -> list[EventRecord]:
+        records = []
+        for topic, position in self._positions.items():
+            values = self._topics[topic][position : position + max_records - len(records)]
+            records.extend(
+                EventRecord(topic, 0, position + index, value) for index, value in enumerate(values)
+            )
+            self._positions[topic] = position + len(values)
+        return records
+
+
+DocumentEventHandler = Callable[[DocumentEvent], Awaitable[dict[str, Any]]]
+
+
+class DocumentEventsConsumer:
+    """
+    Analyzes documents as their upload and update events arrive.
+
+    Records are polled in batches and handled concurrently, at most
+    document_event_workers at a time. Once a batch is handled, each
+    partition is committed up to its first record that must be retried, and
+    read again from there. A record is retried when its handler raises or
+    returns a retryable error code, up to document_event_max_attempts times;
+    after that, the failure is published like any other result.
+
+    The broker is connected in the background and the connection retried
+    until it succeeds, so an unreachable broker delays event ingestion
+    without keeping the service from starting.
+    """
+
+    POLL_TIMEOUT_SECONDS = 1.0
+    ERROR_BACKOFF_SECONDS = 5.0
+
+    def __init__(
+        self,
+        broker: EventBroker,
+        handler: DocumentEventHandler,
+        settings: Settings | None = None,
+    ):
+        """
+        Initialize the consumer.
+
+        Args:
+            broker: Broker to consume events from and publish results to.
+            handler: Coroutine analyzing a document and returning the /analyze response body.
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+        self._broker = broker
+        self._handler = handler
+        self._workers = asyncio.Semaphore(self._settings.document_event_workers)
+        self._event_types = {
+            self._settings.kafka_topic_document_created: "created",
+            self._settings.kafka_topic_document_updated: "updated",
+        }
+        self._attempts: dict[tuple[str, int, int], int] = {}
+        # Records published but not yet committed, skipped when read again
+        self._published: set[tuple[str, int, int]] = set()
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Start subscribing to the document topics and consuming in the background."""
+        self._task = asyncio.create_task(self._run(), name="document-events-consumer")
+
+    async def _run(self) -> None:
+        topics = list(self._event_types)
+        while True:
+            try:
+                await self._broker.start(topics)
+                break
+            except Exception as e:
+                logger.warning(
+                    "Failed to connect the document events consumer, retrying in %ss: %s",
+                    self.ERROR_BACKOFF_SECONDS,
+                    e,
+                )
+                await asyncio.sleep(self.ERROR_BACKOFF_SECONDS)
+
+        logger.info(
+            "Document events consumer subscribed to %s with %s worker(s)",
+            topics,
+            self._settings.document_event_workers,
+        )
+        await self._consume_loop()
+
+    async def stop(self) -> None:
+        """Stop consuming. Records of an unfinished batch are delivered again later."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._broker.stop()
+        logger.info("Document events consumer stopped")
+
+    async def _consume_loop(self) -> None:
+        while True:
+            try:
+                records = await self._broker.poll(
+                    self._settings.document_event_max_poll_records, self.POLL_TIMEOUT_SECONDS
+                )
+                if records:
+                    await self._process_batch(records)
+            except Exception:
+                logger.exception("Document events consumer failed, resuming shortly")
+                await asyncio.sleep(self.ERROR_BACKOFF_SECONDS)
+
+    async def _process_batch(self, records: list[EventRecord]) -> None:
+        handled = await asyncio.gather(*(self._process(record) for record in records))
+
+        partitions: dict[tuple[str, int], list[tuple[EventRecord, bool]]] = defaultdict(list)
+        for record, done in zip(records, handled, strict=True):
+            partitions[(record.topic, record.partition)].append((record, done))
+
+        offsets = {}
+        retrying = False
+        for (topic, partition), results in partitions.items():
+            for record, done in sorted(results, key=lambda result: result[0].offset):
+                if not done:
+                    await self._broker.seek(topic, partition, record.offset)
+                    retrying = True
+                    break
+                offsets[(topic, partition)] = record.offset + 1
+
+        if offsets:
+            await self._broker.commit(offsets)
+            self._published = {
+                (topic, partition, offset)
+                for topic, partition, offset in self._published
+                if offset >= offsets.get((topic, partition), 0)
+            }
+        if retrying:
+            await asyncio.sleep(self._settings.retry_delay_seconds)
+
+    async def _process(self, record: EventRecord) -> bool:
+        """Handle one record and return whether its offset may be committed."""
+        if (record.topic, record.partition, record.offset) in self._published:
+            return True
+
+        event = self._parse(record)
+        if event is None:
+            DOCUMENT_EVENTS.labels("invalid").inc()
+            return True
+
+        async with self._workers:
+            with log_context(document_id=event.document_id):
+                return await self._handle(record, event)
+
+    async def _handle(self, record: EventRecord, event: DocumentEvent) -> bool:
+        key = (record.topic, record.partition, record.offset)
+        try:
+            result = await self._handler(event)
+        except Exception as e:
+            logger.exception("Handling %s event failed", event.event_type)
+            result = {
+                "success": False,
+                "error_code": "INTERNAL_ERROR",
+                "error_message": f"Internal error: {e}",
+            }
+
+        if not result["success"] and result.get("error_code") in RETRYABLE_ERROR_CODES:
+            attempts = self._attempts.get(key, 0) + 1
+            if attempts < self._settings.document_event_max_attempts:
+                self._attempts[key] = attempts
+                DOCUMENT_EVENTS.labels("retried").inc()
+                logger.warning(
+                    "Analysis attempt %s of document %s failed with %s, retrying",
+                    attempts,
+                    event.document_id,
+                    result.get("error_code"),
+                )
+                return False
+
+        try:
+            await self._publish(event, result)
+        except Exception as e:
+            logger.error("Failed to publish analysis of document %s: %s", event.document_id, e)
+            return False
+
+        self._attempts.pop(key, None)
+        self._published.add(key)
+        DOCUMENT_EVENTS.labels("analyzed" if result["success"] else "failed").inc()
+        return True
+
+    def _parse(self, record: EventRecord) -> DocumentEvent | None:
+        try:
+            payload = json.loads(record.value)
+            filename = payload.get("filename")
+            return DocumentEvent(
+                event_type=self._event_types[record.topic],
+                document_id=str(payload["documentId"]),
+                patient_id=str(payload["patientId"]),
+                # Object names are looked up when the file name could escape the document prefix
+                filename=filename if filename and not set(filename) & {"/", "\\"} else None,
+            )
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.error(
+                "Skipping malformed record at %s/%s@%s: %s",
+                record.topic,
+                record.partition,
+                record.offset,
+                e,
+            )
+            return None
+
+    async def _publish(self, event: DocumentEvent, result: dict[str, Any]) -> None:
+        payload = {
+            "documentId": event.document_id,
+            "patientId": event.patient_id,
+            "eventType": event.event_type,
+            "success": result["success"],
+            "summary": result.get("summary", ""),
+            "tags": result.get("tags", []),
+            "errorCode": result.get("error_code"),
+            "errorMessage": result.get("error_message"),
+            "sourceService": self._settings.kafka_client_id,
+            "occurredAt": datetime.now(UTC).isoformat(),
+        }
+        await self._broker.publish(
+            self._settings.kafka_topic_document_analyzed,
+            event.document_id,
+            json.dumps(payload, ensure_ascii=False).encode(),
+        )
@@ -0,0 +1,149 @@
+"""
+Packing of short documents into shared AI calls.
+
+Short documents spend most of their prompt on the system prompt. Documents
+arriving within a short window are grouped and analyzed in one call, so
+the system prompt and the request count against the quota once per group
+instead of once per document.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+from src.config import Settings, get_settings
+from src.utils.logger import get_logger
+from src.utils.metrics import LLM_PACK_FALLBACKS, LLM_PACK_SIZE
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class DocumentPacker(Generic[T]):
+    """
+    Groups documents submitted close together into packed calls.
+
+    A group is sent once ai_packing_window_seconds have passed since its
+    first document, or as soon as it holds ai_packing_max_documents or the
+    next document would take it past ai_max_input_chars. A group of one is
+    analyzed alone. Documents the packed call returns no result for are
+    analyzed alone as well; errors of the packed call itself are raised to
+    every caller of the group.
+    """
+
+    def __init__(
+        self,
+        analyze_pack: Callable[[list[str]], Awaitable[list[T | None]]],
+        analyze_one: Callable[[str], Awaitable[T]],
+        settings: Settings | None = None,
+    ):
+        """
+        Initialize the packer.
+
+        Args:
+            analyze_pack: Analyzes several documents in one call, returning
+                a result per document in order, None where it has none.
+            analyze_one: Analyzes a single document.
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+        self._analyze_pack = analyze_pack
+        self._analyze_one = analyze_one
+        self._pending: list[tuple[str, asyncio.Future[T]]] = []
+        self._pending_chars = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def analyze(self, document_text: str) -> T:
+        """
+        Analyze a document as part of the next packed call.
+
+        Args:
+            document_text: Text of the document.
+
+        Returns:
+            The result for the document.
+        """
+        if self._pending_chars + len(document_text) > self._settings.ai_max_input_chars:
+            self._flush()
+
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        self._pending.append((document_text, future))
+        self._pending_chars += len(document_text)
+
+        if len(self._pending) >= self._settings.ai_packing_max_documents:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self._settings.ai_packing_window_seconds, self._flush
+            )
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = [(text, future) for text, future in self._pending if not future.done()]
+        self._pending = []
+        self._pending_chars = 0
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future[T]]]) -> None:
+        LLM_PACK_SIZE.observe(len(batch))
+        if len(batch) == 1:
+            await self._run_one(*batch[0])
+            return
+
+        logger.debug("Analyzing %s documents in one packed call", len(batch))
+        try:
+            results = await self._analyze_pack([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if len(results) != len(batch):
+            logger.warning(
+                "Packed call returned %s result(s) for %s document(s), ignoring them",
+                len(results),
+                len(batch),
+            )
+            results = [None] * len(batch)
+
+        fallbacks = []
+        for (text, future), result in zip(batch, results, strict=True):
+            if result is None:
+                fallbacks.append(self._run_one(text, future))
+            elif not future.done():
+                future.set_result(result)
+
+        if fallbacks:
+            LLM_PACK_FALLBACKS.inc(len(fallbacks))
+            logger.warning(
+                "Packed call returned no usable result for %s of %s document(s), "
+                "analyzing them alone",
+                len(fallbacks),
+                len(batch),
+            )
+            await asyncio.gather(*fallbacks)
+
+    async def _run_one(self, text: str, future: asyncio.Future[T]) -> None:
+        if future.done():
+            return
+        try:
+            result = await self._analyze_one(text)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
@@ -0,0 +1,175 @@
+"""
+Pooled HTTP clients for Groq and MinIO.
+
+Both clients keep their connections alive between requests and size their
+pools after the service's concurrency settings, so steady traffic never pays
+for TCP and TLS setup. Groq calls share one httpx client speaking HTTP/2;
+MinIO goes through a urllib3 PoolManager. Each pool reports its size, the
+connections in use and the requests that found it exhausted.
+"""
+
+import os
+import threading
+from collections.abc import AsyncIterator
+
+import certifi
+import httpx
+import urllib3
+from groq import DefaultAsyncHttpxClient
+
+from src.config import Settings
+from src.utils.metrics import HTTP_POOL_IN_USE, HTTP_POOL_SATURATED, HTTP_POOL_SIZE
+
+GROQ_POOL = "groq"
+MINIO_POOL = "minio"
+
+# Connections to MinIO beyond the fetch concurrency, for health probes
+MINIO_EXTRA_CONNECTIONS = 2
+
+# Same read timeout as the connection pool the minio SDK builds by default
+MINIO_TIMEOUT_SECONDS = 300
+
+# No retries inside urllib3: retry_async owns retries and the circuit breaker,
+# which must see every failed attempt
+MINIO_RETRIES = urllib3.Retry(total=0, connect=0, read=0, status=0, redirect=False)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that releases its pool slot once closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, transport: "_TrackedTransport"):
+        self._stream = stream
+        self._transport = transport
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._transport.release()
+
+
+class _TrackedTransport(httpx.AsyncBaseTransport):
+    """Counts requests in flight on a transport, from sending to closing the response."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, pool: str, size: int):
+        self._transport = transport
+        self._pool = pool
+        self._size = size
+        self._in_use = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._in_use >= self._size:
+            HTTP_POOL_SATURATED.labels(self._pool).inc()
+        self._in_use += 1
+        HTTP_POOL_IN_USE.labels(self._pool).inc()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self.release()
+            raise
+
+        response.stream = _ReleasingStream(response.stream, self)
+        return response
+
+    def release(self) -> None:
+        self._in_use -= 1
+        HTTP_POOL_IN_USE.labels(self._pool).dec()
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class _TrackedHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    """
+    Connection pool counting checked-out connections and exhaustion.
+
+    urllib3 puts None back both for a connection it dropped after an error and
+    after a checkout that failed because the pool was closed; only the former
+    was counted, so each thread remembers whether its last checkout succeeded.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._checkout = threading.local()
+
+    def _get_conn(self, timeout: float | None = None):
+        if self.pool is not None and self.pool.empty():
+            HTTP_POOL_SATURATED.labels(MINIO_POOL).inc()
+        self._checkout.succeeded = False
+        conn = super()._get_conn(timeout)
+        self._checkout.succeeded = True
+        HTTP_POOL_IN_USE.labels(MINIO_POOL).inc()
+        return conn
+
+    def _put_conn(self, conn) -> None:
+        if conn is not None or getattr(self._checkout, "succeeded", True):
+            HTTP_POOL_IN_USE.labels(MINIO_POOL).dec()
+        super()._put_conn(conn)
+
+
+class _TrackedHTTPSConnectionPool(urllib3.HTTPSConnectionPool, _TrackedHTTPConnectionPool):
+    """HTTPS variant of _TrackedHTTPConnectionPool."""
+
+
+def create_groq_http_client(settings: Settings, max_connections: int) -> httpx.AsyncClient:
+    """
+    Create the HTTP client shared by all Groq calls.
+
+    Args:
+        settings: Application settings.
+        max_connections: Connections kept open, at least the number of
+            calls allowed to run at once.
+
+    Returns:
+        An httpx client with keep-alive and, if enabled, HTTP/2.
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=settings.http_keepalive_seconds,
+    )
+    transport = httpx.AsyncHTTPTransport(http2=settings.groq_http2, limits=limits)
+    HTTP_POOL_SIZE.labels(GROQ_POOL).set(max_connections)
+
+    return DefaultAsyncHttpxClient(
+        transport=_TrackedTransport(transport, GROQ_POOL, max_connections),
+        timeout=httpx.Timeout(
+            settings.groq_timeout_seconds, connect=settings.http_connect_timeout_seconds
+        ),
+    )
+
+
+def create_minio_pool_manager(settings: Settings) -> urllib3.PoolManager:
+    """
+    Create the connection pool used by the MinIO client.
+
+    Args:
+        settings: Application settings.
+
+    Returns:
+        A PoolManager keeping a connection per concurrent fetch.
+    """
+    size = settings.fetch_concurrency + MINIO_EXTRA_CONNECTIONS
+    manager = urllib3.PoolManager(
+        maxsize=size,
+        timeout=urllib3.Timeout(
+            connect=settings.http_connect_timeout_seconds, read=MINIO_TIMEOUT_SECONDS
+        ),
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=MINIO_RETRIES,
+    )
+    manager.pool_classes_by_scheme = {
+        "http": _TrackedHTTPConnectionPool,
+        "https": _TrackedHTTPSConnectionPool,
+    }
+    HTTP_POOL_SIZE.labels(MINIO_POOL).set(size)
+    return manager
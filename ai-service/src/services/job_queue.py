@@ -0,0 +1,417 @@
+"""
+Asynchronous analysis jobs.
+
+Jobs are submitted without waiting for the analysis, drained by a pool of
+worker tasks from an in-process queue and persisted through a pluggable
+JobStore, so queued jobs survive a restart. Finished jobs can notify a
+callback URL.
+
+Jobs are only visible to the process that accepted them: both stores are
+local to it, so with several replicas a job can only be polled through the
+replica it was submitted to.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from enum import StrEnum
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from src.config import Settings, get_settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class JobQueueError(Exception):
+    """Base exception for job queue errors."""
+
+    pass
+
+
+class JobQueueFullError(JobQueueError):
+    """Raised when the job queue cannot accept more jobs."""
+
+    pass
+
+
+class JobStatus(StrEnum):
+    """Lifecycle states of an analysis job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """
+    An analysis job.
+
+    Attributes:
+        job_id: Unique job identifier.
+        document_id: The document to analyze.
+        patient_id: The patient owning the document.
+        filename: The document's object file name, if known.
+        callback_url: URL notified with the job once it finishes, if any. Only
+            URLs accepted by is_callback_allowed() are notified.
+        status: Current lifecycle state.
+        result: Analysis response once the job has completed.
+        error_message: Reason the job failed, if it did.
+        created_at: Submission time (Unix timestamp).
+        updated_at: Time of the last status change (Unix timestamp).
+    """
+
+    job_id: str
+    document_id: str
+    patient_id: str
+    filename: str | None = None
+    callback_url: str | None = None
+    status: JobStatus = JobStatus.QUEUED
+    result: dict[str, Any] | None = None
+    error_message: str | None = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+
+class JobStore(ABC):
+    """Persistence for analysis jobs."""
+
+    @abstractmethod
+    async def save(self, job: Job) -> None:
+        """Insert or update a job."""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Job | None:
+        """Return a job by id, or None if unknown."""
+
+    @abstractmethod
+    async def list_unfinished(self) -> list[Job]:
+        """Return queued and running jobs, oldest first."""
+
+    @abstractmethod
+    async def purge_finished(self, older_than: float) -> int:
+        """Delete finished jobs last updated before the given timestamp."""
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class InMemoryJobStore(JobStore):
+    """Keeps jobs in process memory; queued jobs are lost on restart."""
+
+    def __init__(self):
+        self._jobs: dict[str, Job] = {}
+
+    async def save(self, job: Job) -> None:
+        self._jobs[job.job_id] = job
+
+    async def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    async def list_unfinished(self) -> list[Job]:
+        jobs = [job for job in self._jobs.values() if not job.finished]
+        return sorted(jobs, key=lambda job: job.created_at)
+
+    async def purge_finished(self, older_than: float) -> int:
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and job.updated_at < older_than
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+
+class SqliteJobStore(JobStore):
+    """
+    Persists jobs in a SQLite file so queued jobs survive a restart.
+
+    Jobs outlive the process only as long as the file does: in a container
+    the file must be on a persistent volume, or jobs are lost whenever the
+    container is recreated. The file must not be shared between replicas.
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    async def save(self, job: Job) -> None:
+        await asyncio.to_thread(self._execute, self._save_sql(job))
+
+    async def get(self, job_id: str) -> Job | None:
+        rows = await asyncio.to_thread(
+            self._query, "SELECT payload FROM jobs WHERE job_id = ?", (job_id,)
+        )
+        return self._to_job(rows[0][0]) if rows else None
+
+    async def list_unfinished(self) -> list[Job]:
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT payload FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+            (JobStatus.QUEUED, JobStatus.RUNNING),
+        )
+        return [self._to_job(row[0]) for row in rows]
+
+    async def purge_finished(self, older_than: float) -> int:
+        return await asyncio.to_thread(
+            self._execute,
+            (
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (JobStatus.COMPLETED, JobStatus.FAILED, older_than),
+            ),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _save_sql(job: Job) -> tuple[str, tuple]:
+        return (
+            "INSERT OR REPLACE INTO jobs (job_id, status, payload, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (job.job_id, job.status, json.dumps(asdict(job)), job.created_at, job.updated_at),
+        )
+
+    @staticmethod
+    def _to_job(payload: str) -> Job:
+        data = json.loads(payload)
+        data["status"] = JobStatus(data["status"])
+        return Job(**data)
+
+    def _execute(self, statement: tuple[str, tuple]) -> int:
+        with self._lock:
+            cursor = self._db.execute(*statement)
+            self._db.commit()
+            return cursor.rowcount
+
+    def _query(self, sql: str, params: tuple) -> list[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+
+def is_callback_allowed(url: str, settings: Settings) -> bool:
+    """
+    Check whether job results may be sent to a callback URL.
+
+    Job results contain patient data, so they are only sent over HTTP(S) to
+    the hosts listed in job_callback_allowed_hosts.
+
+    Args:
+        url: The callback URL.
+        settings: Application settings.
+    """
+    parsed = httpx.URL(url)
+    allowed_hosts = {host.lower() for host in settings.job_callback_allowed_hosts}
+    return parsed.scheme in ("http", "https") and parsed.host.lower() in allowed_hosts
+
+
+def create_job_store(settings: Settings) -> JobStore:
+    """
+    Create the job store selected by the settings.
+
+    Args:
+        settings: Application settings.
+
+    Returns:
+        The configured JobStore implementation.
+
+    Raises:
+        ValueError: If the configured backend is unknown.
+    """
+    if settings.job_store_backend == "memory":
+        return InMemoryJobStore()
+    if settings.job_store_backend == "sqlite":
+        return SqliteJobStore(settings.job_store_path)
+    raise ValueError(f"Unknown job store backend: {settings.job_store_backend}")
+
+
+JobHandler = Callable[[Job], Awaitable[dict[str, Any]]]
+
+
+class JobQueue:
+    """
+    Runs analysis jobs in the background.
+
+    A fixed number of worker tasks drain an in-process queue. Every state
+    change is written to the JobStore; on start, jobs that were queued or
+    running when the previous process stopped are queued again.
+    """
+
+    PURGE_INTERVAL_SECONDS = 60.0
+
+    def __init__(self, store: JobStore, handler: JobHandler, settings: Settings | None = None):
+        """
+        Initialize the job queue.
+
+        Args:
+            store: Persistence for jobs.
+            handler: Coroutine running the analysis for a job and returning the /analyze
+                response body; a body with success false fails the job.
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+        self._store = store
+        self._handler = handler
+        # Unbounded so recovered jobs always fit; submit() enforces the limit
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._http_client: httpx.AsyncClient | None = None
+
+    async def start(self) -> None:
+        """Re-queue unfinished jobs and start the workers."""
+        self._http_client = httpx.AsyncClient(timeout=self._settings.job_callback_timeout_seconds)
+
+        recovered = await self._store.list_unfinished()
+        for job in recovered:
+            self._queue.put_nowait(job.job_id)
+        if recovered:
+            logger.info("Recovered %s unfinished job(s)", len(recovered))
+
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{index}")
+            for index in range(self._settings.job_workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._purge_loop(), name="job-purge"))
+        logger.info("Job queue started with %s worker(s)", self._settings.job_workers)
+
+    async def stop(self) -> None:
+        """Stop the workers. Running jobs stay persisted as unfinished."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._store.close()
+
+    async def submit(
+        self,
+        patient_id: str,
+        document_id: str,
+        filename: str | None = None,
+        callback_url: str | None = None,
+    ) -> Job:
+        """
+        Queue a document for analysis.
+
+        Args:
+            patient_id: The patient ID owning the document.
+            document_id: The unique document identifier.
+            filename: The document's object file name, if known.
+            callback_url: URL notified with the job once it finishes.
+
+        Returns:
+            The queued job.
+
+        Raises:
+            JobQueueFullError: If the queue is at capacity.
+        """
+        if self._queue.qsize() >= self._settings.job_queue_max_size:
+            raise JobQueueFullError("Job queue is full")
+
+        job = Job(
+            job_id=str(uuid.uuid4()),
+            document_id=document_id,
+            patient_id=patient_id,
+            filename=filename,
+            callback_url=callback_url,
+        )
+        await self._store.save(job)
+        self._queue.put_nowait(job.job_id)
+
+        logger.info("Queued job %s for document %s", job.job_id, document_id)
+        return job
+
+    async def get(self, job_id: str) -> Job | None:
+        """Return a job by id, or None if unknown."""
+        return await self._store.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = await self._store.get(job_id)
+                if job is not None and not job.finished:
+                    await self._run(job)
+            except Exception:
+                logger.exception("Job worker failed while processing job %s", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        await self._update(job, JobStatus.RUNNING)
+
+        try:
+            job.result = await self._handler(job)
+        except Exception as e:
+            logger.exception("Job %s failed", job.job_id)
+            job.error_message = str(e)
+            await self._update(job, JobStatus.FAILED)
+        else:
+            if job.result.get("success", True):
+                await self._update(job, JobStatus.COMPLETED)
+            else:
+                # The analysis reported its failure instead of raising
+                job.error_message = job.result.get("error_message")
+                await self._update(job, JobStatus.FAILED)
+
+        logger.info("Job %s finished with status %s", job.job_id, job.status)
+
+        if job.callback_url:
+            await self._notify(job)
+
+    async def _update(self, job: Job, status: JobStatus) -> None:
+        job.status = status
+        job.updated_at = time.time()
+        await self._store.save(job)
+
+    async def _notify(self, job: Job) -> None:
+        # Checked again, as the allowed hosts may have changed since the job was submitted
+        if not is_callback_allowed(job.callback_url, self._settings):
+            logger.warning(
+                "Not sending job %s to %s: host not allowed", job.job_id, job.callback_url
+            )
+            return
+
+        try:
+            response = await self._http_client.post(job.callback_url, json=asdict(job))
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning("Callback for job %s to %s failed: %s", job.job_id, job.callback_url, e)
+
+    async def _purge_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.PURGE_INTERVAL_SECONDS)
+            try:
+                older_than = time.time() - self._settings.job_retention_seconds
+                purged = await self._store.purge_finished(older_than)
+                if purged:
+                    logger.debug("Purged %s finished job(s)", purged)
+            except Exception as e:
+                logger.warning("Failed to purge finished jobs: %s", e)
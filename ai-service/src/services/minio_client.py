@@ -1,17 +1,32 @@
 """
 MinIO client for fetching PDF documents from object storage.
+
+The underlying minio SDK is blocking, so every storage call is run in the
+default executor to keep the event loop free. Objects are streamed in chunks
+into a DocumentBuffer, which spills large documents to disk.
 """
 
+import asyncio
+import threading
 import time
+from collections import OrderedDict
+from typing import NamedTuple
 
+import urllib3
 from minio import Minio
 from minio.error import S3Error
 
 from src.config import Settings, get_settings
+from src.services.document_buffer import DocumentBuffer, DocumentMemoryBudget
+from src.services.http_pools import create_minio_pool_manager
+from src.services.resilience import CircuitBreaker, CircuitOpenError, retry_async
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Bytes read from the object stream at a time
+READ_CHUNK_BYTES = 1024 * 1024
+
 
 class MinioClientError(Exception):
     """Base exception for MinIO client errors."""
@@ -31,6 +46,20 @@ class MinioConnectionError(MinioClientError):
     pass
 
 
+class DocumentTooLargeError(MinioClientError):
+    """Raised when a document exceeds the configured maximum size."""
+
+    pass
+
+
+class ResolvedObject(NamedTuple):
+    """Cached resolution of a document to its object in the bucket."""
+
+    object_name: str
+    etag: str | None
+    expires_at: float
+
+
 class MinioClient:
     """
     Client for interacting with MinIO object storage.
@@ -46,91 +75,92 @@ class MinioClient:
         """
         self._settings = settings or get_settings()
         self._client = self._create_client()
+        self._breaker = CircuitBreaker("minio", self._settings)
+        self._memory_budget = DocumentMemoryBudget(self._settings.document_memory_budget_bytes)
+
+        # (patient_id, document_id) -> object, so fetches skip list_objects
+        self._resolved: OrderedDict[tuple[str, str], ResolvedObject] = OrderedDict()
+        self._resolved_lock = threading.Lock()
 
     def _create_client(self) -> Minio:
-        logger.info(f"Connecting to MinIO at {self._settings.minio_endpoint}")
+        logger.info("Connecting to MinIO at %s", self._settings.minio_endpoint)
 
         return Minio(
             endpoint=self._settings.minio_endpoint,
             access_key=self._settings.minio_access_key,
             secret_key=self._settings.minio_secret_key,
             secure=self._settings.minio_secure,
+            http_client=create_minio_pool_manager(self._settings),
         )
 
-    def fetch_document(self, patient_id: str, document_id: str) -> bytes:
+    async def fetch_document(
+        self, patient_id: str, document_id: str, filename: str | None = None
+    ) -> DocumentBuffer:
         """
         Fetch a PDF document from MinIO.
 
         The document is expected to be stored at:
         patients/{patient_id}/documents/{document_id}/{filename}.pdf
 
+        When the filename is known the object is fetched directly. Otherwise the
+        object name is looked up in the resolution cache, falling back to
+        listing the document prefix on a miss. Documents larger than
+        document_max_size_bytes are rejected from their Content-Length,
+        before any of the body is read.
+
         Args:
             patient_id: The patient ID owning the document.
             document_id: The unique document identifier.
+            filename: The object's file name, if known by the caller.
 
         Returns:
-            The PDF document content as bytes.
+            A buffer holding the PDF content; the caller must close it.
 
         Raises:
             DocumentNotFoundError: If the document doesn't exist.
+            DocumentTooLargeError: If the document exceeds the maximum size.
             MinioConnectionError: If unable to connect to MinIO.
             MinioClientError: For other MinIO-related errors.
         """
-        prefix = f"patients/{patient_id}/documents/{document_id}/"
-        logger.debug(f"Fetching document with prefix: {prefix}")
-
-        for attempt in range(self._settings.max_retries):
-            try:
-                return self._fetch_with_prefix(prefix, document_id)
-            except DocumentNotFoundError:
-                raise
-            except MinioConnectionError as e:
-                if attempt < self._settings.max_retries - 1:
-                    delay = self._settings.retry_delay_seconds * (2**attempt)
-                    logger.warning(
-                        f"MinIO connection failed, retrying in {delay}s "
-                        f"(attempt {attempt + 1}/{self._settings.max_retries})"
-                    )
-                    time.sleep(delay)
-                else:
-                    raise e
-            except Exception as e:
-                logger.error(f"Unexpected error fetching document: {e}")
-                raise MinioClientError(f"Failed to fetch document: {e}") from e
-
-        raise MinioClientError("Maximum retries exceeded")
-
-    def _fetch_with_prefix(self, prefix: str, document_id: str) -> bytes:
+        logger.debug("Fetching document %s for patient %s", document_id, patient_id)
+
         try:
-            # List objects to find the PDF file
-            objects = list(
-                self._client.list_objects(
-                    bucket_name=self._settings.minio_bucket_name,
-                    prefix=prefix,
-                )
+            return await retry_async(
+                lambda: asyncio.to_thread(self._fetch_object, patient_id, document_id, filename),
+                retry_on=(MinioConnectionError,),
+                breaker=self._breaker,
+                settings=self._settings,
             )
+        except CircuitOpenError as e:
+            raise MinioConnectionError(f"MinIO unavailable: {e}") from e
+        except MinioClientError:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error fetching document: %s", e)
+            raise MinioClientError(f"Failed to fetch document: {e}") from e
 
-            if not objects:
-                logger.warning(f"Document not found: {document_id}")
-                raise DocumentNotFoundError(f"Document not found: {document_id}")
-
-            # Get the first (and should be only) object
-            object_name = objects[0].object_name
-            logger.debug(f"Found object: {object_name}")
-
-            # Fetch the object content
-            response = self._client.get_object(
-                bucket_name=self._settings.minio_bucket_name,
-                object_name=object_name,
-            )
+    def _fetch_object(
+        self, patient_id: str, document_id: str, filename: str | None
+    ) -> DocumentBuffer:
+        prefix = f"patients/{patient_id}/documents/{document_id}/"
 
-            try:
-                content = response.read()
-                logger.info(f"Successfully fetched document {document_id} ({len(content)} bytes)")
-                return content
-            finally:
-                response.close()
-                response.release_conn()
+        try:
+            if filename:
+                return self._get_object(prefix + filename, document_id)
+
+            key = (patient_id, document_id)
+            object_name = self._lookup_object_name(key)
+            if object_name is not None:
+                try:
+                    return self._get_object(object_name, document_id, key)
+                except S3Error as e:
+                    if e.code != "NoSuchKey":
+                        raise
+                    logger.debug("Cached object name %s is stale, resolving again", object_name)
+                    self._invalidate_object_name(key)
+
+            object_name = self._resolve_object_name(prefix, document_id, key)
+            return self._get_object(object_name, document_id, key)
 
         except S3Error as e:
             if e.code == "NoSuchKey" or e.code == "NoSuchBucket":
@@ -139,13 +169,121 @@ class MinioClient:
                 raise MinioConnectionError(f"Failed to connect to MinIO: {e}") from e
             else:
                 raise MinioClientError(f"MinIO error: {e}") from e
-        except ConnectionError as e:
+        except (ConnectionError, urllib3.exceptions.HTTPError) as e:
             raise MinioConnectionError(f"Failed to connect to MinIO: {e}") from e
 
-    def health_check(self) -> bool:
+    def _resolve_object_name(self, prefix: str, document_id: str, key: tuple[str, str]) -> str:
+        # List objects to find the PDF file
+        objects = list(
+            self._client.list_objects(
+                bucket_name=self._settings.minio_bucket_name,
+                prefix=prefix,
+            )
+        )
+
+        if not objects:
+            logger.warning("Document not found: %s", document_id)
+            raise DocumentNotFoundError(f"Document not found: {document_id}")
+
+        # Get the first (and should be only) object
+        object_name = objects[0].object_name
+        logger.debug("Found object: %s", object_name)
+
+        self._remember_object_name(key, object_name, objects[0].etag)
+        return object_name
+
+    def _get_object(
+        self, object_name: str, document_id: str, key: tuple[str, str] | None = None
+    ) -> DocumentBuffer:
+        response = self._client.get_object(
+            bucket_name=self._settings.minio_bucket_name,
+            object_name=object_name,
+        )
+
+        buffer = DocumentBuffer(self._memory_budget, self._settings)
         try:
-            self._client.bucket_exists(self._settings.minio_bucket_name)
-            return True
+            # The object size comes from the GET response rather than a stat_object call: it is
+            # the same size, known before any of the body is read, without an extra round trip
+            # per fetch. Sizes are checked again while streaming, for responses without it.
+            content_length = response.headers.get("Content-Length")
+            if content_length is not None:
+                self._check_size(document_id, int(content_length))
+
+            for chunk in response.stream(READ_CHUNK_BYTES):
+                buffer.write(chunk)
+                self._check_size(document_id, buffer.size)
+
+            logger.info(
+                "Successfully fetched document %s (%s bytes%s)",
+                document_id,
+                buffer.size,
+                ", spooled to disk" if buffer.spooled else "",
+            )
+        except BaseException:
+            buffer.close()
+            raise
+        finally:
+            response.close()
+            response.release_conn()
+
+        if key is not None:
+            self._remember_object_name(key, object_name, response.headers.get("ETag"))
+        return buffer
+
+    def _check_size(self, document_id: str, size: int) -> None:
+        if size > self._settings.document_max_size_bytes:
+            logger.warning(
+                "Document %s is larger than %s bytes, rejecting it",
+                document_id,
+                self._settings.document_max_size_bytes,
+            )
+            raise DocumentTooLargeError(
+                f"Document exceeds the maximum size of "
+                f"{self._settings.document_max_size_bytes} bytes: {document_id}"
+            )
+
+    def _lookup_object_name(self, key: tuple[str, str]) -> str | None:
+        with self._resolved_lock:
+            entry = self._resolved.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._resolved[key]
+                return None
+            self._resolved.move_to_end(key)
+            return entry.object_name
+
+    def _remember_object_name(
+        self, key: tuple[str, str], object_name: str, etag: str | None
+    ) -> None:
+        if self._settings.minio_key_cache_ttl_seconds <= 0:
+            return
+
+        expires_at = time.monotonic() + self._settings.minio_key_cache_ttl_seconds
+        with self._resolved_lock:
+            self._resolved[key] = ResolvedObject(object_name, etag, expires_at)
+            self._resolved.move_to_end(key)
+            while len(self._resolved) > self._settings.minio_key_cache_max_entries:
+                self._resolved.popitem(last=False)
+
+    def _invalidate_object_name(self, key: tuple[str, str]) -> None:
+        with self._resolved_lock:
+            self._resolved.pop(key, None)
+
+    async def health_check(self) -> bool:
+        """
+        Check that MinIO is reachable and the document bucket exists.
+
+        Returns:
+            True if documents can be fetched, False otherwise.
+        """
+        try:
+            if await asyncio.to_thread(
+                self._client.bucket_exists, self._settings.minio_bucket_name
+            ):
+                return True
+            logger.warning("MinIO bucket %s does not exist", self._settings.minio_bucket_name)
+            return False
         except Exception as e:
-            logger.warning(f"MinIO health check failed: {e}")
+            logger.warning("MinIO health check failed: %s", e)
             return False
@@ -0,0 +1,139 @@
+"""
+Size- and load-aware routing of Groq calls to models.
+
+A routing table maps prompt sizes to a model and its fallbacks, so short
+documents can go to a small, fast model and long ones to a large model.
+Every model has its own rate limiter and circuit breaker, as Groq quotas
+and outages are per model; a route tries its models in order, moving those
+that are down or out of quota to the back.
+"""
+
+from dataclasses import dataclass
+
+from src.config import ModelRoute, Settings, get_settings
+from src.services.rate_limiter import GroqRateLimiter
+from src.services.resilience import CircuitBreaker, CircuitState
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ModelTarget:
+    """
+    A Groq model with its own quota and failure tracking.
+
+    Attributes:
+        model: Groq model name.
+        rate_limiter: Admits calls within the model's quota.
+        breaker: Circuit breaker of the model.
+    """
+
+    model: str
+    rate_limiter: GroqRateLimiter
+    breaker: CircuitBreaker
+
+
+class ModelRouter:
+    """
+    Chooses the route and the models to try for a call.
+
+    Routes are matched in table order: the first one whose max_input_chars
+    fits the prompt wins, and the last route takes prompts too large for
+    every route. Without a table, every call goes to groq_model.
+    """
+
+    def __init__(self, settings: Settings | None = None):
+        """
+        Initialize the router.
+
+        Args:
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+        self.routes = self._settings.groq_model_routes or [
+            ModelRoute(name="default", model=self._settings.groq_model)
+        ]
+
+        self._targets: dict[str, ModelTarget] = {}
+        for route in self.routes:
+            for model in [route.model, *route.fallback_models]:
+                if model not in self._targets:
+                    self._targets[model] = ModelTarget(
+                        model=model,
+                        rate_limiter=GroqRateLimiter(self._settings),
+                        breaker=CircuitBreaker(f"groq:{model}", self._settings),
+                    )
+
+        logger.info(
+            "Model routes: %s",
+            ", ".join(
+                f"{route.name} (<= {route.max_input_chars or 'any'} chars) -> {route.model}"
+                for route in self.routes
+            ),
+        )
+
+    @property
+    def models(self) -> list[str]:
+        """Every model used by a route, primary or fallback."""
+        return list(self._targets)
+
+    def route(self, prompt_chars: int) -> ModelRoute:
+        """
+        Return the route for a prompt.
+
+        Args:
+            prompt_chars: Characters of the user prompt.
+        """
+        for route in self.routes:
+            if route.max_input_chars is None or prompt_chars <= route.max_input_chars:
+                return route
+        return self.routes[-1]
+
+    def max_tokens(self, route: ModelRoute) -> int:
+        """Completion token limit of a route."""
+        return route.max_tokens or self._settings.groq_max_tokens
+
+    def estimate_tokens(
+        self, route: ModelRoute, prompt_chars: int, max_tokens: int | None = None
+    ) -> int:
+        """
+        Estimate the tokens a call on the route will use.
+
+        Args:
+            route: The route of the call.
+            prompt_chars: Total characters of the prompt messages.
+            max_tokens: Completion token limit of the call, if not the route's.
+        """
+        return self._targets[route.model].rate_limiter.estimate_tokens(
+            prompt_chars, max_tokens or self.max_tokens(route)
+        )
+
+    def candidates(self, route: ModelRoute, estimated_tokens: int) -> list[ModelTarget]:
+        """
+        Return the models to try for a call, in order.
+
+        The route's models keep their table order, except that models whose
+        circuit is open or whose quota would hold the call longer than
+        groq_route_max_wait_seconds move behind the available ones.
+
+        Args:
+            route: The route of the call.
+            estimated_tokens: Tokens the call is expected to use.
+        """
+        targets = [self._targets[model] for model in [route.model, *route.fallback_models]]
+        available = [
+            target
+            for target in targets
+            if target.breaker.state != CircuitState.OPEN
+            and target.rate_limiter.wait_time(estimated_tokens)
+            <= self._settings.groq_route_max_wait_seconds
+        ]
+        if available and available[0] is not targets[0]:
+            logger.info(
+                "Route %s is busy on %s, preferring %s",
+                route.name,
+                targets[0].model,
+                available[0].model,
+            )
+        return available + [target for target in targets if target not in available]
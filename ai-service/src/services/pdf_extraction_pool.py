@@ -0,0 +1,204 @@
+"""
+Process pool for CPU-bound PDF text extraction.
+
+PyMuPDF parsing and text cleaning run in worker processes, so extraction uses
+every available core and a worker crashing on a malformed PDF cannot take
+down the serving process.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from src.config import Settings, get_settings
+from src.services.pdf_extractor import (
+    CorruptedPdfError,
+    ExtractedText,
+    PdfExtractionError,
+    PdfExtractor,
+)
+from src.utils.logger import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+
+class PdfExtractionTimeoutError(PdfExtractionError):
+    """Raised when a PDF takes longer than the configured timeout to extract."""
+
+    pass
+
+
+# Per-process extractor, created once by the pool initializer
+_worker_extractor: PdfExtractor | None = None
+
+
+def _init_worker(settings: Settings) -> None:
+    global _worker_extractor
+    setup_logging()
+    _worker_extractor = PdfExtractor(settings)
+
+
+def _extract_in_worker(pdf_content: bytes | Path) -> ExtractedText:
+    return _worker_extractor.extract(pdf_content)
+
+
+def _warm_up_worker() -> None:
+    pass
+
+
+class PdfExtractionPool:
+    """
+    Runs PdfExtractor in a pool of worker processes.
+
+    Each task has a timeout: a worker that exceeds it is killed and the pool is
+    recycled. The other tasks running on the killed pool are submitted again
+    to the new one, as if nothing had happened. If a worker dies mid-task the
+    pool is recycled as well and the task is retried once; a PDF that crashes
+    a second worker is reported as corrupted. A crash is charged to the task
+    that first reports it, which recycles the pool; the other tasks on that
+    pool are resubmitted without counting it. With zero workers configured,
+    extraction falls back to the default thread executor.
+    """
+
+    def __init__(self, settings: Settings | None = None):
+        """
+        Initialize the extraction pool.
+
+        Args:
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+        self._fallback_extractor = PdfExtractor(self._settings)
+        self._executor: ProcessPoolExecutor | None = None
+        self._generation = 0
+
+        if self._settings.pdf_extraction_workers > 0:
+            self._executor = self._create_executor()
+            logger.info(
+                "PDF extraction pool started with %s worker(s), timeout %ss",
+                self._settings.pdf_extraction_workers,
+                self._settings.pdf_extraction_timeout_seconds,
+            )
+        else:
+            logger.info("PDF extraction pool disabled, extracting in threads")
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self._settings.pdf_extraction_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._settings,),
+            max_tasks_per_child=self._settings.pdf_extraction_max_tasks_per_child,
+        )
+
+    async def warm_up(self) -> None:
+        """
+        Start every worker process ahead of the first extraction.
+
+        Workers are spawned on demand, each importing PyMuPDF on startup;
+        submitting one task per worker at once starts them all.
+        """
+        if self._executor is None:
+            return
+
+        futures = [
+            self._executor.submit(_warm_up_worker)
+            for _ in range(self._settings.pdf_extraction_workers)
+        ]
+        await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+        logger.info("PDF extraction workers started")
+
+    async def extract(self, pdf_content: bytes | Path) -> ExtractedText:
+        """
+        Extract text from a PDF document in a worker process.
+
+        Args:
+            pdf_content: The PDF file content as bytes, or the path of a PDF
+                file; paths keep large documents from being copied to the worker.
+
+        Returns:
+            ExtractedText with the cleaned text content and the page count.
+
+        Raises:
+            CorruptedPdfError: If the PDF is corrupted or repeatedly crashes a worker.
+            EmptyPdfError: If no text could be extracted from the PDF.
+            PdfExtractionTimeoutError: If extraction exceeds the configured timeout.
+            PdfExtractionError: For other extraction failures.
+        """
+        if self._executor is None:
+            return await asyncio.to_thread(self._fallback_extractor.extract, pdf_content)
+
+        crashes = 0
+        while True:
+            generation = self._generation
+            future = None
+
+            try:
+                future = self._executor.submit(_extract_in_worker, pdf_content)
+                return await asyncio.wait_for(
+                    asyncio.wrap_future(future),
+                    timeout=self._settings.pdf_extraction_timeout_seconds,
+                )
+            except TimeoutError as e:
+                logger.error(
+                    "PDF extraction timed out after %ss, recycling workers",
+                    self._settings.pdf_extraction_timeout_seconds,
+                )
+                self._recycle(generation)
+                raise PdfExtractionTimeoutError(
+                    f"PDF extraction exceeded {self._settings.pdf_extraction_timeout_seconds}s"
+                ) from e
+            except BrokenProcessPool as e:
+                if generation != self._generation:
+                    logger.debug("PDF extraction pool was recycled under the task, resubmitting")
+                    continue
+
+                self._recycle(generation)
+                if future is None:
+                    logger.warning("PDF extraction pool was broken, retrying on a fresh pool")
+                    continue
+
+                crashes += 1
+                if crashes == 1:
+                    logger.warning("PDF extraction worker crashed, retrying on a fresh pool")
+                    continue
+                logger.error("PDF crashed the extraction worker twice, treating as corrupted")
+                raise CorruptedPdfError("PDF crashed the extraction worker") from e
+
+    def _recycle(self, generation: int) -> None:
+        """
+        Replace the executor, killing its workers.
+
+        Concurrent failures on the same pool share one recycle: only the first
+        caller that observed the given generation replaces it.
+
+        Args:
+            generation: Generation of the pool the caller's task ran on.
+        """
+        if generation != self._generation or self._executor is None:
+            return
+
+        self._generation += 1
+        broken = self._executor
+        self._executor = self._create_executor()
+        self._kill(broken)
+
+    @staticmethod
+    def _kill(executor: ProcessPoolExecutor) -> None:
+        # ProcessPoolExecutor only gained kill_workers() in Python 3.14, so this
+        # relies on _processes, a CPython-private attribute that may change with
+        # any release; revisit when moving to 3.14. Pending tasks are not
+        # cancelled: the executor fails them with BrokenProcessPool once it
+        # notices the dead workers, so their callers resubmit on the new pool.
+        for process in list((executor._processes or {}).values()):
+            if process.is_alive():
+                process.kill()
+        executor.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._kill(self._executor)
+            self._executor = None
@@ -2,12 +2,23 @@
 PDF text extraction using PyMuPDF.
 """
 
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
 import pymupdf
 
+from src.config import Settings, get_settings
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Splits extracted text before each "--- Page N ---" marker
+PAGE_MARKER_PATTERN = re.compile(r"(?=^--- Page \d+ ---$)", re.MULTILINE)
+
+MULTIPLE_SPACES_PATTERN = re.compile(r" {2,}")
+
 
 class PdfExtractionError(Exception):
     """Base exception for PDF extraction errors."""
@@ -27,55 +38,110 @@ class CorruptedPdfError(PdfExtractionError):
     pass
 
 
+@dataclass
+class ExtractedText:
+    """
+    Result of PDF text extraction.
+
+    Attributes:
+        text: Extracted text with page markers.
+        page_count: Total number of pages in the document.
+    """
+
+    text: str
+    page_count: int
+
+
 class PdfExtractor:
     """
     Extracts text content from PDF documents using PyMuPDF.
     Handles various edge cases like empty or corrupted PDFs.
+
+    Pages are extracted lazily and extraction stops as soon as the character
+    budget of the downstream analysis is met, so the cost is bounded by the
+    budget rather than by the document size. Very large documents can be
+    sampled as their first and last pages.
     """
 
     # Minimum text length to consider extraction successful
     MIN_TEXT_LENGTH = 10
 
-    def extract_text(self, pdf_content: bytes) -> str:
+    def __init__(self, settings: Settings | None = None):
+        """
+        Initialize the PDF extractor.
+
+        Args:
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+
+    @property
+    def char_budget(self) -> int:
+        """Number of characters the analysis can use; extraction stops beyond it."""
+        if self._settings.ai_chunking_enabled:
+            return max(
+                self._settings.ai_max_input_chars,
+                self._settings.ai_chunk_max_chars * self._settings.ai_max_chunks,
+            )
+        return self._settings.ai_max_input_chars
+
+    def extract_text(self, pdf_content: bytes | Path) -> str:
         """
         Extract text from a PDF document.
 
         Args:
-            pdf_content: The PDF file content as bytes.
+            pdf_content: The PDF file content as bytes, or the path of a PDF file.
 
         Returns:
             Extracted text content preserving basic structure.
+        """
+        return self.extract(pdf_content).text
+
+    def extract(self, pdf_content: bytes | Path) -> ExtractedText:
+        """
+        Extract text and page count from a PDF document.
+
+        Args:
+            pdf_content: The PDF file content as bytes, or the path of a PDF
+                file, which MuPDF reads from disk as pages are needed.
+
+        Returns:
+            ExtractedText with the text content and the document's page count.
 
         Raises:
             CorruptedPdfError: If the PDF is corrupted or cannot be read.
             EmptyPdfError: If no text could be extracted from the PDF.
             PdfExtractionError: For other extraction failures.
         """
-        if not pdf_content:
+        size = pdf_content.stat().st_size if isinstance(pdf_content, Path) else len(pdf_content)
+        if not size:
             raise CorruptedPdfError("Empty PDF content provided")
 
-        logger.debug(f"Extracting text from PDF ({len(pdf_content)} bytes)")
+        logger.debug("Extracting text from PDF (%s bytes)", size)
 
         try:
             return self._extract_with_pymupdf(pdf_content)
         except (EmptyPdfError, CorruptedPdfError):
             raise
         except Exception as e:
-            logger.error(f"PDF extraction failed: {e}")
+            logger.error("PDF extraction failed: %s", e)
             raise PdfExtractionError(f"Failed to extract text from PDF: {e}") from e
 
-    def _extract_with_pymupdf(self, pdf_content: bytes) -> str:
+    def _extract_with_pymupdf(self, pdf_content: bytes | Path) -> ExtractedText:
         """
         Extract text using PyMuPDF library.
 
         Args:
-            pdf_content: PDF bytes.
+            pdf_content: PDF bytes or file path.
 
         Returns:
-            Extracted text.
+            Extracted text and page count.
         """
         try:
-            doc = pymupdf.open(stream=pdf_content, filetype="pdf")
+            if isinstance(pdf_content, Path):
+                doc = pymupdf.open(pdf_content, filetype="pdf")
+            else:
+                doc = pymupdf.open(stream=pdf_content, filetype="pdf")
         except Exception as e:
             raise CorruptedPdfError(f"Failed to open PDF: {e}") from e
 
@@ -84,54 +150,115 @@ class PdfExtractor:
                 raise EmptyPdfError("PDF has no pages")
 
             text_parts = []
+            extracted_pages = 0
 
-            for page_num in range(doc.page_count):
-                page = doc[page_num]
-
-                # Extract text with layout preservation
-                page_text = page.get_text("text")
-
-                if page_text.strip():
-                    text_parts.append(f"--- Page {page_num + 1} ---")
-                    text_parts.append(page_text.strip())
+            for page_num, page_text in self.iter_pages(doc):
+                if page_num is None:
+                    text_parts.append(page_text)
+                    continue
+                text_parts.append(f"--- Page {page_num + 1} ---")
+                text_parts.append(page_text)
+                extracted_pages += 1
 
             full_text = "\n\n".join(text_parts)
 
-            # Clean up the text
-            full_text = self._clean_text(full_text)
-
             if len(full_text.strip()) < self.MIN_TEXT_LENGTH:
                 raise EmptyPdfError("PDF contains no extractable text or only minimal content")
 
             logger.info(
-                f"Successfully extracted {len(full_text)} characters from {doc.page_count} page(s)"
+                "Successfully extracted %s characters from %s of %s page(s)",
+                len(full_text),
+                extracted_pages,
+                doc.page_count,
             )
 
-            return full_text
+            return ExtractedText(text=full_text, page_count=doc.page_count)
 
         finally:
             doc.close()
 
+    def iter_pages(self, doc: pymupdf.Document) -> Iterator[tuple[int | None, str]]:
+        """
+        Lazily yield the cleaned text of the pages worth analyzing.
+
+        Pages without text are skipped. Iteration stops once the yielded text
+        reaches the character budget. When the document is sampled, a
+        (None, note) pair marks the omitted middle pages.
+
+        Args:
+            doc: An open PyMuPDF document.
+
+        Yields:
+            Tuples of zero-based page number and cleaned page text.
+        """
+        head_pages = self._settings.pdf_sample_head_pages
+        tail_pages = self._settings.pdf_sample_tail_pages
+        sampled = (
+            doc.page_count >= self._settings.pdf_sampling_min_pages
+            and 0 < head_pages + tail_pages < doc.page_count
+        )
+
+        if not sampled:
+            yield from self._iter_page_range(doc, range(doc.page_count), self.char_budget)
+            return
+
+        # Reserve part of the budget for the tail, so the head cannot starve it
+        tail_budget = self.char_budget * tail_pages // (head_pages + tail_pages)
+        head_budget = self.char_budget - tail_budget
+        tail_start = doc.page_count - tail_pages
+
+        used = 0
+        for page_num, page_text in self._iter_page_range(doc, range(head_pages), head_budget):
+            used += len(page_text)
+            yield page_num, page_text
+
+        omitted = tail_start - head_pages
+        yield None, f"[... {omitted} page(s) omitted ...]"
+
+        tail_range = range(tail_start, doc.page_count)
+        yield from self._iter_page_range(doc, tail_range, self.char_budget - used)
+
+    def _iter_page_range(
+        self, doc: pymupdf.Document, pages: range, budget: int
+    ) -> Iterator[tuple[int, str]]:
+        used = 0
+        for page_num in pages:
+            if used >= budget:
+                logger.debug("Character budget reached, skipping pages from %s", page_num + 1)
+                return
+
+            page = doc[page_num]
+
+            # Pages without fonts have no text layer (e.g. scans): skip the text pass
+            if not page.get_fonts():
+                continue
+
+            # Extract text with layout preservation
+            page_text = self._clean_text(page.get_text("text"))
+            if page_text:
+                used += len(page_text)
+                yield page_num, page_text
+
     def _clean_text(self, text: str) -> str:
         """
         Clean extracted text by removing excessive whitespace.
 
+        Collapses runs of spaces, strips every line and keeps at most one blank
+        line in a row, in a single pass over the lines.
+
         Args:
             text: Raw extracted text.
 
         Returns:
             Cleaned text.
         """
-        # Replace multiple newlines with double newlines
-        import re
-
-        text = re.sub(r"\n{3,}", "\n\n", text)
-
-        # Replace multiple spaces with single space
-        text = re.sub(r" {2,}", " ", text)
-
-        # Strip leading/trailing whitespace from each line
-        lines = [line.strip() for line in text.split("\n")]
-        text = "\n".join(lines)
-
-        return text.strip()
+        lines = []
+        previous_blank = True
+        for line in text.split("\n"):
+            line = MULTIPLE_SPACES_PATTERN.sub(" ", line).strip()
+            if not line and previous_blank:
+                continue
+            lines.append(line)
+            previous_blank = not line
+
+        return "\n".join(lines).strip()
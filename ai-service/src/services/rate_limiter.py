@@ -0,0 +1,273 @@
+"""
+Client-side rate limiting for Groq API calls.
+
+Calls are admitted against request-per-minute and token-per-minute token
+buckets, so work is queued smoothly instead of bursting into 429s. The
+buckets are corrected from the provider's rate-limit response headers, and
+the number of concurrent calls adapts AIMD-style: it grows by one per
+window of successful calls and halves on every rate limit.
+"""
+
+import asyncio
+import math
+import re
+import time
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+
+from src.config import Settings, get_settings
+from src.utils.logger import get_logger
+from src.utils.metrics import LLM_RATE_LIMITED
+
+logger = get_logger(__name__)
+
+# Rough average for Italian and English text with the Groq tokenizers
+CHARS_PER_TOKEN = 4
+
+# Durations in rate-limit headers, e.g. "2m59.56s", "7.66s" or "120ms"
+DURATION_PATTERN = re.compile(r"(?:(\d+)h)?(?:(\d+)m(?!s))?(?:([\d.]+)s)?(?:([\d.]+)ms)?")
+
+
+def parse_duration(value: str | None) -> float | None:
+    """
+    Parse a rate-limit header duration into seconds.
+
+    Args:
+        value: A duration such as "2m59.56s" or a plain number of seconds.
+
+    Returns:
+        The duration in seconds, or None if it cannot be parsed.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return seconds if math.isfinite(seconds) and seconds >= 0 else None
+
+    match = DURATION_PATTERN.fullmatch(value.strip())
+    if not match or not any(match.groups()):
+        return None
+    hours, minutes, seconds, millis = (float(group) if group else 0.0 for group in match.groups())
+    return hours * 3600 + minutes * 60 + seconds + millis / 1000
+
+
+def parse_count(value: str | None) -> float | None:
+    """
+    Parse a rate-limit header count, such as the remaining requests.
+
+    Args:
+        value: The header value.
+
+    Returns:
+        The count, or None if it is missing or not a non-negative number.
+    """
+    if value is None:
+        return None
+    try:
+        count = float(value)
+    except ValueError:
+        return None
+    return count if math.isfinite(count) and count >= 0 else None
+
+
+class TokenBucket:
+    """A token bucket refilled continuously up to its capacity."""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        # Refilling resumes at this time; it is in the future while paused
+        self._refill_from = time.monotonic()
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        if now > self._refill_from:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self._refill_from) * self.refill_per_second
+            )
+            self._refill_from = now
+        return now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until the given amount can be consumed."""
+        now = self._refill()
+        # A single call larger than the bucket only waits for a full bucket
+        missing = min(amount, self.capacity) - self.tokens
+        if missing <= 0:
+            return 0.0
+        return max(0.0, self._refill_from - now) + missing / self.refill_per_second
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount
+
+    def cap(self, remaining: float, reset_seconds: float | None) -> None:
+        """Lower the bucket to what the provider reports as remaining."""
+        now = self._refill()
+        if remaining < self.tokens:
+            self.tokens = remaining
+            if reset_seconds:
+                # Refill no faster than the provider's reset allows
+                full_refill = (self.capacity - remaining) / self.refill_per_second
+                self._refill_from = max(self._refill_from, now + reset_seconds - full_refill)
+
+    def pause(self, seconds: float) -> None:
+        """Empty the bucket and stop refilling it for the given time."""
+        now = self._refill()
+        self.tokens = min(self.tokens, 0.0)
+        self._refill_from = max(self._refill_from, now + seconds)
+
+
+class GroqRateLimiter:
+    """
+    Admits Groq calls within the configured quota.
+
+    Callers wait in FIFO order for both a concurrency slot and enough
+    request and token budget.
+    """
+
+    def __init__(self, settings: Settings | None = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+        self._requests = TokenBucket(
+            self._settings.groq_requests_per_minute, self._settings.groq_requests_per_minute / 60
+        )
+        self._tokens = TokenBucket(
+            self._settings.groq_tokens_per_minute, self._settings.groq_tokens_per_minute / 60
+        )
+
+        self._max_concurrency = self._settings.llm_concurrency
+        self._concurrency_limit = float(self._max_concurrency)
+        self._active = 0
+        self._slot_available = asyncio.Condition()
+        self._budget_lock = asyncio.Lock()
+        self.rate_limited_calls = 0
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Current number of calls allowed to run at once."""
+        return int(self._concurrency_limit)
+
+    def estimate_tokens(self, prompt_chars: int, max_tokens: int | None = None) -> int:
+        """
+        Estimate the tokens a call will use.
+
+        Args:
+            prompt_chars: Total characters of the prompt messages.
+            max_tokens: Completion token limit of the call. Defaults to groq_max_tokens.
+
+        Returns:
+            Estimated prompt tokens plus the completion token limit.
+        """
+        return prompt_chars // CHARS_PER_TOKEN + (max_tokens or self._settings.groq_max_tokens)
+
+    def wait_time(self, estimated_tokens: int) -> float:
+        """
+        Seconds a call would currently wait for request and token budget.
+
+        Args:
+            estimated_tokens: Tokens the call is expected to use.
+        """
+        return max(self._requests.wait_time(1), self._tokens.wait_time(estimated_tokens))
+
+    @asynccontextmanager
+    async def acquire(self, estimated_tokens: int) -> AsyncIterator[None]:
+        """
+        Wait until a call fits the quota, then hold a concurrency slot.
+
+        Args:
+            estimated_tokens: Tokens the call is expected to use.
+        """
+        async with self._slot_available:
+            await self._slot_available.wait_for(lambda: self._active < self.concurrency_limit)
+            self._active += 1
+
+        try:
+            async with self._budget_lock:
+                while True:
+                    delay = self.wait_time(estimated_tokens)
+                    if delay <= 0:
+                        break
+                    logger.debug("Waiting %.2fs for Groq rate-limit budget", delay)
+                    await asyncio.sleep(delay)
+
+                self._requests.consume(1)
+                self._tokens.consume(estimated_tokens)
+
+            yield
+        finally:
+            async with self._slot_available:
+                self._active -= 1
+                self._slot_available.notify_all()
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int | None) -> None:
+        """
+        Correct the token bucket with the usage reported by the response.
+
+        Args:
+            estimated_tokens: Tokens consumed when the call was admitted.
+            actual_tokens: Total tokens reported by the provider, if any.
+        """
+        if actual_tokens is not None:
+            self._tokens.consume(actual_tokens - estimated_tokens)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Align the buckets with the provider's rate-limit headers.
+
+        Missing or malformed values leave the corresponding bucket unchanged.
+
+        Args:
+            headers: Response headers of a Groq API call.
+        """
+        remaining_requests = parse_count(headers.get("x-ratelimit-remaining-requests"))
+        if remaining_requests is not None:
+            self._requests.cap(
+                remaining_requests,
+                parse_duration(headers.get("x-ratelimit-reset-requests")),
+            )
+
+        remaining_tokens = parse_count(headers.get("x-ratelimit-remaining-tokens"))
+        if remaining_tokens is not None:
+            self._tokens.cap(
+                remaining_tokens,
+                parse_duration(headers.get("x-ratelimit-reset-tokens")),
+            )
+
+    def on_success(self) -> None:
+        """Additively increase concurrency: about one slot per window of successes."""
+        self._concurrency_limit = min(
+            float(self._max_concurrency), self._concurrency_limit + 1 / self._concurrency_limit
+        )
+
+    def on_rate_limited(self, headers: Mapping[str, str] | None = None) -> None:
+        """
+        Multiplicatively decrease concurrency and pause until the quota resets.
+
+        Args:
+            headers: Headers of the 429 response, if available.
+        """
+        self.rate_limited_calls += 1
+        LLM_RATE_LIMITED.inc()
+        self._concurrency_limit = max(1.0, self._concurrency_limit / 2)
+
+        retry_after = parse_duration((headers or {}).get("retry-after"))
+        if retry_after:
+            self._requests.pause(retry_after)
+
+        logger.warning(
+            "Groq rate limit hit, concurrency limit lowered to %s, pausing for %ss",
+            self.concurrency_limit,
+            retry_after or 0,
+        )
+        if headers:
+            self.update_from_headers(headers)
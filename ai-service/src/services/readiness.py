@@ -0,0 +1,163 @@
+"""
+Dependency-aware readiness.
+
+A background prober checks MinIO and Groq at a fixed interval and caches
+the outcome, so readiness requests are answered from memory and the probe
+load on the dependencies does not grow with the number of probe requests.
+The service reports ready only once its warm-up tasks have finished and
+every required dependency passed its latest check. Other dependencies are
+checked and reported the same way without affecting readiness, for those
+whose outages the service handles itself.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Collection
+from dataclasses import dataclass
+
+from src.config import Settings, get_settings
+from src.utils.logger import get_logger
+from src.utils.metrics import DEPENDENCY_UP
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class DependencyStatus:
+    """
+    Outcome of the latest check of a dependency.
+
+    Attributes:
+        healthy: Whether the check passed.
+        checked_at: Epoch time of the check, None before the first one.
+        required: Whether the service is only ready while the check passes.
+    """
+
+    healthy: bool = False
+    checked_at: float | None = None
+    required: bool = True
+
+
+class ReadinessProber:
+    """
+    Runs warm-up tasks, then checks dependencies in the background.
+
+    Checks are async callables returning True when the dependency is usable;
+    one that raises or exceeds readiness_probe_timeout_seconds counts as
+    failed. The first round of checks runs right after warm-up, so it also
+    opens the pooled connections the checks go through. Warm-up tasks that
+    raise are run again before each later round until they succeed, and the
+    service is not ready until every one of them has.
+    """
+
+    def __init__(
+        self,
+        checks: dict[str, Callable[[], Awaitable[bool]]],
+        warm_ups: list[Callable[[], Awaitable[None]]],
+        settings: Settings | None = None,
+        optional: Collection[str] = (),
+    ):
+        """
+        Initialize the prober.
+
+        Args:
+            checks: Health checks by dependency name.
+            warm_ups: Tasks to complete before the service can be ready.
+            settings: Application settings. If None, loads from environment.
+            optional: Names of the checks that are reported but do not gate readiness.
+        """
+        self._settings = settings or get_settings()
+        self._checks = checks
+        self._warm_ups = warm_ups
+        self._statuses = {name: DependencyStatus(required=name not in optional) for name in checks}
+        self._warmed_up = False
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether warm-up is done and every required dependency passed its latest check."""
+        return self._warmed_up and all(
+            status.healthy for status in self._statuses.values() if status.required
+        )
+
+    @property
+    def warmed_up(self) -> bool:
+        """Whether the warm-up tasks have finished."""
+        return self._warmed_up
+
+    def statuses(self) -> dict[str, DependencyStatus]:
+        """Return the cached status of every dependency."""
+        return dict(self._statuses)
+
+    def start(self) -> None:
+        """Start warming up and probing in the background."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop probing."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        start = time.perf_counter()
+        pending = list(self._warm_ups)
+        while True:
+            if not self._warmed_up:
+                pending = await self._warm_up(pending)
+                if not pending:
+                    self._warmed_up = True
+                    logger.info("Warm-up finished in %.2fs", time.perf_counter() - start)
+
+            await self.probe()
+            await asyncio.sleep(self._settings.readiness_probe_interval_seconds)
+
+    async def _warm_up(
+        self, warm_ups: list[Callable[[], Awaitable[None]]]
+    ) -> list[Callable[[], Awaitable[None]]]:
+        """Run warm-up tasks and return those that failed."""
+        results = await asyncio.gather(*(warm_up() for warm_up in warm_ups), return_exceptions=True)
+        failed = []
+        for warm_up, result in zip(warm_ups, results, strict=True):
+            if isinstance(result, Exception):
+                logger.warning(
+                    "Warm-up task failed, retrying in %ss: %s",
+                    self._settings.readiness_probe_interval_seconds,
+                    result,
+                )
+                failed.append(warm_up)
+        return failed
+
+    async def probe(self) -> None:
+        """Run every check once and update the cached statuses."""
+        names = list(self._checks)
+        results = await asyncio.gather(*(self._check(name) for name in names))
+        was_ready = self.ready
+
+        for name, healthy in zip(names, results, strict=True):
+            status = self._statuses[name]
+            if healthy != status.healthy:
+                logger.info("Dependency %s is %s", name, "up" if healthy else "down")
+            status.healthy = healthy
+            status.checked_at = time.time()
+            DEPENDENCY_UP.labels(name).set(1 if healthy else 0)
+
+        if self.ready != was_ready:
+            logger.info("Service is %s", "ready" if self.ready else "not ready")
+
+    async def _check(self, name: str) -> bool:
+        try:
+            return await asyncio.wait_for(
+                self._checks[name](), timeout=self._settings.readiness_probe_timeout_seconds
+            )
+        except TimeoutError:
+            logger.warning(
+                "%s health check timed out after %ss",
+                name,
+                self._settings.readiness_probe_timeout_seconds,
+            )
+            return False
+        except Exception as e:
+            logger.warning("%s health check failed: %s", name, e)
+            return False
@@ -0,0 +1,197 @@
+"""
+Resilience primitives shared by the external service clients.
+
+Provides a circuit breaker per dependency and an async retry helper using
+decorrelated-jitter backoff within a total time budget.
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from enum import StrEnum
+from typing import TypeVar
+
+from src.config import Settings, get_settings
+from src.utils.logger import get_logger
+from src.utils.metrics import RETRIES
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the dependency's circuit is open."""
+
+    pass
+
+
+class CircuitState(StrEnum):
+    """States of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a dependency is down.
+
+    After a run of consecutive failures the circuit opens and rejects calls.
+    Once the reset timeout has passed it lets a single trial call through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, settings: Settings | None = None):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name: Name of the protected dependency, used in logs and errors.
+            settings: Application settings. If None, loads from environment.
+        """
+        self.name = name
+        self._settings = settings or get_settings()
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self._settings.circuit_reset_timeout_seconds
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a trial running.
+        """
+        state = self.state
+        if state == CircuitState.OPEN:
+            raise CircuitOpenError(f"Circuit for {self.name} is open")
+        if state == CircuitState.HALF_OPEN:
+            if self._trial_in_flight:
+                raise CircuitOpenError(f"Circuit for {self.name} is half-open")
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        if self._state != CircuitState.CLOSED:
+            logger.info("Circuit for %s closed", self.name)
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_abandoned(self) -> None:
+        """Release a half-open trial whose call ended without a verdict on the dependency."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if (
+            self._state == CircuitState.HALF_OPEN
+            or self._consecutive_failures >= self._settings.circuit_failure_threshold
+        ):
+            if self._state != CircuitState.OPEN:
+                logger.warning(
+                    "Circuit for %s opened after %s consecutive failure(s)",
+                    self.name,
+                    self._consecutive_failures,
+                )
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+async def retry_async(
+    call: Callable[[], Awaitable[T]],
+    *,
+    retry_on: tuple[type[Exception], ...],
+    breaker: CircuitBreaker,
+    trip_on: tuple[type[Exception], ...] | None = None,
+    max_attempts: int | None = None,
+    settings: Settings | None = None,
+) -> T:
+    """
+    Run a call through a circuit breaker, retrying transient failures.
+
+    Delays use decorrelated jitter: each one is drawn between the base delay
+    and three times the previous delay, capped at the maximum delay. Retries
+    stop after the configured attempts, or earlier if the next delay would
+    exceed the total time budget; the last error is then raised.
+
+    Exceptions not listed in retry_on are raised immediately without
+    affecting the breaker, beyond releasing a half-open trial.
+
+    Args:
+        call: Factory for the awaitable to run.
+        retry_on: Exception types considered transient dependency failures.
+        breaker: Circuit breaker of the dependency.
+        trip_on: Retried exception types counted as failures by the breaker.
+            Defaults to retry_on; others (e.g. rate limits) leave it untouched.
+        max_attempts: Attempts before giving up. Defaults to the max_retries setting.
+        settings: Application settings. If None, loads from environment.
+
+    Returns:
+        The result of the first successful attempt.
+
+    Raises:
+        CircuitOpenError: If the breaker rejects an attempt.
+    """
+    settings = settings or get_settings()
+    trip_on = retry_on if trip_on is None else trip_on
+    deadline = time.monotonic() + settings.retry_budget_seconds
+    delay = settings.retry_delay_seconds
+
+    max_attempts = max(1, settings.max_retries if max_attempts is None else max_attempts)
+
+    for attempt in range(1, max_attempts + 1):
+        breaker.before_call()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            breaker.record_abandoned()
+            raise
+        except retry_on as e:
+            if isinstance(e, trip_on):
+                breaker.record_failure()
+            else:
+                breaker.record_abandoned()
+
+            delay = min(
+                settings.retry_max_delay_seconds,
+                random.uniform(settings.retry_delay_seconds, delay * 3),
+            )
+            if (
+                attempt == max_attempts
+                or breaker.state == CircuitState.OPEN
+                or time.monotonic() + delay > deadline
+            ):
+                raise
+            logger.warning(
+                "%s call failed (%s), retrying in %.2fs (attempt %s/%s)",
+                breaker.name,
+                e,
+                delay,
+                attempt,
+                max_attempts,
+            )
+            RETRIES.labels(breaker.name).inc()
+            await asyncio.sleep(delay)
+        except Exception:
+            breaker.record_abandoned()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+    raise RuntimeError("retry_async ran no attempts")
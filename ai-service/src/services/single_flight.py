@@ -0,0 +1,63 @@
+"""
+Single-flight coalescing of concurrent identical calls.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Runs at most one call per key at a time.
+
+    Callers arriving while a call for the same key is in flight wait for it
+    and receive its result or exception instead of starting their own. The
+    shared call runs as a separate task, so a caller being cancelled does not
+    cancel it for the others.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[Hashable, asyncio.Task[T]] = {}
+        self.coalesced_calls = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run the call, or join the in-flight call for the same key.
+
+        Args:
+            key: Identifies calls that produce the same result.
+            call: Factory for the awaitable to run if none is in flight.
+
+        Returns:
+            The result of the shared call.
+        """
+        task = self._in_flight.get(key)
+
+        if task is not None:
+            self.coalesced_calls += 1
+            logger.debug("Joining in-flight call for %s", key)
+        else:
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task[T]) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._in_flight)
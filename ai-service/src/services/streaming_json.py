@@ -0,0 +1,92 @@
+"""
+Incremental extraction of a string field from streamed JSON.
+"""
+
+import json
+import re
+
+
+class JsonStringFieldStream:
+    """
+    Decodes the value of one top-level string field while the JSON arrives.
+
+    Chunks of the raw completion are fed as they are received; each call
+    returns the newly decoded characters of the field value, so it can be
+    shown before the document is complete. Escape sequences split across
+    chunks are held back until they are complete. The full document should
+    still be parsed once the stream ends.
+    """
+
+    def __init__(self, field: str):
+        """
+        Initialize the stream parser.
+
+        Args:
+            field: Name of the string field to decode.
+        """
+        self._key_pattern = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._buffer = ""
+        self._position = 0
+        self._in_value = False
+        self.complete = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk of the raw JSON text.
+
+        Args:
+            chunk: The next piece of the streamed completion.
+
+        Returns:
+            Characters of the field value decoded from this chunk, possibly empty.
+        """
+        self._buffer += chunk
+        if self.complete:
+            return ""
+
+        if not self._in_value:
+            # The key may be split across chunks, so search the whole prefix again
+            match = self._key_pattern.search(self._buffer)
+            if match is None:
+                return ""
+            self._in_value = True
+            self._position = match.end()
+
+        decoded = []
+        while self._position < len(self._buffer):
+            char = self._buffer[self._position]
+            if char == '"':
+                self.complete = True
+                self._position += 1
+                break
+            if char != "\\":
+                decoded.append(char)
+                self._position += 1
+                continue
+
+            escape = self._read_escape()
+            if escape is None:
+                break
+            decoded.append(escape)
+
+        return "".join(decoded)
+
+    def _read_escape(self) -> str | None:
+        """Decode the escape sequence at the current position, or None if incomplete."""
+        start = self._position
+        if start + 1 >= len(self._buffer):
+            return None
+
+        length = 6 if self._buffer[start + 1] == "u" else 2
+        # A high surrogate (\uD800-\uDBFF) only decodes together with the low one after it
+        if length == 6 and self._buffer[start + 2 : start + 4].lower() in ("d8", "d9", "da", "db"):
+            length = 12
+        if start + length > len(self._buffer):
+            return None
+
+        sequence = self._buffer[start : start + length]
+        self._position += length
+        try:
+            return json.loads(f'"{sequence}"')
+        except json.JSONDecodeError:
+            return sequence
@@ -0,0 +1,180 @@
+"""
+Token-reduction normalization of extracted document text.
+
+Hospital PDFs repeat the same letterhead, footer, privacy disclaimer and page
+numbering on every page. This stage drops that repetition before the text is
+sent to the AI, keeping the first occurrence of each repeated line.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from src.config import Settings, get_settings
+from src.services.pdf_extractor import PAGE_MARKER_PATTERN
+from src.services.rate_limiter import CHARS_PER_TOKEN
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Pages a line must repeat on to count as a header or footer; shorter documents
+# keep every line, as their repetitions are as likely to be clinical content
+MIN_REPEATED_PAGES = 3
+
+# Lines at the top and at the bottom of each page where headers and footers sit
+HEADER_FOOTER_LINES = 3
+
+# Lines kept untouched: page markers and the sampling note from PdfExtractor
+STRUCTURAL_LINE_PATTERN = re.compile(
+    r"^(--- Page \d+ ---|\[\.\.\. \d+ page\(s\) omitted \.\.\.\])$"
+)
+
+# Page numbering such as "Pagina 2 di 5", "Pag. 2/5", "Page 2 of 5" or "- 2 -".
+# Bare numbers are left alone: they may be lab values or blood pressures.
+PAGE_NUMBER_PATTERN = re.compile(
+    r"^(?:(?:pagina|pag\.?|page)\s*\d+(?:\s*(?:di|of|/)\s*\d+)?|-\s*\d+\s*-)$",
+    re.IGNORECASE,
+)
+
+# Legal boilerplate that carries no clinical information
+BOILERPLATE_PATTERN = re.compile(
+    r"(?:d\.?\s?lgs\.?\s*(?:n\.?\s*)?196/2003"
+    r"|regolamento\s+(?:\(?ue\)?\s*)?(?:n\.?\s*)?2016/679"
+    r"|\bgdpr\b"
+    r"|informativa\s+(?:sul(?:la)?\s+)?(?:trattamento\s+dei\s+dati|privacy)"
+    r"|documento\s+firmato\s+digitalmente"
+    r"|firma\s+autografa\s+sostituita"
+    r"|stampato\s+il\s+\d)",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class NormalizedText:
+    """
+    Result of text normalization.
+
+    Attributes:
+        text: The normalized text.
+        chars_saved: Characters removed from the input.
+        estimated_tokens_saved: Approximate input tokens saved.
+    """
+
+    text: str
+    chars_saved: int
+    estimated_tokens_saved: int
+
+
+class TextNormalizer:
+    """
+    Removes repeated headers/footers, page numbering and legal boilerplate.
+
+    A line is considered a repeated header or footer when, ignoring case, it
+    appears among the first or last lines of at least the configured fraction
+    of pages, and of at least three pages. Lines differing only in numbers are
+    kept apart on purpose, since they may carry clinical values, and lines in
+    the body of a page are never dropped as repeated.
+    """
+
+    def __init__(self, settings: Settings | None = None):
+        """
+        Initialize the text normalizer.
+
+        Args:
+            settings: Application settings. If None, loads from environment.
+        """
+        self._settings = settings or get_settings()
+
+    def normalize(self, text: str) -> NormalizedText:
+        """
+        Normalize extracted text.
+
+        Args:
+            text: Text with the page markers emitted by PdfExtractor.
+
+        Returns:
+            NormalizedText with the reduced text and the savings.
+        """
+        if not self._settings.text_normalization_enabled:
+            return NormalizedText(text=text, chars_saved=0, estimated_tokens_saved=0)
+
+        pages = [page for page in PAGE_MARKER_PATTERN.split(text) if page.strip()]
+        page_lines = [page.split("\n") for page in pages]
+        page_edges = [self._edge_lines(lines) for lines in page_lines]
+
+        # Count on how many pages each line appears at the top or bottom
+        page_counts: Counter[str] = Counter()
+        for lines, edges in zip(page_lines, page_edges, strict=True):
+            page_counts.update({self._line_key(lines[index]) for index in edges})
+
+        min_pages = max(
+            MIN_REPEATED_PAGES,
+            math.ceil(len(pages) * self._settings.text_repeated_line_min_ratio),
+        )
+        # Lines without letters (bare values) are never treated as headers
+        repeated = {
+            key
+            for key, count in page_counts.items()
+            if count >= min_pages and any(char.isalpha() for char in key)
+        }
+
+        seen: set[str] = set()
+        kept_pages = []
+        for lines, edges in zip(page_lines, page_edges, strict=True):
+            kept = []
+            for index, line in enumerate(lines):
+                stripped = line.strip()
+                if not stripped:
+                    # Removed lines must not leave runs of blank lines behind
+                    if kept and kept[-1]:
+                        kept.append("")
+                    continue
+                if STRUCTURAL_LINE_PATTERN.match(stripped):
+                    kept.append(line)
+                    continue
+                if PAGE_NUMBER_PATTERN.match(stripped) or BOILERPLATE_PATTERN.search(stripped):
+                    continue
+
+                key = self._line_key(line)
+                if index in edges and key in repeated:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                kept.append(line)
+            kept_pages.append("\n".join(kept).strip())
+
+        normalized = "\n\n".join(page for page in kept_pages if page)
+        chars_saved = max(0, len(text) - len(normalized))
+
+        if chars_saved:
+            logger.debug(
+                "Normalization removed %s characters (~%s tokens)",
+                chars_saved,
+                chars_saved // CHARS_PER_TOKEN,
+            )
+
+        return NormalizedText(
+            text=normalized,
+            chars_saved=chars_saved,
+            estimated_tokens_saved=chars_saved // CHARS_PER_TOKEN,
+        )
+
+    @classmethod
+    def _edge_lines(cls, lines: list[str]) -> set[int]:
+        """Indexes of the first and last content lines of a page."""
+        content = [index for index, line in enumerate(lines) if cls._is_content(line.strip())]
+        return set(content[:HEADER_FOOTER_LINES] + content[-HEADER_FOOTER_LINES:])
+
+    @staticmethod
+    def _is_content(line: str) -> bool:
+        """Whether a stripped line is neither blank, structural nor always removed."""
+        return bool(line) and not (
+            STRUCTURAL_LINE_PATTERN.match(line)
+            or PAGE_NUMBER_PATTERN.match(line)
+            or BOILERPLATE_PATTERN.search(line)
+        )
+
+    @staticmethod
+    def _line_key(line: str) -> str:
+        return line.strip().lower()
@@ -1,5 +1,5 @@
 """Utilities package."""
 
-from src.utils.logger import get_logger, setup_logging
+from src.utils.logger import get_logger, log_context, setup_logging
 
-__all__ = ["get_logger", "setup_logging"]
+__all__ = ["get_logger", "log_context", "setup_logging"]
@@ -1,18 +1,112 @@
+"""
+Logging setup.
+
+Records are handed to a queue by the calling thread and written to stdout by
+a background listener thread, so slow stdout writes never block the event
+loop. Output is either JSON lines or plain text following the configured log
+format. Fields bound with log_context (such as document_id and stage) and
+passed via extra are added to every JSON record.
+"""
+
+import atexit
+import json
 import logging
+import queue
 import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
 
 from src.config import get_settings
 
+# Fields attached to every record logged in the current context
+_log_context: ContextVar[dict[str, Any]] = ContextVar("log_context", default={})
+
+# Attributes every LogRecord has; anything else came from extra or the context
+_RECORD_ATTRIBUTES = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+_listener: QueueListener | None = None
+
+
+class ContextFilter(logging.Filter):
+    """Copies the fields bound with log_context onto each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _LazyQueueHandler(QueueHandler):
+    """
+    Enqueues records without formatting them.
+
+    Only the message itself is rendered in the calling thread, since its
+    arguments may change after the call returns. The final formatting is
+    left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
 
 def setup_logging() -> None:
+    global _listener
+    if _listener is not None:
+        return
+
     settings = get_settings()
 
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.log_json:
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(settings.log_format))
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = _LazyQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
     logging.basicConfig(
         level=getattr(logging, settings.log_level.upper()),
-        format=settings.log_format,
-        handlers=[logging.StreamHandler(sys.stdout)],
+        handlers=[queue_handler],
     )
 
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
     logging.getLogger("minio").setLevel(logging.WARNING)
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -20,3 +114,21 @@ def setup_logging() -> None:
 
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """
+    Attach fields to every record logged within the block.
+
+    The fields follow the current task and are copied into threads started
+    with asyncio.to_thread.
+
+    Args:
+        **fields: Structured fields, such as document_id or stage.
+    """
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
@@ -0,0 +1,207 @@
+"""
+Prometheus metrics for the AI service.
+
+Metrics are module-level collectors registered in the default registry and
+exposed by the /metrics endpoint.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from src.utils.logger import get_logger, log_context
+
+logger = get_logger(__name__)
+
+# Latencies from a few milliseconds (cache hits, small PDFs) to long LLM calls
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+STAGE_DURATION = Histogram(
+    "ai_service_stage_duration_seconds",
+    "Duration of each analysis stage (fetch, extract, normalize, classify, llm, parse)",
+    ["stage"],
+    buckets=DURATION_BUCKETS,
+)
+
+STAGE_IN_FLIGHT = Gauge(
+    "ai_service_stage_in_flight",
+    "Analysis stages currently running",
+    ["stage"],
+)
+
+ANALYSIS_DURATION = Histogram(
+    "ai_service_analysis_duration_seconds",
+    "End-to-end duration of a document analysis",
+    buckets=DURATION_BUCKETS,
+)
+
+ANALYSES_IN_FLIGHT = Gauge(
+    "ai_service_analyses_in_flight",
+    "Document analyses currently running",
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "ai_service_admission_in_flight",
+    "Admission slots (documents) held by admitted analysis requests",
+)
+
+ADMISSION_QUEUED = Gauge(
+    "ai_service_admission_queued",
+    "Analysis requests waiting for admission",
+)
+
+ADMISSION_QUEUE_DELAY = Histogram(
+    "ai_service_admission_queue_delay_seconds",
+    "Time admitted requests waited in the admission queue",
+    buckets=DURATION_BUCKETS,
+)
+
+ADMISSION_SHED = Counter(
+    "ai_service_admission_shed_total",
+    "Analysis requests rejected by admission control, by reason",
+    ["reason"],
+)
+
+ANALYSES = Counter(
+    "ai_service_analyses_total",
+    "Completed document analyses by error code (OK on success)",
+    ["error_code"],
+)
+
+PDF_SIZE_BYTES = Histogram(
+    "ai_service_pdf_size_bytes",
+    "Size of the fetched PDF documents",
+    buckets=(10e3, 50e3, 100e3, 250e3, 500e3, 1e6, 2.5e6, 5e6, 10e6, 25e6, 50e6, 100e6),
+)
+
+DOCUMENT_MEMORY_BYTES = Gauge(
+    "ai_service_document_memory_bytes",
+    "Bytes of fetched documents currently held in memory",
+)
+
+DOCUMENTS_SPOOLED = Counter(
+    "ai_service_documents_spooled_total",
+    "Fetched documents spilled to a temporary file instead of being held in memory",
+)
+
+PDF_PAGES = Histogram(
+    "ai_service_pdf_pages",
+    "Page count of the extracted PDF documents",
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+
+EXTRACTED_CHARS = Histogram(
+    "ai_service_extracted_chars",
+    "Characters of text extracted from each PDF",
+    buckets=(100, 500, 1000, 2500, 5000, 10000, 15000, 25000, 50000, 100000),
+)
+
+LLM_TOKENS = Counter(
+    "ai_service_llm_tokens_total",
+    "Tokens used by Groq calls, as reported by the API",
+    ["kind"],
+)
+
+LLM_CALLS_AVOIDED = Counter(
+    "ai_service_llm_calls_avoided_total",
+    "Groq calls skipped because the document was classified locally as non-medical",
+)
+
+LLM_ROUTE_CALLS = Counter(
+    "ai_service_llm_route_calls_total",
+    "Groq calls by route, model and outcome (ok, rate_limited, timeout, error)",
+    ["route", "model", "outcome"],
+)
+
+LLM_ROUTE_DURATION = Histogram(
+    "ai_service_llm_route_duration_seconds",
+    "Duration of Groq calls by route and model",
+    ["route", "model"],
+    buckets=DURATION_BUCKETS,
+)
+
+LLM_FAILOVERS = Counter(
+    "ai_service_llm_failovers_total",
+    "Groq calls moved to a fallback model, by route and the model given up on",
+    ["route", "model"],
+)
+
+LLM_PACK_SIZE = Histogram(
+    "ai_service_llm_pack_size",
+    "Documents sent in one packed Groq call",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16),
+)
+
+LLM_PACK_FALLBACKS = Counter(
+    "ai_service_llm_pack_fallbacks_total",
+    "Packed documents analyzed alone after the packed response had no usable result for them",
+)
+
+LLM_RATE_LIMITED = Counter(
+    "ai_service_llm_rate_limited_total",
+    "Groq calls rejected with a rate limit",
+)
+
+DEPENDENCY_UP = Gauge(
+    "ai_service_dependency_up",
+    "Whether the latest background health check of a dependency passed",
+    ["dependency"],
+)
+
+HTTP_POOL_SIZE = Gauge(
+    "ai_service_http_pool_size",
+    "Connections kept by each HTTP connection pool",
+    ["pool"],
+)
+
+HTTP_POOL_IN_USE = Gauge(
+    "ai_service_http_pool_in_use",
+    "Requests (groq) or connections (minio) currently using each HTTP connection pool",
+    ["pool"],
+)
+
+HTTP_POOL_SATURATED = Counter(
+    "ai_service_http_pool_saturated_total",
+    "Requests started while every connection of the pool was in use",
+    ["pool"],
+)
+
+RETRIES = Counter(
+    "ai_service_retries_total",
+    "Retried calls to external dependencies",
+    ["dependency"],
+)
+
+DOCUMENT_EVENTS = Counter(
+    "ai_service_document_events_total",
+    "Consumed document events by outcome (analyzed, failed, retried, invalid)",
+    ["outcome"],
+)
+
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """
+    Time an analysis stage and count it as in flight while it runs.
+
+    Records logged during the stage carry its name, and the duration is
+    logged as a structured field when the stage ends.
+
+    Args:
+        stage: Name of the stage, used as the metric and log label.
+    """
+    start = time.perf_counter()
+    with STAGE_IN_FLIGHT.labels(stage).track_inprogress(), log_context(stage=stage):
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            STAGE_DURATION.labels(stage).observe(duration)
+            logger.debug(
+                "Stage %s finished in %.1fms",
+                stage,
+                duration * 1000,
+                extra={"duration_ms": round(duration * 1000, 1)},
+            )
@@ -0,0 +1,26 @@
+"""Shared fixtures."""
+
+import socket
+
+import pytest
+
+from src.config import Settings
+
+
+@pytest.fixture
+def settings() -> Settings:
+    """Settings independent of the environment and .env, with no retry delays."""
+    return Settings(
+        _env_file=None,
+        groq_api_key="test",
+        retry_delay_seconds=0.0,
+        document_event_max_attempts=3,
+    )
+
+
+@pytest.fixture
+def closed_port() -> int:
+    """A local port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
@@ -0,0 +1,145 @@
+"""Tests of AdmissionController."""
+
+import asyncio
+
+import pytest
+
+from src.config import Settings
+from src.services.admission import AdmissionController, AdmissionRejectedError
+
+
+def make_controller(settings: Settings, **overrides) -> AdmissionController:
+    settings.admission_max_in_flight = 4
+    settings.admission_max_queue = 2
+    settings.admission_queue_timeout_seconds = 1.0
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    return AdmissionController(settings)
+
+
+@pytest.fixture
+def controller(settings: Settings) -> AdmissionController:
+    return make_controller(settings)
+
+
+@pytest.fixture
+def codel_controller(settings: Settings) -> AdmissionController:
+    return make_controller(
+        settings,
+        admission_queue_target_seconds=0.05,
+        admission_queue_interval_seconds=0.1,
+        admission_queue_timeout_seconds=5.0,
+    )
+
+
+async def test_weighted_request_holds_a_slot_per_document(controller):
+    await controller.acquire(3)
+    assert controller.in_flight == 3
+
+    waiter = asyncio.create_task(controller.acquire(2))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    controller.release(3)
+    await waiter
+    assert controller.in_flight == 2
+
+
+async def test_weight_is_capped_at_max_in_flight(controller):
+    await controller.acquire(100)
+    assert controller.in_flight == 4
+
+    controller.release(100)
+    assert controller.in_flight == 0
+
+
+async def test_waiters_are_admitted_in_arrival_order(controller):
+    await controller.acquire(3)
+    heavy = asyncio.create_task(controller.acquire(4))
+    await asyncio.sleep(0.01)
+    light = asyncio.create_task(controller.acquire(1))
+    await asyncio.sleep(0.01)
+
+    # A free slot is not enough for the heavy waiter, and the light one waits behind it
+    assert not heavy.done() and not light.done()
+
+    controller.release(3)
+    await heavy
+    assert not light.done()
+
+    controller.release(4)
+    await light
+    assert controller.in_flight == 1
+
+
+async def test_sheds_arrivals_beyond_the_queue(controller):
+    await controller.acquire(4)
+    waiters = [asyncio.create_task(controller.acquire()) for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(AdmissionRejectedError) as error:
+        await controller.acquire()
+    assert error.value.reason == "queue_full"
+
+    controller.release(4)
+    await asyncio.gather(*waiters)
+    assert controller.in_flight == 2
+
+
+async def test_cancelled_waiter_leaves_no_slot_behind(controller):
+    await controller.acquire(4)
+    waiter = asyncio.create_task(controller.acquire(2))
+    await asyncio.sleep(0.01)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    controller.release(4)
+
+    assert controller.in_flight == 0
+    assert controller.queued == 0
+
+
+async def test_overload_applies_to_requests_already_waiting(codel_controller):
+    controller = codel_controller
+    # Admitted at once after the first interval: the next interval starts without queue delay
+    await asyncio.sleep(0.1)
+    await controller.acquire(4)
+    first = asyncio.create_task(controller.acquire())
+    second = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0.15)
+
+    # The first waiter is admitted after the target, at the end of an interval: overload
+    controller.release(1)
+    await first
+    assert controller.overloaded
+
+    # The second one has waited past the target as well and is shed without waiting longer
+    with pytest.raises(AdmissionRejectedError) as error:
+        await asyncio.wait_for(second, timeout=0.1)
+    assert error.value.reason == "queue_timeout"
+
+
+async def test_request_admitted_within_target_ends_overload(codel_controller):
+    controller = codel_controller
+    # Admitted at once after the first interval: the next interval starts without queue delay
+    await asyncio.sleep(0.1)
+    await controller.acquire(4)
+    late = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0.15)
+    controller.release(1)
+    await late
+    assert controller.overloaded
+
+    prompt = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0.01)
+    controller.release(1)
+    await prompt
+    assert not controller.overloaded
+
+    # Waiters get the full timeout again right away
+    waiting = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0.1)
+    assert not waiting.done()
+    controller.release(1)
+    await waiting
@@ -0,0 +1,280 @@
+"""Tests for the AI analyzer, against a mocked Groq HTTP API."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from groq import AsyncGroq
+
+from src.config import ModelRoute
+from src.services.ai_analyzer import (
+    AiAnalyzer,
+    AiConnectionError,
+    AiResponseParsingError,
+    DocumentMetadata,
+)
+
+DOCUMENT = "Referto: emocromo nella norma, glicemia 95 mg/dl."
+
+
+def sse_chunk(content: str) -> bytes:
+    chunk = {
+        "id": "chatcmpl-1",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "test-model",
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n".encode()
+
+
+class SseStream(httpx.AsyncByteStream):
+    """Server-sent events body, optionally dropping the connection before the end."""
+
+    def __init__(self, contents: list[str], error: Exception | None = None):
+        self._contents = contents
+        self._error = error
+
+    async def __aiter__(self):
+        for content in self._contents:
+            yield sse_chunk(content)
+        if self._error is not None:
+            raise self._error
+        yield b"data: [DONE]\n\n"
+
+
+def mocked_analyzer(settings, handler) -> AiAnalyzer:
+    analyzer = AiAnalyzer(settings)
+    analyzer._client = AsyncGroq(
+        api_key="test",
+        base_url="http://groq.test",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    return analyzer
+
+
+def streaming_analyzer(settings, body: SseStream) -> AiAnalyzer:
+    return mocked_analyzer(
+        settings,
+        lambda request: httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, stream=body
+        ),
+    )
+
+
+def completion(content: str) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "test-model",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        },
+    )
+
+
+def rate_limiter(analyzer: AiAnalyzer):
+    route = analyzer._router.route(0)
+    return analyzer._router._targets[route.model].rate_limiter
+
+
+@pytest.fixture
+def settings(settings):
+    settings.ai_packing_enabled = False
+    settings.llm_concurrency = 4
+    return settings
+
+
+async def test_stream_yields_summary_then_metadata(settings):
+    analyzer = streaming_analyzer(
+        settings, SseStream(['{"summary": "Emocromo', ' nella norma.", "tags": ["emocromo"]}'])
+    )
+    rate_limiter(analyzer)._concurrency_limit = 1.0
+
+    items = [item async for item in analyzer.analyze_stream(DOCUMENT)]
+
+    assert items == [
+        "Emocromo",
+        " nella norma.",
+        DocumentMetadata(summary="Emocromo nella norma.", tags=["emocromo"]),
+    ]
+    assert rate_limiter(analyzer)._concurrency_limit == 2.0
+
+
+@pytest.mark.parametrize(
+    "error",
+    [httpx.ReadError("connection reset"), httpx.RemoteProtocolError("peer closed")],
+    ids=["read error", "protocol error"],
+)
+async def test_stream_dropped_midway_is_a_connection_error(settings, error):
+    analyzer = streaming_analyzer(settings, SseStream(['{"summary": "Emocromo'], error))
+    rate_limiter(analyzer)._concurrency_limit = 1.0
+    items = []
+
+    with pytest.raises(AiConnectionError):
+        async for item in analyzer.analyze_stream(DOCUMENT):
+            items.append(item)
+
+    assert items == ["Emocromo"]
+    assert rate_limiter(analyzer)._concurrency_limit == 1.0
+
+
+def packed(*entries: dict) -> str:
+    return json.dumps({"documents": list(entries)})
+
+
+def entry(id, summary: str) -> dict:
+    return {"id": id, "summary": summary, "tags": [summary.lower()]}
+
+
+def metadata(summary: str) -> DocumentMetadata:
+    return DocumentMetadata(summary=summary, tags=[summary.lower()])
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        pytest.param(
+            packed(entry("1", "Uno"), entry("2", "Due"), entry("3", "Tre")),
+            ["Uno", "Due", "Tre"],
+            id="in order",
+        ),
+        pytest.param(
+            packed(entry("3", "Tre"), entry(1, "Uno"), entry(" 2 ", "Due")),
+            ["Uno", "Due", "Tre"],
+            id="out of order",
+        ),
+        pytest.param(
+            packed(entry("1", "Uno"), entry("3", "Tre")), ["Uno", None, "Tre"], id="missing"
+        ),
+        pytest.param(
+            packed(entry("1", "Uno"), entry("4", "Quattro"), entry("0", "Zero"), entry("x", "X")),
+            ["Uno", None, None],
+            id="unknown ids",
+        ),
+        pytest.param(
+            packed(entry("2", "Due"), entry("2", "Bis"), entry("1", "Uno")),
+            ["Uno", "Due", None],
+            id="duplicated",
+        ),
+        pytest.param(
+            packed({"id": "1", "summary": "Uno"}, "2", entry("3", "Tre")),
+            [None, None, "Tre"],
+            id="malformed entries",
+        ),
+    ],
+)
+def test_parse_packed_response(settings, content, expected):
+    results = AiAnalyzer(settings)._parse_packed_response(content, 3)
+
+    assert results == [metadata(summary) if summary else None for summary in expected]
+
+
+@pytest.mark.parametrize(
+    "content", ["not json", json.dumps([]), json.dumps({"summary": "", "tags": []})]
+)
+def test_unpacked_response_is_rejected(settings, content):
+    with pytest.raises(AiResponseParsingError):
+        AiAnalyzer(settings)._parse_packed_response(content, 3)
+
+
+async def test_documents_missing_from_a_packed_response_are_analyzed_alone(settings):
+    settings.ai_packing_enabled = True
+    prompts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["messages"][1]["content"]
+        prompts.append(prompt)
+        if "=== DOCUMENT id=" in prompt:
+            return completion(packed(entry("2", "Due")))
+        return completion(json.dumps(entry(None, "Uno")))
+
+    analyzer = mocked_analyzer(settings, handler)
+
+    results = await asyncio.gather(analyzer.analyze("Referto uno"), analyzer.analyze("Referto due"))
+
+    assert results == [metadata("Uno"), metadata("Due")]
+    assert len(prompts) == 2
+    assert "Referto uno" in prompts[1] and "Referto due" not in prompts[1]
+
+
+def failing_models(behaviours: dict[str, str], calls: list[str]):
+    """Handler answering each model as scripted: rate_limited, timeout or ok."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        calls.append(model)
+        behaviour = behaviours[model]
+        if behaviour == "rate_limited":
+            return httpx.Response(429, json={"error": {"message": "Rate limit reached"}})
+        if behaviour == "timeout":
+            raise httpx.ReadTimeout("timed out", request=request)
+        return completion(json.dumps({"summary": f"Da {model}", "tags": ["referto"]}))
+
+    return handler
+
+
+@pytest.fixture
+def routed_settings(settings):
+    settings.groq_model_routes = [
+        ModelRoute(name="default", model="primary", fallback_models=["secondary", "tertiary"])
+    ]
+    return settings
+
+
+@pytest.mark.parametrize(
+    ("behaviours", "calls", "summary"),
+    [
+        pytest.param(
+            {"primary": "rate_limited", "secondary": "ok", "tertiary": "ok"},
+            ["primary", "secondary"],
+            "Da secondary",
+            id="rate limit",
+        ),
+        pytest.param(
+            {"primary": "timeout", "secondary": "ok", "tertiary": "ok"},
+            ["primary", "secondary"],
+            "Da secondary",
+            id="timeout",
+        ),
+        pytest.param(
+            {"primary": "rate_limited", "secondary": "timeout", "tertiary": "ok"},
+            ["primary", "secondary", "tertiary"],
+            "Da tertiary",
+            id="rate limit then timeout",
+        ),
+    ],
+)
+async def test_failover_follows_the_route_order(routed_settings, behaviours, calls, summary):
+    made: list[str] = []
+    analyzer = mocked_analyzer(routed_settings, failing_models(behaviours, made))
+
+    metadata = await analyzer.analyze(DOCUMENT)
+
+    assert metadata.summary == summary
+    assert made == calls
+
+
+@pytest.mark.parametrize("behaviour", ["rate_limited", "timeout"])
+async def test_last_model_is_retried_before_giving_up(routed_settings, behaviour):
+    made: list[str] = []
+    analyzer = mocked_analyzer(
+        routed_settings,
+        failing_models(dict.fromkeys(["primary", "secondary", "tertiary"], behaviour), made),
+    )
+
+    with pytest.raises(AiConnectionError):
+        await analyzer.analyze(DOCUMENT)
+
+    assert made == ["primary", "secondary"] + ["tertiary"] * routed_settings.max_retries
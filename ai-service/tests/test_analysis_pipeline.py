@@ -0,0 +1,68 @@
+"""Tests of AnalysisPipeline, with stand-ins for MinIO, the extraction pool, Groq and the cache."""
+
+import asyncio
+
+from src.services.ai_analyzer import DocumentMetadata
+from src.services.analysis_pipeline import AnalysisPipeline
+from src.services.document_buffer import DocumentBuffer, DocumentMemoryBudget
+from src.services.pdf_extractor import ExtractedText
+
+DOCUMENT_TEXT = "Emocromo: emoglobina 13.5 g/dL, leucociti nella norma. Referto di laboratorio."
+
+
+class FakeMinioClient:
+    def __init__(self, settings):
+        self._settings = settings
+        self.fetches: list[tuple[str, str, str | None]] = []
+        self.release = asyncio.Event()
+
+    async def fetch_document(self, patient_id, document_id, filename=None) -> DocumentBuffer:
+        self.fetches.append((patient_id, document_id, filename))
+        await self.release.wait()
+        document = DocumentBuffer(DocumentMemoryBudget(1 << 20), self._settings)
+        document.write(b"%PDF-1.7")
+        return document
+
+
+class FakeExtractionPool:
+    async def extract(self, source) -> ExtractedText:
+        return ExtractedText(text=DOCUMENT_TEXT, page_count=1)
+
+
+class FakeAiAnalyzer:
+    def __init__(self):
+        self.calls = 0
+
+    async def analyze(self, document_text: str) -> DocumentMetadata:
+        self.calls += 1
+        return DocumentMetadata(summary="Emocromo nella norma", tags=["emocromo"])
+
+
+class FakeAnalysisCache:
+    def make_key(self, document_text: str) -> str:
+        return document_text
+
+    async def get(self, key: str) -> DocumentMetadata | None:
+        return None
+
+    async def put(self, key: str, metadata: DocumentMetadata) -> None:
+        pass
+
+
+async def test_requests_for_same_document_share_a_run_with_or_without_filename(settings):
+    minio_client = FakeMinioClient(settings)
+    ai_analyzer = FakeAiAnalyzer()
+    pipeline = AnalysisPipeline(
+        minio_client, FakeExtractionPool(), ai_analyzer, FakeAnalysisCache(), settings
+    )
+
+    first = asyncio.create_task(pipeline.analyze("patient-1", "doc-1", "report.pdf"))
+    second = asyncio.create_task(pipeline.analyze("patient-1", "doc-1"))
+    await asyncio.sleep(0.01)
+    minio_client.release.set()
+    results = await asyncio.gather(first, second)
+
+    assert results[0] == results[1]
+    assert minio_client.fetches == [("patient-1", "doc-1", "report.pdf")]
+    assert ai_analyzer.calls == 1
+    assert pipeline.coalesced_requests == 1
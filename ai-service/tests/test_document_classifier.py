@@ -0,0 +1,73 @@
+"""Tests for the local document classifier."""
+
+import pytest
+
+from src.services.document_classifier import DocumentClassifier
+
+LAB_REPORT = """
+Laboratorio Analisi - Referto
+Paziente: Mario Rossi
+Emocromo: Emoglobina 14,2 g/dL, Leucociti 6.800, Piastrine 250.000
+Colesterolo totale 210 mg/dl, Glicemia 95 mg/dl
+Importo ticket: 36,15 € - Totale da pagare: 36,15 €, saldo al ritiro
+Consumo di alcol: assente. Rate di filtrazione glomerulare nella norma.
+"""
+
+DISCHARGE_LETTER = """
+Ospedale San Raffaele - Lettera di dimissione
+Diagnosi: polmonite. Terapia: amoxicillina compresse 1 g ogni 8 ore.
+Pagamento del ticket con bonifico, IBAN sul sito della ASL. Totale 25 €.
+"""
+
+INVOICE = """
+Fattura n. 2024/118 - Fornitore: Rossi Impianti S.r.l.
+Imponibile 1.000,00 € - IVA 22% 220,00 € - Totale 1.220,00 €
+Pagamento tramite bonifico bancario, IBAN IT60X0542811101000000123456
+"""
+
+ENGLISH_INVOICE = """
+Invoice #4471 - Supplier: Acme Ltd
+Price 120.00, discount 10%, VAT 22%, shipping included.
+Payment due within 30 days.
+"""
+
+LEASE = """
+Contratto di locazione ad uso abitativo tra il locatore e il conduttore.
+Il canone mensile è di 800 €, pagamento entro il giorno 5.
+Clausola di recesso: preavviso di sei mesi.
+"""
+
+
+@pytest.fixture
+def classifier(settings) -> DocumentClassifier:
+    settings.classifier_enabled = True
+    return DocumentClassifier(settings)
+
+
+@pytest.mark.parametrize(
+    ("text", "non_medical"),
+    [
+        pytest.param(LAB_REPORT, False, id="lab report with totals and ticket"),
+        pytest.param(DISCHARGE_LETTER, False, id="discharge letter with payment"),
+        pytest.param(INVOICE, True, id="invoice"),
+        pytest.param(ENGLISH_INVOICE, True, id="english invoice"),
+        pytest.param(LEASE, True, id="lease contract"),
+    ],
+)
+def test_classify(classifier, text, non_medical):
+    assert classifier.classify(text).non_medical is non_medical
+
+
+def test_ambiguous_terms_are_not_administrative(classifier):
+    classification = classifier.classify("Totale importo saldo rata euro consumo amount total")
+
+    assert classification.non_medical_hits == 0
+
+
+@pytest.mark.parametrize("text", ["10 €", "10€", "€ 10"])
+def test_euro_sign_is_matched(classifier, text):
+    assert classifier.classify(text).non_medical_hits == 1
+
+
+def test_disabled_classifier_sends_everything_to_the_ai(settings):
+    assert DocumentClassifier(settings).classify(INVOICE).non_medical is False
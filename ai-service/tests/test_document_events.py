@@ -0,0 +1,209 @@
+"""Tests of DocumentEventsConsumer, run against InMemoryEventBroker."""
+
+import asyncio
+import json
+from collections import defaultdict
+from collections.abc import Callable
+
+import pytest
+
+from src.config import Settings
+from src.services.document_events import (
+    DocumentEvent,
+    DocumentEventsConsumer,
+    InMemoryEventBroker,
+)
+from src.utils.metrics import DOCUMENT_EVENTS
+
+
+class RecordingBroker(InMemoryEventBroker):
+    """In-memory broker that also records commits and seeks, in order."""
+
+    def __init__(self):
+        super().__init__()
+        self.commits: list[dict[tuple[str, int], int]] = []
+        self.seeks: list[tuple[str, int, int]] = []
+
+    async def commit(self, offsets: dict[tuple[str, int], int]) -> None:
+        self.commits.append(dict(offsets))
+        await super().commit(offsets)
+
+    async def seek(self, topic: str, partition: int, offset: int) -> None:
+        self.seeks.append((topic, partition, offset))
+        await super().seek(topic, partition, offset)
+
+
+class UnreachableBroker(InMemoryEventBroker):
+    """In-memory broker whose first connection attempts fail."""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    async def start(self, topics: list[str]) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("broker unreachable")
+        await super().start(topics)
+
+
+class FakeHandler:
+    """Analysis handler answering from a per-document script of results."""
+
+    def __init__(self, results: dict[str, list[dict]] | None = None):
+        self._results = results or {}
+        self.calls: dict[str, int] = defaultdict(int)
+
+    async def __call__(self, event: DocumentEvent) -> dict:
+        self.calls[event.document_id] += 1
+        script = self._results.get(event.document_id)
+        if script:
+            return script.pop(0) if len(script) > 1 else script[0]
+        return {"success": True, "summary": f"Summary of {event.document_id}", "tags": ["lab"]}
+
+
+def event(document_id: str, patient_id: str = "patient-1") -> bytes:
+    return json.dumps({"documentId": document_id, "patientId": patient_id}).encode()
+
+
+def failure(error_code: str) -> dict:
+    return {"success": False, "error_code": error_code, "error_message": error_code}
+
+
+async def wait_until(condition: Callable[[], bool], timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("Condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def broker() -> RecordingBroker:
+    return RecordingBroker()
+
+
+def published(broker: InMemoryEventBroker, settings: Settings) -> list[dict]:
+    return [json.loads(record) for record in broker.records(settings.kafka_topic_document_analyzed)]
+
+
+async def test_commits_only_after_successful_analysis(broker, settings):
+    release = asyncio.Event()
+
+    async def handler(document_event: DocumentEvent) -> dict:
+        await release.wait()
+        return {"success": True, "summary": "Summary", "tags": ["lab"]}
+
+    topic = settings.kafka_topic_document_created
+    consumer = DocumentEventsConsumer(broker, handler, settings)
+    broker.produce(topic, event("doc-1"))
+    await consumer.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert broker.committed(topic) == 0
+        assert published(broker, settings) == []
+
+        release.set()
+        await wait_until(lambda: broker.committed(topic) == 1)
+        assert len(published(broker, settings)) == 1
+    finally:
+        await consumer.stop()
+
+
+async def test_retryable_failure_commits_up_to_failed_record_and_seeks_back(broker, settings):
+    topic = settings.kafka_topic_document_created
+    handler = FakeHandler({"doc-2": [failure("AI_GENERATION_FAILED"), {"success": True}]})
+    consumer = DocumentEventsConsumer(broker, handler, settings)
+    for document_id in ("doc-1", "doc-2", "doc-3"):
+        broker.produce(topic, event(document_id))
+
+    await consumer.start()
+    try:
+        await wait_until(lambda: broker.committed(topic) == 3)
+    finally:
+        await consumer.stop()
+
+    assert broker.commits[0] == {(topic, 0): 1}
+    assert broker.seeks == [(topic, 0, 1)]
+    assert handler.calls == {"doc-1": 1, "doc-2": 2, "doc-3": 1}
+    assert [result["documentId"] for result in published(broker, settings)] == [
+        "doc-1",
+        "doc-3",
+        "doc-2",
+    ]
+
+
+async def test_publishes_results_to_analyzed_topic(broker, settings):
+    topic = settings.kafka_topic_document_updated
+    consumer = DocumentEventsConsumer(broker, FakeHandler(), settings)
+    broker.produce(topic, event("doc-1", "patient-7"))
+
+    await consumer.start()
+    try:
+        await wait_until(lambda: broker.committed(topic) == 1)
+    finally:
+        await consumer.stop()
+
+    [result] = published(broker, settings)
+    assert result["documentId"] == "doc-1"
+    assert result["patientId"] == "patient-7"
+    assert result["eventType"] == "updated"
+    assert result["success"] is True
+    assert result["summary"] == "Summary of doc-1"
+    assert result["tags"] == ["lab"]
+    assert result["errorCode"] is None
+
+
+async def test_skips_malformed_records(broker, settings):
+    topic = settings.kafka_topic_document_created
+    handler = FakeHandler()
+    consumer = DocumentEventsConsumer(broker, handler, settings)
+    invalid = DOCUMENT_EVENTS.labels("invalid")
+    invalid_before = invalid._value.get()
+    broker.produce(topic, b"not json")
+    broker.produce(topic, json.dumps({"documentId": "doc-1"}).encode())
+    broker.produce(topic, event("doc-2"))
+
+    await consumer.start()
+    try:
+        await wait_until(lambda: broker.committed(topic) == 3)
+    finally:
+        await consumer.stop()
+
+    assert invalid._value.get() - invalid_before == 2
+    assert handler.calls == {"doc-2": 1}
+    assert [result["documentId"] for result in published(broker, settings)] == ["doc-2"]
+
+
+async def test_start_does_not_wait_for_unreachable_broker(settings):
+    topic = settings.kafka_topic_document_created
+    broker = UnreachableBroker(failures=2)
+    consumer = DocumentEventsConsumer(broker, FakeHandler(), settings)
+    consumer.ERROR_BACKOFF_SECONDS = 0.01
+    broker.produce(topic, event("doc-1"))
+
+    await asyncio.wait_for(consumer.start(), timeout=0.1)
+    try:
+        await wait_until(lambda: broker.committed(topic) == 1)
+    finally:
+        await consumer.stop()
+
+    assert broker.failures == 0
+
+
+async def test_publishes_failure_after_max_attempts(broker, settings):
+    topic = settings.kafka_topic_document_created
+    handler = FakeHandler({"doc-1": [failure("MINIO_CONNECTION_FAILED")]})
+    consumer = DocumentEventsConsumer(broker, handler, settings)
+    broker.produce(topic, event("doc-1"))
+
+    await consumer.start()
+    try:
+        await wait_until(lambda: broker.committed(topic) == 1)
+    finally:
+        await consumer.stop()
+
+    assert handler.calls["doc-1"] == settings.document_event_max_attempts
+    [result] = published(broker, settings)
+    assert result["success"] is False
+    assert result["errorCode"] == "MINIO_CONNECTION_FAILED"
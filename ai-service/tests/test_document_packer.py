@@ -0,0 +1,125 @@
+"""Tests for the packing of short documents into shared calls."""
+
+import asyncio
+
+import pytest
+
+from src.services.document_packer import DocumentPacker
+
+
+class FakeAnalyses:
+    """Records the calls of a packer and answers them from scripted results."""
+
+    def __init__(self, pack_results=None, pack_error: Exception | None = None):
+        self.packs: list[list[str]] = []
+        self.singles: list[str] = []
+        self._pack_results = pack_results
+        self._pack_error = pack_error
+
+    async def analyze_pack(self, texts: list[str]) -> list[str | None]:
+        self.packs.append(texts)
+        if self._pack_error is not None:
+            raise self._pack_error
+        if self._pack_results is not None:
+            return self._pack_results(texts)
+        return [f"packed:{text}" for text in texts]
+
+    async def analyze_one(self, text: str) -> str:
+        self.singles.append(text)
+        if text == "failing":
+            raise ValueError("single analysis failed")
+        return f"single:{text}"
+
+
+@pytest.fixture
+def settings(settings):
+    settings.ai_packing_window_seconds = 0.01
+    settings.ai_packing_max_documents = 3
+    settings.ai_max_input_chars = 100
+    return settings
+
+
+def packer(settings, analyses: FakeAnalyses) -> DocumentPacker[str]:
+    return DocumentPacker(analyses.analyze_pack, analyses.analyze_one, settings)
+
+
+async def test_documents_in_the_same_window_share_a_call(settings):
+    analyses = FakeAnalyses()
+    documents = packer(settings, analyses)
+
+    assert await documents.analyze("a") == "single:a"
+    results = await asyncio.gather(documents.analyze("b"), documents.analyze("c"))
+
+    assert results == ["packed:b", "packed:c"]
+    assert analyses.packs == [["b", "c"]]
+
+
+async def test_full_group_is_sent_without_waiting(settings):
+    settings.ai_packing_window_seconds = 60
+    analyses = FakeAnalyses()
+    documents = packer(settings, analyses)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(documents.analyze(text) for text in "abc")), timeout=1
+    )
+
+    assert results == ["packed:a", "packed:b", "packed:c"]
+    assert analyses.packs == [["a", "b", "c"]]
+
+
+async def test_group_is_split_at_the_input_limit(settings):
+    analyses = FakeAnalyses()
+    documents = packer(settings, analyses)
+    texts = ["x" * 60, "y" * 30, "z" * 30]
+
+    await asyncio.gather(*(documents.analyze(text) for text in texts))
+
+    assert analyses.packs == [["x" * 60, "y" * 30]]
+    assert analyses.singles == ["z" * 30]
+
+
+@pytest.mark.parametrize(
+    ("pack_results", "fallbacks"),
+    [
+        pytest.param(lambda texts: [None, f"packed:{texts[1]}", None], ["a", "c"], id="missing"),
+        pytest.param(lambda texts: [None] * len(texts), ["a", "b", "c"], id="all missing"),
+        pytest.param(lambda texts: ["packed:a", "packed:b"], ["a", "b", "c"], id="too few"),
+        pytest.param(lambda texts: ["packed:a"] * 4, ["a", "b", "c"], id="too many"),
+    ],
+)
+async def test_documents_without_a_result_are_analyzed_alone(settings, pack_results, fallbacks):
+    analyses = FakeAnalyses(pack_results)
+    documents = packer(settings, analyses)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(documents.analyze(text) for text in "abc")), timeout=1
+    )
+
+    assert sorted(analyses.singles) == fallbacks
+    assert results == [
+        f"single:{text}" if text in fallbacks else f"packed:{text}" for text in "abc"
+    ]
+
+
+async def test_fallback_errors_only_reach_their_document(settings):
+    analyses = FakeAnalyses(lambda texts: [None, "packed:b"])
+    documents = packer(settings, analyses)
+
+    results = await asyncio.gather(
+        documents.analyze("failing"), documents.analyze("b"), return_exceptions=True
+    )
+
+    assert isinstance(results[0], ValueError)
+    assert results[1] == "packed:b"
+
+
+async def test_packed_call_errors_reach_every_document(settings):
+    analyses = FakeAnalyses(pack_error=RuntimeError("AI down"))
+    documents = packer(settings, analyses)
+
+    results = await asyncio.gather(
+        documents.analyze("a"), documents.analyze("b"), return_exceptions=True
+    )
+
+    assert [str(result) for result in results] == ["AI down", "AI down"]
+    assert analyses.singles == []
@@ -0,0 +1,37 @@
+"""Tests for the pooled HTTP clients."""
+
+import pytest
+import urllib3
+
+from src.services.http_pools import (
+    MINIO_POOL,
+    _TrackedHTTPConnectionPool,
+    create_minio_pool_manager,
+)
+from src.utils.metrics import HTTP_POOL_IN_USE
+
+
+def in_use() -> float:
+    return HTTP_POOL_IN_USE.labels(MINIO_POOL)._value.get()
+
+
+def test_minio_pool_fails_without_retrying(settings, closed_port):
+    manager = create_minio_pool_manager(settings)
+    before = in_use()
+
+    with pytest.raises(urllib3.exceptions.MaxRetryError) as exc_info:
+        manager.request("GET", f"http://127.0.0.1:{closed_port}/bucket/object")
+
+    assert isinstance(exc_info.value.reason, urllib3.exceptions.NewConnectionError)
+    assert in_use() == before
+
+
+def test_checkout_from_closed_pool_leaves_in_use_unchanged(closed_port):
+    pool = _TrackedHTTPConnectionPool("127.0.0.1", closed_port)
+    pool.close()
+    before = in_use()
+
+    with pytest.raises(urllib3.exceptions.ClosedPoolError):
+        pool.urlopen("GET", "/")
+
+    assert in_use() == before
@@ -0,0 +1,84 @@
+"""Tests of JobQueue, run on InMemoryJobStore."""
+
+import asyncio
+
+import pytest
+
+from src.services.job_queue import (
+    InMemoryJobStore,
+    Job,
+    JobQueue,
+    JobStatus,
+    is_callback_allowed,
+)
+
+
+async def run_job(settings, result: dict | Exception) -> Job:
+    async def handler(job: Job) -> dict:
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    store = InMemoryJobStore()
+    queue = JobQueue(store, handler, settings)
+    await queue.start()
+    try:
+        job = await queue.submit("patient-1", "doc-1")
+        for _ in range(200):
+            job = await queue.get(job.job_id)
+            if job.finished:
+                return job
+            await asyncio.sleep(0.01)
+        raise AssertionError("Job did not finish in time")
+    finally:
+        await queue.stop()
+
+
+async def test_successful_analysis_completes_the_job(settings):
+    job = await run_job(settings, {"success": True, "summary": "Summary", "tags": ["lab"]})
+
+    assert job.status == JobStatus.COMPLETED
+    assert job.result["summary"] == "Summary"
+    assert job.error_message is None
+
+
+async def test_failed_analysis_fails_the_job(settings):
+    job = await run_job(
+        settings,
+        {
+            "success": False,
+            "error_code": "DOCUMENT_NOT_FOUND",
+            "error_message": "Document not found: doc-1",
+        },
+    )
+
+    assert job.status == JobStatus.FAILED
+    assert job.result["error_code"] == "DOCUMENT_NOT_FOUND"
+    assert job.error_message == "Document not found: doc-1"
+
+
+async def test_handler_error_fails_the_job(settings):
+    job = await run_job(settings, RuntimeError("boom"))
+
+    assert job.status == JobStatus.FAILED
+    assert job.error_message == "boom"
+
+
+@pytest.mark.parametrize(
+    ("url", "allowed"),
+    [
+        ("http://documents-service:8080/jobs/done", True),
+        ("https://Documents-Service/jobs/done", True),
+        ("http://169.254.169.254/latest/meta-data", False),
+        ("http://documents-service.evil.example/jobs", False),
+        ("ftp://documents-service/jobs", False),
+    ],
+)
+def test_callbacks_are_limited_to_allowed_hosts(settings, url, allowed):
+    settings.job_callback_allowed_hosts = ["documents-service"]
+
+    assert is_callback_allowed(url, settings) is allowed
+
+
+def test_callbacks_are_disabled_without_allowed_hosts(settings):
+    assert not is_callback_allowed("http://documents-service/jobs/done", settings)
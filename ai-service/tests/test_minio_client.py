@@ -0,0 +1,19 @@
+"""Tests for the MinIO client."""
+
+import pytest
+
+from src.services.minio_client import MinioClient, MinioConnectionError
+from src.services.resilience import CircuitState
+
+
+async def test_unreachable_minio_opens_the_circuit(settings, closed_port):
+    settings.minio_endpoint = f"127.0.0.1:{closed_port}"
+    settings.circuit_failure_threshold = settings.max_retries
+    client = MinioClient(settings)
+
+    with pytest.raises(MinioConnectionError, match="Failed to connect"):
+        await client.fetch_document("patient-1", "doc-1")
+
+    assert client._breaker.state == CircuitState.OPEN
+    with pytest.raises(MinioConnectionError, match="MinIO unavailable"):
+        await client.fetch_document("patient-1", "doc-1")
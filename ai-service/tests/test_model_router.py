@@ -0,0 +1,102 @@
+"""Tests for the routing of Groq calls to models."""
+
+import pytest
+
+from src.config import ModelRoute
+from src.services.model_router import ModelRouter
+
+
+@pytest.fixture
+def settings(settings):
+    settings.groq_model_routes = [
+        ModelRoute(name="small", max_input_chars=1_000, model="fast", fallback_models=["large"]),
+        ModelRoute(name="medium", max_input_chars=5_000, model="large", fallback_models=["fast"]),
+        ModelRoute(name="long", model="long-context"),
+    ]
+    settings.groq_route_max_wait_seconds = 1.0
+    return settings
+
+
+@pytest.mark.parametrize(
+    ("prompt_chars", "route"),
+    [
+        (0, "small"),
+        (1_000, "small"),
+        (1_001, "medium"),
+        (5_000, "medium"),
+        (5_001, "long"),
+        (1_000_000, "long"),
+    ],
+)
+def test_route_is_chosen_by_prompt_size(settings, prompt_chars, route):
+    assert ModelRouter(settings).route(prompt_chars).name == route
+
+
+def test_prompts_larger_than_every_route_take_the_last_one(settings):
+    settings.groq_model_routes = settings.groq_model_routes[:2]
+
+    assert ModelRouter(settings).route(5_001).name == "medium"
+
+
+def test_without_a_table_everything_goes_to_the_default_model(settings):
+    settings.groq_model_routes = []
+    router = ModelRouter(settings)
+
+    route = router.route(1_000_000)
+
+    assert (route.name, route.model, route.fallback_models) == ("default", settings.groq_model, [])
+    assert router.models == [settings.groq_model]
+
+
+def test_models_are_shared_between_routes(settings):
+    router = ModelRouter(settings)
+
+    assert router.models == ["fast", "large", "long-context"]
+    assert router._targets["fast"] is router.candidates(router.route(2_000), 0)[1]
+
+
+def models(router: ModelRouter, route_name: str, estimated_tokens: int = 100) -> list[str]:
+    route = next(route for route in router.routes if route.name == route_name)
+    return [target.model for target in router.candidates(route, estimated_tokens)]
+
+
+def test_candidates_follow_the_table_order(settings):
+    router = ModelRouter(settings)
+
+    assert models(router, "small") == ["fast", "large"]
+    assert models(router, "medium") == ["large", "fast"]
+
+
+def test_model_with_an_open_circuit_moves_back(settings):
+    settings.circuit_failure_threshold = 1
+    router = ModelRouter(settings)
+
+    router._targets["fast"].breaker.record_failure()
+
+    assert models(router, "small") == ["large", "fast"]
+    assert models(router, "medium") == ["large", "fast"]
+
+
+def test_model_out_of_quota_moves_back(settings):
+    router = ModelRouter(settings)
+
+    router._targets["fast"].rate_limiter.on_rate_limited({"retry-after": "30"})
+
+    assert models(router, "small") == ["large", "fast"]
+
+
+def test_model_with_a_short_wait_keeps_its_place(settings):
+    router = ModelRouter(settings)
+
+    router._targets["fast"].rate_limiter.on_rate_limited({"retry-after": "0.5"})
+
+    assert models(router, "small") == ["fast", "large"]
+
+
+def test_table_order_is_kept_when_every_model_is_busy(settings):
+    router = ModelRouter(settings)
+
+    for model in ("fast", "large"):
+        router._targets[model].rate_limiter.on_rate_limited({"retry-after": "30"})
+
+    assert models(router, "small") == ["fast", "large"]
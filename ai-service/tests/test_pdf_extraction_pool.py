@@ -0,0 +1,126 @@
+"""Tests of PdfExtractionPool's recovery, with executors whose tasks the test completes."""
+
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.services.pdf_extraction_pool import PdfExtractionPool, PdfExtractionTimeoutError
+from src.services.pdf_extractor import CorruptedPdfError, ExtractedText
+
+
+class FakeExecutor:
+    """Executor whose tasks only finish when the test says so."""
+
+    def __init__(self):
+        self.tasks: dict[bytes, Future] = {}
+        self.broken = False
+
+    def submit(self, fn, pdf_content: bytes) -> Future:
+        if self.broken:
+            raise BrokenProcessPool("pool is broken")
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self.tasks[pdf_content] = future
+        return future
+
+    def break_workers(self) -> None:
+        for future in self.tasks.values():
+            if not future.done():
+                future.set_exception(BrokenProcessPool("worker died"))
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+
+class FakePool(PdfExtractionPool):
+    def __init__(self, settings):
+        self.executors: list[FakeExecutor] = []
+        super().__init__(settings)
+
+    def _create_executor(self) -> FakeExecutor:
+        self.executors.append(FakeExecutor())
+        return self.executors[-1]
+
+    @staticmethod
+    def _kill(executor: FakeExecutor) -> None:
+        executor.break_workers()
+
+
+@pytest.fixture
+def pool(settings) -> FakePool:
+    settings.pdf_extraction_workers = 2
+    settings.pdf_extraction_timeout_seconds = 0.05
+    return FakePool(settings)
+
+
+async def submitted(pool: FakePool, pdf_content: bytes) -> Future:
+    for _ in range(100):
+        future = pool.executors[-1].tasks.get(pdf_content)
+        if future is not None:
+            return future
+        await asyncio.sleep(0.001)
+    raise AssertionError(f"{pdf_content!r} was not submitted to the current pool")
+
+
+async def test_tasks_killed_by_another_timeout_are_resubmitted(pool, settings):
+    settings.pdf_extraction_timeout_seconds = 5.0
+    innocent = asyncio.create_task(pool.extract(b"innocent"))
+
+    # Two timeouts in a row kill the pools the innocent task runs on
+    for culprit in (b"slow-1", b"slow-2"):
+        await submitted(pool, b"innocent")
+        settings.pdf_extraction_timeout_seconds = 0.05
+        extraction = asyncio.create_task(pool.extract(culprit))
+        await submitted(pool, culprit)
+        # The timeout is read on submission: only the culprit gets the short one
+        settings.pdf_extraction_timeout_seconds = 5.0
+        with pytest.raises(PdfExtractionTimeoutError):
+            await extraction
+
+    (await submitted(pool, b"innocent")).set_result(ExtractedText(text="text", page_count=1))
+
+    assert (await innocent).text == "text"
+    assert len(pool.executors) == 3
+
+
+async def test_task_crashing_two_workers_is_corrupted(pool):
+    extraction = asyncio.create_task(pool.extract(b"crashing"))
+
+    for _ in range(2):
+        (await submitted(pool, b"crashing")).set_exception(BrokenProcessPool("worker died"))
+        await asyncio.sleep(0.001)
+
+    with pytest.raises(CorruptedPdfError):
+        await extraction
+
+
+async def test_tasks_on_a_pool_crashed_by_another_task_are_not_charged(pool):
+    innocent = asyncio.create_task(pool.extract(b"innocent"))
+    culprit = asyncio.create_task(pool.extract(b"crashing"))
+
+    # The culprit crashes both pools it runs on, taking the innocent task with it
+    for _ in range(2):
+        await submitted(pool, b"innocent")
+        (await submitted(pool, b"crashing")).set_exception(BrokenProcessPool("worker died"))
+        await asyncio.sleep(0.001)
+
+    with pytest.raises(CorruptedPdfError):
+        await culprit
+
+    (await submitted(pool, b"innocent")).set_result(ExtractedText(text="text", page_count=1))
+    assert (await innocent).text == "text"
+
+
+async def test_broken_pool_on_submission_is_recycled_without_a_crash(pool):
+    pool.executors[-1].broken = True
+    extraction = asyncio.create_task(pool.extract(b"document"))
+
+    # The one crash the task is allowed still gets a retry
+    (await submitted(pool, b"document")).set_exception(BrokenProcessPool("worker died"))
+    await asyncio.sleep(0.001)
+    (await submitted(pool, b"document")).set_result(ExtractedText(text="text", page_count=1))
+
+    assert (await extraction).text == "text"
+    assert len(pool.executors) == 3
@@ -0,0 +1,146 @@
+"""Tests for the Groq rate limiter and its token buckets."""
+
+import pytest
+
+from src.services import rate_limiter
+from src.services.rate_limiter import GroqRateLimiter, TokenBucket, parse_count, parse_duration
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+@pytest.mark.parametrize(
+    ("value", "seconds"),
+    [
+        ("2m59.56s", 179.56),
+        ("7.66s", 7.66),
+        ("120ms", 0.12),
+        ("1h2m3s", 3723.0),
+        ("1m", 60.0),
+        ("1m500ms", 60.5),
+        ("30", 30.0),
+        ("0.5", 0.5),
+        (" 7s ", 7.0),
+        (None, None),
+        ("", None),
+        ("soon", None),
+        ("s", None),
+        ("-1", None),
+        ("nan", None),
+        ("inf", None),
+    ],
+)
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize(
+    ("value", "count"),
+    [
+        ("14399", 14399.0),
+        ("0", 0.0),
+        ("12.5", 12.5),
+        (None, None),
+        ("", None),
+        ("n/a", None),
+        ("-3", None),
+        ("nan", None),
+        ("inf", None),
+    ],
+)
+def test_parse_count(value, count):
+    assert parse_count(value) == count
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(capacity=60, refill_per_second=1)
+    bucket.consume(60)
+
+    assert bucket.wait_time(10) == 10
+    clock.now += 4
+    assert bucket.wait_time(10) == 6
+    clock.now += 1000
+    assert bucket.wait_time(60) == 0
+    assert bucket.tokens == 60
+
+
+def test_oversized_call_waits_for_a_full_bucket_only(clock):
+    bucket = TokenBucket(capacity=60, refill_per_second=1)
+    bucket.consume(30)
+
+    assert bucket.wait_time(500) == 30
+
+
+def test_bucket_can_go_into_debt(clock):
+    bucket = TokenBucket(capacity=60, refill_per_second=2)
+    bucket.consume(80)
+
+    assert bucket.tokens == -20
+    assert bucket.wait_time(10) == 15
+
+
+def test_cap_lowers_the_bucket_and_slows_the_refill(clock):
+    bucket = TokenBucket(capacity=60, refill_per_second=1)
+    bucket.cap(0, reset_seconds=120)
+
+    assert bucket.tokens == 0
+    assert bucket.wait_time(60) == 120
+
+
+def test_cap_never_raises_the_bucket(clock):
+    bucket = TokenBucket(capacity=60, refill_per_second=1)
+    bucket.consume(50)
+    bucket.cap(40, reset_seconds=1)
+
+    assert bucket.tokens == 10
+
+
+def test_pause_empties_the_bucket_and_delays_refilling(clock):
+    bucket = TokenBucket(capacity=60, refill_per_second=1)
+    bucket.pause(30)
+
+    assert bucket.wait_time(1) == 31
+    clock.now += 30
+    assert bucket.wait_time(1) == 1
+
+
+def test_headers_cap_the_buckets(settings, clock):
+    limiter = GroqRateLimiter(settings)
+
+    limiter.update_from_headers(
+        {
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "2s",
+            "x-ratelimit-remaining-tokens": "100",
+        }
+    )
+
+    assert limiter._requests.tokens == 0
+    assert limiter._tokens.tokens == 100
+
+
+def test_malformed_headers_are_ignored(settings, clock):
+    limiter = GroqRateLimiter(settings)
+
+    limiter.update_from_headers(
+        {
+            "x-ratelimit-remaining-requests": "unknown",
+            "x-ratelimit-reset-requests": "whenever",
+            "x-ratelimit-remaining-tokens": "-1",
+        }
+    )
+
+    assert limiter._requests.tokens == settings.groq_requests_per_minute
+    assert limiter._tokens.tokens == settings.groq_tokens_per_minute
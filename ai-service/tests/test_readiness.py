@@ -0,0 +1,84 @@
+"""Tests of ReadinessProber."""
+
+import asyncio
+
+from src.services.readiness import ReadinessProber
+
+
+def check(result: bool):
+    async def run() -> bool:
+        return result
+
+    return run
+
+
+async def probed(prober: ReadinessProber) -> ReadinessProber:
+    """Start the prober and wait for its first round of checks."""
+    prober.start()
+    for _ in range(100):
+        if all(status.checked_at for status in prober.statuses().values()):
+            break
+        await asyncio.sleep(0.01)
+    await prober.stop()
+    return prober
+
+
+async def test_optional_dependency_is_reported_without_gating_readiness(settings):
+    prober = await probed(
+        ReadinessProber(
+            checks={"minio": check(True), "groq": check(False)},
+            warm_ups=[],
+            settings=settings,
+            optional={"groq"},
+        )
+    )
+
+    assert prober.ready
+    groq = prober.statuses()["groq"]
+    assert not groq.healthy
+    assert not groq.required
+    assert groq.checked_at is not None
+
+
+async def test_required_dependency_gates_readiness(settings):
+    prober = await probed(
+        ReadinessProber(
+            checks={"minio": check(False), "groq": check(True)},
+            warm_ups=[],
+            settings=settings,
+            optional={"groq"},
+        )
+    )
+
+    assert prober.warmed_up
+    assert not prober.ready
+
+
+async def test_failed_warm_up_is_retried_before_ready(settings):
+    settings.readiness_probe_interval_seconds = 0.01
+    attempts = 0
+
+    async def flaky_warm_up() -> None:
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise RuntimeError("worker failed to start")
+
+    prober = ReadinessProber(
+        checks={"minio": check(True)}, warm_ups=[flaky_warm_up], settings=settings
+    )
+    prober.start()
+    try:
+        await asyncio.sleep(0.005)
+        assert not prober.warmed_up
+        assert not prober.ready
+
+        for _ in range(100):
+            if prober.ready:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await prober.stop()
+
+    assert prober.ready
+    assert attempts == 3
@@ -0,0 +1,34 @@
+"""Tests for retries and circuit breaking."""
+
+import pytest
+
+from src.services.resilience import CircuitBreaker, CircuitState, retry_async
+
+
+class TransientError(Exception):
+    pass
+
+
+class PermanentError(Exception):
+    pass
+
+
+def failing(error: Exception):
+    async def call():
+        raise error
+
+    return call
+
+
+async def test_errors_outside_retry_on_do_not_reset_failures(settings):
+    settings.circuit_failure_threshold = 2
+    settings.max_retries = 1
+    breaker = CircuitBreaker("dependency", settings)
+
+    for error in (TransientError(), PermanentError(), TransientError()):
+        with pytest.raises(type(error)):
+            await retry_async(
+                failing(error), retry_on=(TransientError,), breaker=breaker, settings=settings
+            )
+
+    assert breaker.state == CircuitState.OPEN
@@ -0,0 +1,89 @@
+"""Tests for the incremental JSON string field decoder."""
+
+import json
+import random
+
+import pytest
+
+from src.services.streaming_json import JsonStringFieldStream
+
+DOCUMENTS = [
+    pytest.param({"title": "Referto", "summary": "Esami nella norma."}, id="plain"),
+    pytest.param(
+        {"summary": 'Dose "doppia"\\ridotta\nControllo\tfra 3 mesi / ok\r\b\f'},
+        id="escapes",
+    ),
+    pytest.param({"summary": "Età 42, più € e ✓ — “virgolette”"}, id="bmp unicode"),
+    pytest.param({"summary": "Paziente sereno 😀, referto 🩺 allegato 𝔸"}, id="surrogate pairs"),
+    pytest.param({"tags": ["summary"], "summary": "", "date": None}, id="empty value"),
+    pytest.param({"meta_summary": "not this", "summary": "x" * 500 + "\\u0041"}, id="long value"),
+]
+
+
+def chunked(text: str, sizes) -> list[str]:
+    chunks, position = [], 0
+    while position < len(text):
+        size = next(sizes)
+        chunks.append(text[position : position + size])
+        position += size
+    return chunks
+
+
+def one_char():
+    while True:
+        yield 1
+
+
+def random_sizes(seed: int):
+    rng = random.Random(seed)
+    while True:
+        yield rng.randint(1, 16)
+
+
+def stream(text: str, chunks: list[str]) -> tuple[str, JsonStringFieldStream]:
+    parser = JsonStringFieldStream("summary")
+    decoded = "".join(parser.feed(chunk) for chunk in chunks)
+    assert "".join(chunks) == text
+    return decoded, parser
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("ensure_ascii", [True, False], ids=["ascii", "utf8"])
+@pytest.mark.parametrize("indent", [None, 2], ids=["compact", "indented"])
+def test_streamed_value_matches_json_loads(document, ensure_ascii, indent):
+    text = json.dumps(document, ensure_ascii=ensure_ascii, indent=indent)
+    expected = json.loads(text)["summary"]
+
+    for sizes in [one_char(), *(random_sizes(seed) for seed in range(20))]:
+        decoded, parser = stream(text, chunked(text, sizes))
+        assert decoded == expected
+        assert parser.complete
+
+
+def test_value_is_decoded_as_it_arrives():
+    parser = JsonStringFieldStream("summary")
+
+    assert parser.feed('{"summ') == ""
+    assert parser.feed('ary": "Primo') == "Primo"
+    assert parser.feed(" \\u00e") == " "
+    assert parser.feed('8 ok"') == "è ok"
+    assert parser.complete
+    assert parser.feed(', "summary": "again"}') == ""
+
+
+def test_missing_field_decodes_nothing():
+    text = json.dumps({"title": "Referto", "summaries": ["a"]})
+
+    decoded, parser = stream(text, chunked(text, one_char()))
+
+    assert decoded == ""
+    assert not parser.complete
+
+
+def test_escapes_json_dumps_never_writes():
+    text = '{"summary" :\n "a\\/b \\uD83D\\uDE00 \\u00C8"}'
+    expected = json.loads(text)["summary"]
+
+    for sizes in [one_char(), *(random_sizes(seed) for seed in range(20))]:
+        decoded, _ = stream(text, chunked(text, sizes))
+        assert decoded == expected
@@ -0,0 +1,120 @@
+"""Tests for the token-reduction normalization of extracted text."""
+
+import pytest
+
+from src.services.text_normalizer import TextNormalizer
+
+LETTERHEAD = ["AZIENDA OSPEDALIERA SAN MATTEO", "U.O. Medicina di Laboratorio"]
+FOOTER = "Viale Golgi 19, 27100 Pavia - Tel. 0382 5011"
+
+
+def document(*pages: list[str]) -> str:
+    return "\n\n".join(
+        "\n".join([f"--- Page {number} ---", *lines]) for number, lines in enumerate(pages, 1)
+    )
+
+
+def lab_page(number: int, total: int, rows: list[str]) -> list[str]:
+    return [
+        *LETTERHEAD,
+        f"Referto del 0{number}/03/2024",
+        "Esame Risultato Unità Intervallo",
+        *rows,
+        f"Validato il 0{number}/03/2024 alle ore 1{number}:00",
+        "Documento firmato digitalmente ai sensi del D.Lgs 82/2005",
+        f"Pagina {number} di {total}",
+        FOOTER,
+    ]
+
+
+@pytest.fixture
+def normalizer(settings) -> TextNormalizer:
+    return TextNormalizer(settings)
+
+
+def test_repeated_letterhead_is_kept_once(normalizer):
+    pages = [lab_page(number, 4, [f"Glicemia {90 + number} mg/dL"]) for number in range(1, 5)]
+
+    result = normalizer.normalize(document(*pages))
+
+    for line in [*LETTERHEAD, FOOTER]:
+        assert result.text.count(line) == 1
+    assert [f"Glicemia {90 + number} mg/dL" in result.text for number in range(1, 5)] == [True] * 4
+    assert result.chars_saved > 0
+    assert result.estimated_tokens_saved == result.chars_saved // 4
+
+
+@pytest.mark.parametrize("footer", ["Pagina {n} di 4", "Pag. {n}/4", "Page {n} of 4", "- {n} -"])
+def test_page_numbers_are_removed(normalizer, footer):
+    pages = [[f"Visita del giorno {n}", footer.format(n=n)] for n in range(1, 5)]
+
+    result = normalizer.normalize(document(*pages))
+
+    assert result.text == document(*([f"Visita del giorno {n}"] for n in range(1, 5)))
+
+
+def test_bare_numbers_and_page_markers_are_kept(normalizer):
+    pages = [["Pressione arteriosa", "120", "80"] for _ in range(4)]
+
+    result = normalizer.normalize(document(*pages))
+
+    assert result.text.count("120") == 4
+    assert result.text.count("80") == 4
+    assert [f"--- Page {n} ---" in result.text for n in range(1, 5)] == [True] * 4
+
+
+def test_legal_boilerplate_is_removed(normalizer):
+    text = document(
+        [
+            "Diagnosi: faringite",
+            "Informativa sul trattamento dei dati ai sensi del Regolamento UE 2016/679",
+            "Firma autografa sostituita a mezzo stampa",
+        ]
+    )
+
+    assert normalizer.normalize(text).text == document(["Diagnosi: faringite"])
+
+
+@pytest.mark.parametrize(
+    "pages",
+    [
+        pytest.param(
+            [["Emocromo", "Emoglobina", "14,2 g/dL", "Emoglobina", "13,8 g/dL"]],
+            id="one page",
+        ),
+        pytest.param(
+            [
+                ["Emocromo del 01/03", "Emoglobina", "14,2 g/dL"],
+                ["Emocromo del 01/06", "Emoglobina", "13,1 g/dL"],
+            ],
+            id="two pages",
+        ),
+    ],
+)
+def test_short_document_is_left_unchanged(normalizer, pages):
+    text = document(*pages)
+
+    result = normalizer.normalize(text)
+
+    assert result.text == text
+    assert result.chars_saved == 0
+
+
+def test_repeated_rows_in_the_body_of_pages_are_kept(normalizer):
+    rows = ["Emocromo", "Globuli rossi 4,8", "Emoglobina", "14,2 g/dL", "Ematocrito 42%"]
+    pages = [lab_page(number, 4, rows) for number in range(1, 5)]
+
+    result = normalizer.normalize(document(*pages))
+
+    assert result.text.count("Emoglobina") == 4
+    assert result.text.count(LETTERHEAD[0]) == 1
+
+
+def test_disabled_normalization_returns_the_text_as_is(settings):
+    settings.text_normalization_enabled = False
+    text = document(*(lab_page(number, 4, ["Glicemia 95 mg/dL"]) for number in range(1, 5)))
+
+    result = TextNormalizer(settings).normalize(text)
+
+    assert result.text == text
+    assert result.chars_saved == 0
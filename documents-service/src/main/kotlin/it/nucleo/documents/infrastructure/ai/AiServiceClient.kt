@@ -29,6 +29,7 @@ sealed class AiAnalysisResult {
 
 enum class AiErrorCode {
     DOCUMENT_NOT_FOUND,
+    DOCUMENT_TOO_LARGE,
     PDF_EXTRACTION_FAILED,
     AI_GENERATION_FAILED,
     CONNECTION_FAILED,
@@ -175,6 +176,7 @@ class AiServiceClient(host: String, port: Int, private val timeoutMs: Int = 120_
     private fun mapErrorCode(errorCode: String?): AiErrorCode {
         return when (errorCode) {
             "DOCUMENT_NOT_FOUND" -> AiErrorCode.DOCUMENT_NOT_FOUND
+            "DOCUMENT_TOO_LARGE" -> AiErrorCode.DOCUMENT_TOO_LARGE
             "PDF_EXTRACTION_FAILED" -> AiErrorCode.PDF_EXTRACTION_FAILED
             "AI_GENERATION_FAILED" -> AiErrorCode.AI_GENERATION_FAILED
             "MINIO_CONNECTION_FAILED" -> AiErrorCode.CONNECTION_FAILED
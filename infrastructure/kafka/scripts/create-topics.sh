@@ -32,6 +32,13 @@ TOPICS_TO_CREATE=(
 
   # Publisher: Master Data Service | Consumers: Appointment Service, Document Service
   "master-data.service-type-deleted:3:1"
+
+  # Publisher: none yet, reserved for the Document Service | Consumers: AI Service (when enabled)
+  "documents.document-created:3:1"
+  "documents.document-updated:3:1"
+
+  # Publisher: AI Service (when enabled) | Consumers: none yet
+  "documents.document-analyzed:3:1"
 )
 
 for topic_definition in "${TOPICS_TO_CREATE[@]}"; do